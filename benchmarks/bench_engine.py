@@ -0,0 +1,262 @@
+# Fichier : benchmarks/bench_engine.py
+# Mesure les chemins critiques du moteur sur des bases synthétiques de plusieurs tailles :
+#   - pagination et recherche des agents (get_all_agents / get_agents_count) ;
+#   - saisie d'un congé (handle_conge_submission) et clôture annuelle (effectuer_glissement_annuel) ;
+#   - audit des jours fériés (find_inconsistent_annual_leaves) et décompte des jours ouvrés ;
+#   - export / import Excel (si openpyxl est installé) et génération des décisions (Word et PDF).
+#
+# Les bases sont générées (db/data_generator.py) une fois par taille et par graine dans benchmarks/.data/, puis
+# copiées avant chaque exécution : les mesures qui écrivent ne modifient jamais la base de
+# référence. Les résultats sont enregistrés en JSON (benchmarks/results/) pour suivre leur
+# évolution ; --compare affiche l'écart avec un fichier de résultats précédent.
+#
+# Usage : python benchmarks/bench_engine.py [--scale 1k,10k,100k] [--repeat 5] [--seed 42]
+#                                           [--only agents_page,jours_ouvres] [--compare ANCIEN.json]
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import datetime
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, BASE_DIR)
+
+from utils.config_loader import load_config, get_settings
+from db.database import DatabaseManager
+from db.data_generator import generate_synthetic_data
+from core.conges.manager import CongeManager
+from utils.date_utils import jours_ouvres
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '.data')
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+# Taille des jeux de données : 100k agents x 10 congés = 1 million de congés.
+SCALES = {
+    '1k': {'agents': 1_000, 'conges_par_agent': 10},
+    '10k': {'agents': 10_000, 'conges_par_agent': 10},
+    '100k': {'agents': 100_000, 'conges_par_agent': 10},
+}
+ANNEE = 2024
+DECISIONS_PAR_LOT = 200
+
+
+# --- Jeux de données ---
+
+def build_database(path, agents, conges_par_agent, seed):
+    """Construit une base synthétique (voir db/data_generator.py) pour l'exercice ANNEE."""
+    db = DatabaseManager(path)
+    if not db.connect():
+        raise sqlite3.OperationalError(f"Impossible d'ouvrir {path}")
+    try:
+        db.run_migrations()
+        db.set_annee_exercice(ANNEE)
+        generate_synthetic_data(db, agents=agents, conges_par_agent=conges_par_agent, seed=seed)
+    finally:
+        db.close()
+
+
+def dataset_path(scale, seed, rebuild=False):
+    path = os.path.join(DATA_DIR, f"bench_{scale}_seed{seed}.db")
+    if rebuild or not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        debut = time.perf_counter()
+        build_database(tmp_path, SCALES[scale]['agents'], SCALES[scale]['conges_par_agent'], seed)
+        os.replace(tmp_path, path)
+        print(f"  base {scale} construite en {time.perf_counter() - debut:.1f} s")
+    return path
+
+
+# --- Mesures ---
+
+def _time(fn, repeat, setup=None):
+    """Exécute fn 'repeat' fois (setup() avant chaque exécution, hors mesure) et retourne les durées en ms."""
+    durations = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        debut = time.perf_counter()
+        fn(arg) if setup else fn()
+        durations.append((time.perf_counter() - debut) * 1000)
+    return durations
+
+
+def _summary(durations):
+    return {'repeat': len(durations), 'min_ms': round(min(durations), 3),
+            'median_ms': round(statistics.median(durations), 3), 'mean_ms': round(statistics.mean(durations), 3)}
+
+
+def _decision_templates(directory, grades):
+    """Modèles Word minimaux (un par grade) pour mesurer la génération sans dépendre de templates/."""
+    w_ns = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    texte = "".join(f"<w:p><w:r><w:t>{balise}</w:t></w:r></w:p>" for balise in
+                    ("{{nom_complet}} - {{grade}} - {{ppr}}", "Du {{date_debut}} au {{date_fin}}, reprise le {{date_reprise}}",
+                     "{{jours_pris}} jours : {{details_solde}}", "Fait le {{date_aujourdhui}}"))
+    for grade in grades:
+        path = os.path.join(directory, f"{grade.lower().replace(' ', '_')}.docx")
+        with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("[Content_Types].xml", "<Types/>")
+            archive.writestr("word/document.xml", f'<?xml version="1.0" encoding="UTF-8"?><w:document {w_ns}><w:body>{texte}</w:body></w:document>')
+
+
+def run_cases(db_path, scale, repeat, only, workdir):
+    """Mesure chaque cas sur une copie de la base ; retourne {nom: résumé ou {'skipped': raison}}."""
+    work_db = os.path.join(workdir, "bench.db")
+    shutil.copyfile(db_path, work_db)
+    db = DatabaseManager(work_db)
+    db.connect()
+    manager = CongeManager(db, os.path.join(workdir, "certificats"))
+    nb_agents = SCALES[scale]['agents']
+    results = {}
+
+    def case(name, fn, repeat=repeat, setup=None):
+        if only and name not in only:
+            return
+        results[name] = _summary(_time(fn, repeat, setup))
+        print(f"  {name:<32} {results[name]['median_ms']:10.2f} ms (médiane sur {repeat})")
+
+    def skipped(name, reason):
+        if not only or name in only:
+            results[name] = {'skipped': reason}
+            print(f"  {name:<32} ignoré : {reason}")
+
+    derniere_page = max(0, (nb_agents - 1) // 50) * 50
+    case('agents_page_first', lambda: manager.get_all_agents(limit=50, offset=0))
+    case('agents_page_last', lambda: manager.get_all_agents(limit=50, offset=derniere_page))
+    case('agents_search', lambda: (manager.get_agents_count("tazi"), manager.get_all_agents(term="tazi", limit=50, offset=0)))
+
+    holidays_set = manager.get_holidays_set_for_period(ANNEE, ANNEE + 1)
+    case('jours_ouvres_year', lambda: jours_ouvres(datetime(ANNEE, 1, 1), datetime(ANNEE, 12, 31), holidays_set), repeat=repeat * 20)
+    case('find_inconsistent_annual_leaves', lambda: manager.find_inconsistent_annual_leaves(ANNEE - 1))
+
+    # Un congé annuel en septembre de l'exercice suivant (après les congés générés), à chaque fois pour un agent différent.
+    agents_cibles = iter(range(1, nb_agents + 1))
+    def submission_form():
+        return {'agent_id': next(agents_cibles), 'type_conge': 'Congé annuel', 'date_debut': f'08/09/{ANNEE + 1}',
+                'date_fin': f'12/09/{ANNEE + 1}', 'jours_pris': 5, 'justif': '', 'interim_id': None,
+                'cert_path': '', 'original_cert_path': None, 'annee_exercice': ANNEE}
+    case('conge_submission', lambda form: manager.handle_conge_submission(form, is_modification=False),
+         repeat=min(repeat * 10, nb_agents), setup=submission_form)
+
+    conge_ids = [row[0] for row in db.execute_query(
+        "SELECT id FROM conges WHERE type_conge = 'Congé annuel' ORDER BY id LIMIT ?", (DECISIONS_PAR_LOT,), fetch="all")]
+    templates_dir = os.path.join(workdir, "templates")
+    os.makedirs(templates_dir, exist_ok=True)
+    _decision_templates(templates_dir, get_settings().grades)
+    from utils.decisions import generate_decisions_batch
+    for fmt in ("docx", "pdf"):
+        def generate(fmt=fmt):
+            jobs, _ = manager.prepare_decision_jobs(conge_ids, templates_dir, fmt)
+            sortie = tempfile.mkdtemp(dir=workdir)
+            generate_decisions_batch(jobs, sortie)
+            shutil.rmtree(sortie)
+        case(f'decisions_batch_{fmt}_{len(conge_ids)}', generate, repeat=max(1, repeat // 2))
+
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError:
+        for name in ('excel_export_agents', 'excel_export_conges', 'excel_import_agents'):
+            skipped(name, "openpyxl n'est pas installé")
+    else:
+        from utils.file_utils import export_agents_to_excel, export_all_conges_to_excel, import_agents_from_excel
+        agents_xlsx = os.path.join(workdir, "agents.xlsx")
+        certificats = manager.certificats_dir
+        case('excel_export_agents', lambda: export_agents_to_excel(work_db, certificats, agents_xlsx), repeat=1)
+        case('excel_export_conges', lambda: export_all_conges_to_excel(work_db, certificats, os.path.join(workdir, "conges.xlsx")), repeat=1)
+        if os.path.exists(agents_xlsx):
+            case('excel_import_agents', lambda: import_agents_from_excel(work_db, certificats, agents_xlsx), repeat=1)
+
+    # La clôture modifie tout l'exercice : mesurée une seule fois, en dernier.
+    case('effectuer_glissement_annuel', manager.effectuer_glissement_annuel, repeat=1)
+    db.close()
+    return results
+
+
+# --- Résultats ---
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous, current):
+    """
+    Affiche, pour chaque cas mesuré dans les deux fichiers (même taille, même nom), le rapport
+    des médianes (nouveau / ancien). Retourne le nombre de cas comparés.
+    """
+    print(f"\nComparaison avec {previous['meta'].get('date')} ({previous['meta'].get('git') or 'révision inconnue'}) :")
+    compares = 0
+    for scale, mesures in current['scales'].items():
+        anciens = previous.get('scales', {}).get(scale, {}).get('cases', {})
+        for name, mesure in mesures['cases'].items():
+            ancien = anciens.get(name, {})
+            if 'median_ms' in mesure and ancien.get('median_ms'):
+                ratio = mesure['median_ms'] / ancien['median_ms']
+                alerte = "  <-- plus lent" if ratio > 1.2 else ""
+                print(f"  [{scale}] {name:<32} {ancien['median_ms']:10.2f} -> {mesure['median_ms']:10.2f} ms  (x{ratio:.2f}){alerte}")
+                compares += 1
+    if not compares:
+        print("  Aucun cas mesuré dans les deux fichiers (tailles ou cas différents).")
+    return compares
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesures de performance du moteur de gestion des congés.")
+    parser.add_argument("--scale", default="1k", help=f"Tailles à mesurer, séparées par des virgules ({', '.join(SCALES)}).")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", help="Cas à mesurer, séparés par des virgules (par défaut : tous).")
+    parser.add_argument("--rebuild", action="store_true", help="Reconstruire les bases synthétiques.")
+    parser.add_argument("--output", help="Fichier JSON des résultats (par défaut : benchmarks/results/engine_<date>.json).")
+    parser.add_argument("--compare", help="Fichier JSON d'une exécution précédente à comparer.")
+    args = parser.parse_args(argv)
+
+    scales = [s.strip() for s in args.scale.split(",") if s.strip()]
+    inconnues = [s for s in scales if s not in SCALES]
+    if inconnues:
+        parser.error(f"taille(s) inconnue(s) : {', '.join(inconnues)}")
+    only = {name.strip() for name in args.only.split(",")} if args.only else None
+
+    logging.basicConfig(level=logging.ERROR)
+    load_config(os.path.join(BASE_DIR, "config.yaml"))
+
+    now = datetime.now()
+    report = {
+        'meta': {'date': now.isoformat(timespec='seconds'), 'git': _git_revision(), 'python': platform.python_version(),
+                 'sqlite': sqlite3.sqlite_version, 'platform': platform.platform(), 'seed': args.seed, 'repeat': args.repeat},
+        'scales': {},
+    }
+    for scale in scales:
+        print(f"Taille {scale} ({SCALES[scale]['agents']} agents, {SCALES[scale]['agents'] * SCALES[scale]['conges_par_agent']} congés) :")
+        db_path = dataset_path(scale, args.seed, args.rebuild)
+        with tempfile.TemporaryDirectory() as workdir:
+            cases = run_cases(db_path, scale, args.repeat, only, workdir)
+        report['scales'][scale] = {'dataset': dict(SCALES[scale]), 'cases': cases}
+
+    output = args.output or os.path.join(RESULTS_DIR, f"engine_{now.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nRésultats enregistrés dans {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(json.load(f), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
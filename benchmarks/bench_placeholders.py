@@ -0,0 +1,113 @@
+# Fichier : benchmarks/bench_placeholders.py
+# Compare le remplacement des balises {{...}} de l'ancienne génération (str.replace de
+# chaque clé du contexte, paragraphe par paragraphe) au moteur en une passe
+# (utils.docx_templates) :
+#   - sur des textes de paragraphes seuls (Python pur) ;
+#   - sur un document complet : compilation + génération à partir du cache, et, si
+#     python-docx est installé, l'ancienne génération via python-docx.
+#
+# Usage : python benchmarks/bench_placeholders.py [--paragraphs 400] [--repeat 20]
+
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+import zipfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.docx_templates import TOKEN_RE, compile_template, normalize_context, render_template
+
+CONTEXT = {
+    "{{nom_complet}}": "ALAOUI Sara", "{{grade}}": "Adjoint Technique", "{{ppr}}": "1234567",
+    "{{date_debut}}": "01/07/2024", "{{date_fin}}": "19/07/2024", "{{date_reprise}}": "22/07/2024",
+    "{{jours_pris}}": "15", "{{details_solde}}": "10 jours au titre de l'année 2023 et 5 jours au titre de l'année 2024",
+    "{{date_aujourdhui}}": "28/06/2024",
+}
+W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def _paragraphs(count):
+    balises = list(CONTEXT)
+    return [f"Article {i} : {balises[i % len(balises)]} - texte fixe du modèle de décision {balises[(i * 7) % len(balises)]}."
+            if i % 3 else f"Paragraphe {i} sans balise." for i in range(count)]
+
+
+def legacy_substitute(texts, context):
+    """Algorithme historique : chaque clé du contexte est cherchée dans chaque paragraphe balisé."""
+    result = []
+    for full_text in texts:
+        if '{{' in full_text and '}}' in full_text:
+            for key, value in context.items():
+                full_text = full_text.replace(key, str(value))
+        result.append(full_text)
+    return result
+
+
+def single_pass_substitute(texts, context):
+    values = normalize_context(context)
+    replace = lambda m: str(values[m.group(1)]) if m.group(1) in values else m.group(0)
+    return [TOKEN_RE.sub(replace, text) for text in texts]
+
+
+def _make_template(path, texts):
+    body = "".join(f"<w:p><w:r><w:t>{t[:len(t) // 2]}</w:t></w:r><w:r><w:t>{t[len(t) // 2:]}</w:t></w:r></w:p>" for t in texts)
+    table = "<w:tbl>" + "".join(f"<w:tr><w:tc><w:p><w:r><w:t>{t}</w:t></w:r></w:p></w:tc></w:tr>" for t in texts[:20]) + "</w:tbl>"
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", "<Types/>")
+        archive.writestr("word/document.xml", f'<?xml version="1.0" encoding="UTF-8"?><w:document {W_NS}><w:body>{body}{table}</w:body></w:document>')
+        archive.writestr("word/header1.xml", f'<w:hdr {W_NS}><w:p><w:r><w:t>Réf. {{{{ppr}}}}</w:t></w:r></w:p></w:hdr>')
+        archive.writestr("word/media/image1.png", os.urandom(200_000))
+
+
+def _legacy_docx_render(template_path, output_path, context):
+    import docx
+    doc = docx.Document(template_path)
+    paragraphs = list(doc.paragraphs) + [p for table in doc.tables for row in table.rows for cell in row.cells for p in cell.paragraphs]
+    for p in paragraphs:
+        full_text = "".join(run.text for run in p.runs)
+        if '{{' in full_text and '}}' in full_text:
+            for key, value in context.items():
+                full_text = full_text.replace(key, str(value))
+            for run in p.runs:
+                run.text = ''
+            p.runs[0].text = full_text
+    doc.save(output_path)
+
+
+def _report(label, seconds, repeat):
+    print(f"  {label:<45} {seconds / repeat * 1000:9.3f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paragraphs", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+    texts = _paragraphs(args.paragraphs)
+    assert legacy_substitute(texts, CONTEXT) == single_pass_substitute(texts, CONTEXT)
+
+    print(f"Textes seuls ({args.paragraphs} paragraphes, {len(CONTEXT)} clés) :")
+    _report("str.replace par clé (historique)", timeit.timeit(lambda: legacy_substitute(texts, CONTEXT), number=args.repeat), args.repeat)
+    _report("expression régulière en une passe", timeit.timeit(lambda: single_pass_substitute(texts, CONTEXT), number=args.repeat), args.repeat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        template_path = os.path.join(tmp, "modele.docx")
+        output_path = os.path.join(tmp, "decision.docx")
+        _make_template(template_path, texts)
+        print("Document complet :")
+        _report("compilation du modèle", timeit.timeit(lambda: compile_template(template_path), number=args.repeat), args.repeat)
+        render_template(template_path, output_path, CONTEXT)  # remplit le cache
+        _report("génération depuis le modèle compilé", timeit.timeit(lambda: render_template(template_path, output_path, CONTEXT), number=args.repeat), args.repeat)
+        try:
+            import docx  # noqa: F401
+        except ImportError:
+            print("  (python-docx absent : génération historique non mesurée)")
+        else:
+            _report("génération historique (python-docx)", timeit.timeit(lambda: _legacy_docx_render(template_path, output_path, CONTEXT), number=args.repeat), args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
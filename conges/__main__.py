@@ -0,0 +1,15 @@
+# Fichier : conges/__main__.py
+# Permet de lancer l'outil en ligne de commande avec : python -m conges <commande>
+# Le journal est configuré ici, et non dans cli.main(), pour que l'appel de main() depuis
+# un autre programme (ou les tests) ne remplace pas la configuration de journalisation.
+# force=True : des avertissements émis à l'import ont déjà pu configurer le journal par défaut.
+
+import logging
+import os
+import sys
+
+from conges.cli import main, BASE_DIR
+
+logging.basicConfig(filename=os.path.join(BASE_DIR, "conges.log"), level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(name)s - %(message)s', force=True)
+sys.exit(main())
@@ -0,0 +1,200 @@
+# Fichier : conges/cli.py
+# Point d'entrée en ligne de commande (sans interface graphique) pour les traitements
+# par lot et les tâches planifiées (cron) : export, import, clôture annuelle, apurement,
+# audit des jours fériés, analyse des certificats, sauvegarde et génération de données de test.
+#
+# Ce module ne doit JAMAIS importer Tkinter : il doit pouvoir tourner sans affichage.
+# Les modules lourds (openpyxl, python-docx) ne sont importés que par les commandes qui en ont besoin.
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+from utils.config_loader import load_config, CONFIG, get_settings
+from db.database import DatabaseManager
+from db import query_stats
+from db.backup_store import get_backup_store, get_retention_policy
+from core.conges.manager import CongeManager
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _build_parser():
+    parser = argparse.ArgumentParser(prog="python -m conges", description="Gestion des congés - traitements sans interface graphique.")
+    parser.add_argument("--config", default=os.path.join(BASE_DIR, "config.yaml"), help="Chemin du fichier config.yaml.")
+    parser.add_argument("--db", help="Chemin de la base de données (par défaut : celui de la configuration).")
+    parser.add_argument("--certificats", help="Dossier des certificats médicaux (par défaut : celui de la configuration).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p_export = subparsers.add_parser("export", help="Exporter les agents ou tous les congés vers Excel.")
+    p_export.add_argument("what", choices=["agents", "conges"], help="Données à exporter.")
+    p_export.add_argument("output", help="Fichier .xlsx de destination.")
+
+    p_import = subparsers.add_parser("import", help="Importer des agents depuis un fichier Excel.")
+    p_import.add_argument("source", help="Fichier .xlsx à importer.")
+
+    p_rollover = subparsers.add_parser("rollover", help="Clôturer l'exercice annuel (une sauvegarde vérifiée est créée avant).")
+    p_rollover.add_argument("--yes", action="store_true", help="Confirme l'opération (obligatoire, l'action est irréversible).")
+
+    p_purge = subparsers.add_parser("purge-expired", help="Mettre à zéro tous les soldes expirés.")
+    p_purge.add_argument("--yes", action="store_true", help="Confirme l'opération (obligatoire, l'action est irréversible).")
+
+    p_audit = subparsers.add_parser("audit-holidays", help="Lister les congés annuels dont le décompte ne correspond plus aux jours fériés.")
+    p_audit.add_argument("--year", type=int, help="Année à auditer (par défaut : l'exercice en cours).")
+
+    p_scan = subparsers.add_parser("scan-certificats", help="Vérifier la cohérence entre les certificats enregistrés et leurs fichiers.")
+    p_scan.add_argument("--repair", action="store_true", help="Réparer : relier ou retirer les certificats sans fichier, supprimer les fichiers orphelins.")
+    p_scan.add_argument("--full", action="store_true", help="Relire tout le dossier (ignorer le point de reprise de la dernière analyse).")
+
+    p_backup = subparsers.add_parser("backup", help="Créer une sauvegarde incrémentale de la base et appliquer la rétention.")
+    p_backup.add_argument("--label", default="MANUELLE", help="Libellé de la sauvegarde.")
+
+    p_generate = subparsers.add_parser("generate", help="Remplir une base vide avec des données synthétiques (tests de charge).")
+    p_generate.add_argument("--agents", type=int, default=1000, help="Nombre d'agents (défaut : 1000).")
+    p_generate.add_argument("--conges-par-agent", type=int, default=10, help="Nombre de congés par agent (défaut : 10).")
+    p_generate.add_argument("--annees", type=int, default=3, help="Nombre d'exercices couverts, jusqu'à l'exercice en cours (défaut : 3).")
+    p_generate.add_argument("--annee-exercice", type=int, help="Exercice en cours de la base générée (par défaut : celui de la base).")
+    p_generate.add_argument("--seed", type=int, help="Graine du générateur, pour reproduire exactement la même base.")
+    return parser
+
+
+def _resolve_paths(args):
+    db_path = args.db or os.path.join(BASE_DIR, CONFIG['db']['filename'])
+    certificats_dir = args.certificats or os.path.join(BASE_DIR, CONFIG['db']['certificates_dir'])
+    return db_path, certificats_dir
+
+
+# --- Commandes ---
+
+def cmd_export(args, manager, paths):
+    from utils.file_utils import export_agents_to_excel, export_all_conges_to_excel
+    db_path, certificats_dir = paths
+    export = export_agents_to_excel if args.what == "agents" else export_all_conges_to_excel
+    print(export(db_path, certificats_dir, os.path.abspath(args.output)))
+    return 0
+
+
+def cmd_import(args, manager, paths):
+    from utils.file_utils import import_agents_from_excel
+    db_path, certificats_dir = paths
+    print(import_agents_from_excel(db_path, certificats_dir, args.source))
+    return 0
+
+
+def cmd_rollover(args, manager, paths):
+    annee = manager.get_annee_exercice()
+    if not args.yes:
+        print(f"La clôture de l'exercice {annee} est irréversible : relancez avec --yes pour confirmer.", file=sys.stderr)
+        return 1
+    db_path = paths[0]
+    snapshot = get_backup_store(db_path).create_snapshot(db_path, f"AVANT_CLOTURE_{annee}", permanent=True)
+    print(f"Sauvegarde créée : {snapshot['id']}")
+    manager.effectuer_glissement_annuel()
+    print(f"Exercice {annee} clôturé. Nouvel exercice : {manager.get_annee_exercice()}.")
+    return 0
+
+
+def cmd_purge_expired(args, manager, paths):
+    soldes_expires = manager.get_soldes_expires()
+    if not soldes_expires:
+        print("Aucun solde expiré à apurer.")
+        return 0
+    if not args.yes:
+        print(f"{len(soldes_expires)} soldes expirés seraient mis à zéro : relancez avec --yes pour confirmer.", file=sys.stderr)
+        return 1
+    manager.apurer_soldes([row[0] for row in soldes_expires])
+    print(f"{len(soldes_expires)} soldes expirés apurés.")
+    return 0
+
+
+def cmd_audit_holidays(args, manager, paths):
+    year = args.year or manager.get_annee_exercice()
+    inconsistencies = manager.find_inconsistent_annual_leaves(year)
+    if not inconsistencies:
+        print(f"Aucune incohérence pour {year}.")
+        return 0
+    agents = manager.db.get_agents_by_ids({conge.agent_id for conge, _ in inconsistencies})
+    print(f"{len(inconsistencies)} congé(s) incohérent(s) pour {year} :")
+    for conge, recalculated_days in inconsistencies:
+        agent = agents.get(conge.agent_id)
+        agent_name = f"{agent.nom} {agent.prenom}" if agent else "Agent Inconnu"
+        print(f"  {agent_name} ; {conge.date_debut.strftime('%d/%m/%Y')} - {conge.date_fin.strftime('%d/%m/%Y')} ; "
+              f"enregistré : {conge.jours_pris} j ; calculé : {recalculated_days} j")
+    return 1
+
+
+def cmd_scan_certificats(args, manager, paths):
+    rapport = manager.scan_certificats(repair=args.repair, full=args.full)
+    print(f"{rapport['dossiers_analyses']} dossier(s) et {rapport['fichiers_analyses']} fichier(s) analysés.")
+    for manquant in rapport['manquants']:
+        print(f"  Fichier manquant (congé {manquant['conge_id']}) : {manquant['chemin']}")
+    for chemin in rapport['orphelins']:
+        print(f"  Fichier orphelin : {chemin}")
+    if args.repair:
+        print(f"Réparation : {rapport['certificats_relies']} certificat(s) relié(s), "
+              f"{rapport['certificats_supprimes']} certificat(s) retiré(s), {rapport['fichiers_supprimes']} fichier(s) supprimé(s).")
+        return 0
+    return 1 if rapport['manquants'] or rapport['orphelins'] else 0
+
+
+def cmd_backup(args, manager, paths):
+    db_path = paths[0]
+    store = get_backup_store(db_path)
+    snapshot = store.create_snapshot(db_path, args.label)
+    print(f"Sauvegarde créée : {snapshot['id']} ({snapshot['stored_bytes']} octets nouveaux)")
+    removed = store.apply_retention(**get_retention_policy())
+    if removed:
+        print(f"{len(removed)} ancienne(s) sauvegarde(s) supprimée(s) selon la politique de rétention.")
+    return 0
+
+
+def cmd_generate(args, manager, paths):
+    from db.data_generator import generate_synthetic_data
+    debut = time.perf_counter()
+    # L'exercice n'est changé qu'avec les données générées : une base refusée reste intacte.
+    stats = generate_synthetic_data(manager.db, agents=args.agents, conges_par_agent=args.conges_par_agent,
+                                    annees=args.annees, seed=args.seed, annee_exercice=args.annee_exercice)
+    print(f"Base {paths[0]} remplie en {time.perf_counter() - debut:.1f} s :")
+    for table, count in stats.items():
+        print(f"  {table} : {count}")
+    return 0
+
+
+COMMANDS = {
+    "export": cmd_export,
+    "import": cmd_import,
+    "rollover": cmd_rollover,
+    "purge-expired": cmd_purge_expired,
+    "audit-holidays": cmd_audit_holidays,
+    "scan-certificats": cmd_scan_certificats,
+    "backup": cmd_backup,
+    "generate": cmd_generate,
+}
+
+
+def main(argv=None):
+    args = _build_parser().parse_args(argv)
+    try:
+        load_config(args.config)
+    except Exception as e:
+        print(f"Impossible de charger la configuration : {e}", file=sys.stderr)
+        return 1
+    query_stats.configure_from_settings(get_settings())
+
+    paths = _resolve_paths(args)
+    db_manager = DatabaseManager(paths[0])
+    if not db_manager.connect():
+        print(f"Impossible de se connecter à la base de données : {paths[0]}", file=sys.stderr)
+        return 1
+    try:
+        db_manager.run_migrations()
+        manager = CongeManager(db_manager, paths[1])
+        return COMMANDS[args.command](args, manager, paths)
+    except Exception as e:
+        logging.error(f"Échec de la commande '{args.command}' : {e}", exc_info=True)
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 1
+    finally:
+        db_manager.close()
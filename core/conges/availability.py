@@ -0,0 +1,52 @@
+# Fichier : core/conges/availability.py
+# Moteur de disponibilité : détermine quels agents sont libres sur toute une période
+# (choix de l'intérimaire, planification des remplacements).
+
+from collections import OrderedDict
+
+from utils.date_utils import validate_date
+
+
+class AvailabilityEngine:
+    """
+    Calcule la liste des agents disponibles sur une période donnée.
+
+    Le calcul repose sur une seule requête indexée (index R*Tree des congés) et le
+    résultat est mis en cache par période. Le cache doit être invalidé dès qu'un
+    congé ou un agent est créé, modifié ou supprimé (voir CongeManager).
+    """
+    def __init__(self, db_manager, max_periodes=32):
+        self.db = db_manager
+        self.max_periodes = max_periodes
+        self._cache = OrderedDict()
+
+    def get_available_agents(self, start_date, end_date):
+        """
+        Retourne la liste (triée par nom) des agents sans congé actif sur [start_date, end_date].
+        Les agents sont chargés sans leurs soldes.
+        """
+        start, end = validate_date(start_date), validate_date(end_date)
+        if not start or not end or end < start:
+            return []
+
+        key = (start.date(), end.date())
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        agents = self.db.get_agents_disponibles(start, end)
+        self._cache[key] = agents
+        if len(self._cache) > self.max_periodes:
+            self._cache.popitem(last=False)
+        return agents
+
+    def is_available(self, agent_id, start_date, end_date, conge_id_exclu=None):
+        """Indique si un agent n'a aucun congé actif sur la période."""
+        start, end = validate_date(start_date), validate_date(end_date)
+        if not start or not end:
+            return False
+        return not self.db.get_overlapping_leaves(agent_id, start, end, conge_id_exclu)
+
+    def invalidate(self):
+        """Vide le cache (à appeler après toute écriture sur les agents ou les congés)."""
+        self._cache.clear()
@@ -0,0 +1,225 @@
+# Fichier : core/conges/certificate_ingestion.py
+# Ingestion des certificats médicaux en arrière-plan et cache d'aperçus.
+#
+# La copie (avec calcul d'empreinte), la vérification et la génération de l'aperçu
+# d'un justificatif sont faites par un thread de travail qui possède sa propre
+# connexion SQLite : le thread de l'interface n'attend jamais la fin d'une copie.
+# Les résultats sont récupérés par l'interface via poll_results().
+#
+# Les aperçus (première page d'un PDF, miniature d'une image) sont générés une seule
+# fois par contenu, dans <certificats>/.previews/<sha256>.png. Leur génération repose
+# sur des bibliothèques optionnelles (requirements-optional.txt) : PyMuPDF pour les PDF,
+# Pillow pour les images. Sans Pillow, les images PNG et GIF, que Tk sait afficher
+# directement, sont copiées telles quelles : l'interface les réduit à l'affichage.
+
+import hashlib
+import logging
+import os
+import queue
+import shutil
+import threading
+
+try:
+    import fitz  # PyMuPDF
+    PDF_PREVIEW_AVAILABLE = True
+except ImportError:
+    PDF_PREVIEW_AVAILABLE = False
+
+try:
+    from PIL import Image
+    IMAGE_PREVIEW_AVAILABLE = True
+except ImportError:
+    IMAGE_PREVIEW_AVAILABLE = False
+
+from db.database import DatabaseManager
+from core.interaction import InteractionHandler
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tif', '.tiff'}
+# Formats lus nativement par tk.PhotoImage (Tk 8.6), utilisables comme aperçu sans conversion.
+NATIVE_PREVIEW_EXTENSIONS = {'.png', '.gif'}
+
+
+class PreviewCache:
+    """Cache des aperçus basse résolution des justificatifs, indexé par empreinte SHA-256."""
+    def __init__(self, certificats_dir, max_size=(320, 320)):
+        self.previews_dir = os.path.join(certificats_dir, ".previews")
+        self.max_size = max_size
+        os.makedirs(self.previews_dir, exist_ok=True)
+
+    def preview_path(self, digest):
+        return os.path.join(self.previews_dir, f"{digest}.png")
+
+    def get(self, digest):
+        """Retourne le chemin de l'aperçu s'il a déjà été généré, sinon None (aucun calcul)."""
+        if not digest:
+            return None
+        path = self.preview_path(digest)
+        return path if os.path.exists(path) else None
+
+    def discard(self, digest):
+        """Supprime l'aperçu d'un contenu qui n'est plus conservé."""
+        path = self.preview_path(digest)
+        try:
+            os.remove(path)
+            logging.info(f"Aperçu supprimé : {path}")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logging.error(f"Erreur suppression aperçu {path}: {e}")
+
+    def ensure(self, digest, source_path):
+        """Génère l'aperçu de 'source_path' s'il n'existe pas encore. Retourne son chemin ou None."""
+        existing = self.get(digest)
+        if existing:
+            return existing
+
+        extension = os.path.splitext(source_path)[1].lower()
+        path = self.preview_path(digest)
+        temp_path = f"{path}.tmp.png"
+        try:
+            if extension == '.pdf' and PDF_PREVIEW_AVAILABLE:
+                self._render_pdf(source_path, temp_path)
+            elif extension in IMAGE_EXTENSIONS and IMAGE_PREVIEW_AVAILABLE:
+                self._render_image(source_path, temp_path)
+            elif extension in NATIVE_PREVIEW_EXTENSIONS:
+                # Tk reconnaît le format au contenu : un GIF peut garder l'extension .png de l'aperçu.
+                shutil.copyfile(source_path, temp_path)
+            else:
+                return None
+            os.replace(temp_path, path)
+            return path
+        except Exception as e:
+            logging.warning(f"Aperçu impossible pour {source_path}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return None
+
+    def _render_pdf(self, source_path, dest_path):
+        with fitz.open(source_path) as document:
+            page = document.load_page(0)
+            zoom = min(self.max_size[0] / page.rect.width, self.max_size[1] / page.rect.height)
+            page.get_pixmap(matrix=fitz.Matrix(zoom, zoom)).save(dest_path)
+
+    def _render_image(self, source_path, dest_path):
+        with Image.open(source_path) as image:
+            image.thumbnail(self.max_size)
+            image.save(dest_path, format="PNG")
+
+
+def release_certificate_file(store, previews, chemin):
+    """
+    Supprime un justificatif qui n'est plus référencé, puis son aperçu si le magasin ne
+    contient plus aucun fichier de même contenu. Retourne vrai si le fichier a été supprimé.
+    """
+    removed = store.discard(chemin)
+    digest = store.digest_of(chemin)
+    if previews and digest and not store.has_content(digest):
+        previews.discard(digest)
+    return removed
+
+
+class CertificateIngestionQueue:
+    """
+    File d'ingestion des justificatifs traitée par un thread de travail unique.
+
+    Chaque tâche range le fichier dans le magasin (CertificateStore), vérifie le fichier
+    stocké, enregistre le certificat dans la base, génère l'aperçu puis libère les anciens
+    fichiers devenus inutiles et leurs aperçus (ils ne le sont qu'une fois le nouveau
+    certificat enregistré).
+    """
+    def __init__(self, db_path, store, previews=None):
+        self.db_path = db_path
+        self.store = store
+        self.previews = previews
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, conge_id, source_path, chemins_a_liberer=()):
+        """Ajoute un justificatif à ingérer pour le congé 'conge_id'."""
+        with self._lock:
+            self._pending += 1
+            self._jobs.put((conge_id, source_path, list(chemins_a_liberer)))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="certificate-ingestion", daemon=True)
+                self._thread.start()
+
+    @property
+    def pending(self):
+        """Nombre de justificatifs en attente ou en cours de traitement."""
+        return self._pending
+
+    def poll_results(self):
+        """
+        Retourne les résultats disponibles sans bloquer : une liste de dictionnaires
+        {'conge_id', 'source_path', 'chemin', 'sha256', 'apercu', 'erreur'}.
+        """
+        results = []
+        while True:
+            try:
+                results.append(self._results.get_nowait())
+            except queue.Empty:
+                return results
+
+    def join(self):
+        """Attend que toutes les tâches soumises soient traitées (utile à la fermeture et aux tests)."""
+        self._jobs.join()
+
+    def _run(self):
+        db = DatabaseManager(self.db_path, interaction=InteractionHandler())
+        if not db.connect():
+            logging.error("Ingestion des certificats : connexion à la base impossible.")
+            return
+        try:
+            while True:
+                try:
+                    job = self._jobs.get(timeout=5)
+                except queue.Empty:
+                    with self._lock:
+                        if self._jobs.empty():
+                            self._thread = None
+                            return
+                    continue
+                try:
+                    self._results.put(self._ingest(db, *job))
+                finally:
+                    with self._lock:
+                        self._pending -= 1
+                    self._jobs.task_done()
+        finally:
+            db.close()
+
+    def _ingest(self, db, conge_id, source_path, chemins_a_liberer):
+        result = {'conge_id': conge_id, 'source_path': source_path, 'chemin': None, 'sha256': None, 'apercu': None, 'erreur': None}
+        chemin = None
+        try:
+            digest, chemin = self.store.ingest(source_path)
+            if _sha256_of(chemin) != digest:
+                raise IOError(f"Le fichier copié ne correspond pas à l'original ({os.path.basename(source_path)}).")
+            db.add_certificat(conge_id, chemin, digest)
+            result.update(chemin=chemin, sha256=digest)
+            logging.info(f"Certificat pour conge_id {conge_id} sauvegardé à {chemin}")
+        except Exception as e:
+            logging.error(f"Échec de l'ingestion du certificat pour conge_id {conge_id}: {e}", exc_info=True)
+            result['erreur'] = str(e)
+            # Le congé a pu être supprimé entre-temps : on ne garde pas un fichier orphelin.
+            if chemin and not db.count_certificat_references(chemin):
+                release_certificate_file(self.store, self.previews, chemin)
+            return result
+
+        if self.previews:
+            result['apercu'] = self.previews.ensure(digest, chemin)
+        for ancien in set(chemins_a_liberer):
+            if ancien != chemin and not db.count_certificat_references(ancien):
+                release_certificate_file(self.store, self.previews, ancien)
+        return result
+
+
+def _sha256_of(path, block_size=1024 * 1024):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
@@ -0,0 +1,144 @@
+# Fichier : core/conges/certificate_scanner.py
+# Analyse de cohérence entre la table certificats_medicaux et le dossier des certificats.
+#
+# Le dossier est parcouru avec os.scandir (jamais de stat fichier par fichier) et
+# confronté en une seule passe à l'ensemble de la table. L'analyse détecte :
+#   - les certificats dont le fichier a disparu (supprimé hors de l'application) ;
+#   - les fichiers orphelins, qui ne sont référencés par aucun certificat
+#     (reliquats d'une transaction annulée, d'une copie interrompue...).
+# La présence de chaque fichier est mémorisée dans certificats_medicaux.fichier_present.
+#
+# L'analyse est incrémentale : seuls les dossiers de fichiers modifiés depuis la dernière
+# analyse (date de modification du dossier > point de reprise) sont relus. Les dossiers
+# de premier niveau sont toujours listés, car l'ajout d'un fichier dans ab/cd/ ne modifie
+# pas la date de ab/.
+
+import logging
+import os
+import time
+
+from core.conges.certificate_ingestion import PreviewCache, release_certificate_file
+
+CHECKPOINT_KEY = 'certificats_scan_checkpoint'
+
+# Un fichier récent peut être en cours d'ingestion (copié mais pas encore enregistré) :
+# il n'est jamais supprimé avant ce délai.
+ORPHAN_GRACE_SECONDS = 3600
+
+# Dossiers du magasin qui ne contiennent pas de justificatifs.
+IGNORED_DIRS = {".previews"}
+TMP_DIR = "tmp"
+
+
+def _walk(root_dir, checkpoint):
+    """
+    Parcourt le dossier des certificats. Retourne (fichiers, dossiers_lus, dossiers_existants, temporaires)
+    où 'fichiers' associe le chemin absolu de chaque fichier listé à sa date de modification.
+    """
+    fichiers, dossiers_lus, dossiers_existants, temporaires = {}, set(), {root_dir}, {}
+    pile = [(root_dir, 0, True)]
+    while pile:
+        chemin, profondeur, a_lire = pile.pop()
+        with os.scandir(chemin) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if profondeur == 0 and entry.name in IGNORED_DIRS:
+                        continue
+                    if profondeur == 0 and entry.name == TMP_DIR:
+                        with os.scandir(entry.path) as tmp_entries:
+                            temporaires.update({e.path: e.stat().st_mtime for e in tmp_entries if e.is_file()})
+                        continue
+                    dossiers_existants.add(entry.path)
+                    modifie = checkpoint is None or entry.stat().st_mtime > checkpoint
+                    pile.append((entry.path, profondeur + 1, profondeur == 0 or modifie))
+                elif a_lire and entry.is_file(follow_symlinks=False):
+                    fichiers[entry.path] = entry.stat().st_mtime
+        if a_lire:
+            dossiers_lus.add(chemin)
+    return fichiers, dossiers_lus, dossiers_existants, temporaires
+
+
+def scan_certificats(db, store, repair=False, full=False):
+    """
+    Analyse la cohérence des certificats et met à jour la colonne fichier_present.
+
+    Avec repair=True :
+      - un certificat dont le fichier manque est relié au fichier de même empreinte s'il
+        existe dans le magasin, sinon il est supprimé (le congé redevient « sans justificatif ») ;
+      - les fichiers orphelins et temporaires plus anciens que ORPHAN_GRACE_SECONDS sont supprimés
+        (avec l'aperçu d'un contenu qui n'est plus conservé).
+    Avec full=True, tout le dossier est relu (le point de reprise est ignoré).
+    Retourne un rapport sous forme de dictionnaire.
+    """
+    debut = time.time()
+    checkpoint = None if full else float(db.get_config_value(CHECKPOINT_KEY, 0)) or None
+    root_dir = store.root_dir
+    fichiers, dossiers_lus, dossiers_existants, temporaires = _walk(root_dir, checkpoint)
+
+    presence, manquants, references = {}, [], set()
+    for cert_id, conge_id, chemin, sha256, present in db.get_certificats_index():
+        chemin_abs = os.path.abspath(chemin)
+        references.add(chemin_abs)
+        dossier = os.path.dirname(chemin_abs)
+        if dossier in dossiers_lus:
+            existe = chemin_abs in fichiers
+        elif os.path.relpath(chemin_abs, root_dir).startswith(os.pardir):
+            existe = os.path.exists(chemin_abs)  # fichier hors du dossier des certificats
+        elif dossier in dossiers_existants:
+            existe = bool(present)  # dossier inchangé depuis la dernière analyse
+        else:
+            existe = False
+        if existe != bool(present):
+            presence[cert_id] = existe
+        if not existe:
+            manquants.append({'certificat_id': cert_id, 'conge_id': conge_id, 'chemin': chemin, 'sha256': sha256})
+
+    orphelins = sorted(chemin for chemin in fichiers if chemin not in references)
+    rapport = {
+        'dossiers_analyses': len(dossiers_lus), 'fichiers_analyses': len(fichiers),
+        'manquants': manquants, 'orphelins': orphelins, 'temporaires': sorted(temporaires),
+        'certificats_relies': 0, 'certificats_supprimes': 0, 'fichiers_supprimes': 0,
+    }
+
+    try:
+        db.update_certificats_presence(presence)
+        if repair:
+            _repair(db, store, rapport, fichiers, temporaires, debut)
+        db.conn.commit()
+    except Exception:
+        db.conn.rollback()
+        raise
+
+    db.set_config_value(CHECKPOINT_KEY, debut)
+    logging.info(f"Analyse des certificats : {len(manquants)} manquant(s), {len(orphelins)} orphelin(s), "
+                 f"{len(dossiers_lus)} dossier(s) relu(s).")
+    return rapport
+
+
+def _repair(db, store, rapport, fichiers, temporaires, debut):
+    relies, a_supprimer = {}, []
+    for manquant in rapport['manquants']:
+        sha256 = manquant['sha256']
+        candidat = store.path_for(sha256, os.path.splitext(manquant['chemin'])[1]) if sha256 else None
+        if candidat and os.path.exists(candidat):
+            relies[manquant['certificat_id']] = candidat
+        else:
+            a_supprimer.append(manquant['certificat_id'])
+    db.relink_certificats(relies)
+    db.delete_certificats(a_supprimer)
+    rapport['certificats_relies'] = len(relies)
+    rapport['certificats_supprimes'] = len(a_supprimer)
+
+    limite = debut - ORPHAN_GRACE_SECONDS
+    previews = PreviewCache(store.root_dir)
+    encore_references = set(relies.values())
+    for chemin in rapport['orphelins']:
+        if fichiers[chemin] < limite and chemin not in encore_references and release_certificate_file(store, previews, chemin):
+            rapport['fichiers_supprimes'] += 1
+    for chemin, mtime in temporaires.items():
+        if mtime < limite:
+            try:
+                os.remove(chemin)
+                rapport['fichiers_supprimes'] += 1
+            except OSError as e:
+                logging.error(f"Erreur suppression fichier temporaire {chemin}: {e}")
@@ -0,0 +1,101 @@
+# Fichier : core/conges/certificate_store.py
+# Stockage des certificats médicaux adressé par contenu.
+#
+# Chaque fichier est rangé sous le nom de son empreinte SHA-256, dans des
+# sous-dossiers répartis selon les premiers caractères de l'empreinte :
+#
+#   <certificats>/ab/cd/abcd...<sha256>.pdf
+#
+# Un même justificatif rattaché plusieurs fois n'est donc stocké qu'une fois, et
+# aucun dossier ne contient plus de 256 entrées. Le comptage des références est
+# fait par la base (table certificats_medicaux) : un fichier n'est supprimé que
+# lorsque plus aucun certificat ne le référence (voir CongeManager).
+
+import hashlib
+import logging
+import os
+import tempfile
+
+
+class CertificateStore:
+    """Magasin de certificats dédupliqué, à répertoires fragmentés."""
+    # Taille des blocs lus lors de la copie (le fichier n'est jamais chargé en entier).
+    BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, root_dir):
+        self.root_dir = os.path.abspath(root_dir)
+        self.tmp_dir = os.path.join(self.root_dir, "tmp")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def path_for(self, digest, extension=""):
+        """Chemin de stockage d'un contenu d'empreinte 'digest'."""
+        return os.path.join(self.root_dir, digest[:2], digest[2:4], f"{digest}{extension.lower()}")
+
+    def contains(self, path):
+        """Indique si 'path' est un fichier rangé par le magasin (hors fichiers temporaires)."""
+        if not path:
+            return False
+        relative = os.path.relpath(os.path.abspath(path), self.root_dir)
+        parts = relative.split(os.sep)
+        return len(parts) == 3 and parts[0] != os.pardir and parts[0] != "tmp"
+
+    def digest_of(self, path):
+        """Empreinte d'un fichier rangé par le magasin (son nom), ou None pour un autre fichier."""
+        return os.path.splitext(os.path.basename(path))[0] if self.contains(path) else None
+
+    def has_content(self, digest):
+        """Indique si le magasin contient encore un fichier d'empreinte 'digest' (quelle que soit son extension)."""
+        directory = os.path.dirname(self.path_for(digest))
+        try:
+            return any(os.path.splitext(name)[0] == digest for name in os.listdir(directory))
+        except FileNotFoundError:
+            return False
+
+    def ingest(self, source_path):
+        """
+        Range 'source_path' dans le magasin et retourne (empreinte, chemin_stocké).
+        L'empreinte est calculée pendant la copie (une seule lecture du fichier), vers un
+        fichier temporaire renommé ensuite : le magasin ne contient jamais de fichier partiel.
+        Si le contenu est déjà présent, la copie temporaire est simplement abandonnée.
+        """
+        if self.contains(source_path):
+            return self.digest_of(source_path), os.path.abspath(source_path)
+
+        extension = os.path.splitext(source_path)[1].lower()
+        fd, temp_path = tempfile.mkstemp(dir=self.tmp_dir, suffix=extension)
+        sha256 = hashlib.sha256()
+        try:
+            with open(source_path, 'rb') as source, os.fdopen(fd, 'wb') as target:
+                for block in iter(lambda: source.read(self.BLOCK_SIZE), b''):
+                    sha256.update(block)
+                    target.write(block)
+
+            digest = sha256.hexdigest()
+            destination_path = self.path_for(digest, extension)
+            if os.path.exists(destination_path):
+                os.remove(temp_path)
+                logging.info(f"Certificat déjà présent dans le magasin : {destination_path}")
+            else:
+                os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+                os.replace(temp_path, destination_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return digest, destination_path
+
+    def discard(self, path):
+        """
+        Supprime un fichier du dossier des certificats (fichier du magasin ou ancien fichier
+        à plat). L'appelant doit avoir vérifié qu'il n'est plus référencé.
+        """
+        relative = os.path.relpath(os.path.abspath(path), self.root_dir)
+        if relative.startswith(os.pardir) or not os.path.isfile(path):
+            return False
+        try:
+            os.remove(path)
+            logging.info(f"Certificat non référencé supprimé : {path}")
+            return True
+        except OSError as e:
+            logging.error(f"Erreur suppression certificat {path}: {e}")
+            return False
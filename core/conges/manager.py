@@ -4,20 +4,62 @@
 import sqlite3
 import logging
 import os
-import shutil
-from datetime import datetime, timedelta
-from tkinter import messagebox
+import re
+from datetime import date, timedelta
 
-from utils.date_utils import get_holidays_set_for_period, jours_ouvres, validate_date
-from utils.config_loader import CONFIG
+from utils.date_utils import get_holidays_set_for_period, jours_ouvres, validate_date, format_date_for_display, calculate_reprise_date
+from utils.config_loader import get_settings
 from db.models import Conge
 from core.constants import SoldeStatus
+from core.interaction import get_interaction_handler
+from core.events import EventBus, EventType
+from core.conges.availability import AvailabilityEngine
+from core.conges.certificate_store import CertificateStore
+from core.conges.certificate_ingestion import CertificateIngestionQueue, PreviewCache, release_certificate_file
+from core.conges.certificate_scanner import scan_certificats
+from core.conges.strategies import STRATEGIES
 
 class CongeManager:
-    def __init__(self, db_manager, certificats_dir):
+    def __init__(self, db_manager, certificats_dir, interaction=None):
         self.db = db_manager
         self.certificats_dir = certificats_dir
-        os.makedirs(self.certificats_dir, exist_ok=True)
+        self._interaction = interaction
+        self.availability = AvailabilityEngine(db_manager)
+        self.certificats = CertificateStore(certificats_dir)
+        self.previews = PreviewCache(certificats_dir)
+        self.ingestion = None
+        # Chaque écriture validée est publiée sur ce bus (voir core/events.py).
+        self.events = EventBus()
+        self.events.subscribe(lambda event: self.availability.invalidate(),
+                              EventType.AGENT_CREATED, EventType.AGENT_UPDATED, EventType.AGENT_DELETED,
+                              EventType.CONGE_CREATED, EventType.CONGE_DELETED, EventType.DATA_RELOADED)
+
+    @property
+    def interaction(self):
+        """Gestionnaire des confirmations/notifications (par défaut, celui installé pour l'application)."""
+        return self._interaction or get_interaction_handler()
+
+    def start_certificate_ingestion(self):
+        """
+        Active l'ingestion des justificatifs en arrière-plan (application graphique) : la
+        copie, la vérification et l'aperçu sont faits par un thread de travail disposant
+        de sa propre connexion. Sans appel à cette méthode, l'ingestion reste synchrone.
+        """
+        if self.ingestion is None:
+            self.ingestion = CertificateIngestionQueue(self.db.get_db_path(), self.certificats, self.previews)
+        return self.ingestion
+
+    def poll_certificate_ingestion(self):
+        """Récupère les justificatifs traités en arrière-plan et publie les certificats enregistrés."""
+        results = self.ingestion.poll_results() if self.ingestion else []
+        enregistres = {result['conge_id'] for result in results if not result['erreur']}
+        if enregistres:
+            self.events.emit(EventType.CERTIFICAT_CHANGED, conge_ids=enregistres)
+        return results
+
+    def _emit_conge(self, event_type, conge):
+        self.events.emit(event_type, conge_id=conge.id, agent_id=conge.agent_id, interim_id=conge.interim_id,
+                         type_conge=conge.type_conge, date_debut=conge.date_debut, date_fin=conge.date_fin)
 
     def get_annee_exercice(self):
         return self.db.get_annee_exercice()
@@ -28,7 +70,7 @@ class CongeManager:
             annee_actuelle = self.get_annee_exercice()
             nouvelle_annee = annee_actuelle + 1
             annee_a_expirer = annee_actuelle - 2
-            solde_initial = float(CONFIG['conges'].get('solde_annuel_par_defaut', 22.0))
+            solde_initial = get_settings().conges.solde_annuel_par_defaut
             all_agents = self.get_all_agents()
             for agent in all_agents:
                 self.db.execute_query("INSERT INTO soldes_annuels (agent_id, annee, solde, statut) VALUES (?, ?, ?, ?)",
@@ -37,6 +79,7 @@ class CongeManager:
                                       (SoldeStatus.EXPIRE, agent.id, annee_a_expirer))
             self.db.set_annee_exercice(nouvelle_annee)
             self.db.conn.commit()
+            self.events.emit(EventType.DATA_RELOADED)
             return True
         except sqlite3.Error as e:
             self.db.conn.rollback()
@@ -49,6 +92,7 @@ class CongeManager:
     def apurer_soldes(self, solde_ids):
         try:
             self.db.apurer_soldes_by_ids(solde_ids)
+            self.events.emit(EventType.DATA_RELOADED)
             return True
         except sqlite3.Error as e:
             logging.error(f"Échec de l'apurement des soldes : {e}", exc_info=True)
@@ -71,6 +115,7 @@ class CongeManager:
                     self.db.create_solde_annuel(agent_id, year, value, statut)
 
             self.db.conn.commit()
+            self.events.emit(EventType.SOLDES_CHANGED, agent_ids={agent_id})
             return True
         except sqlite3.Error as e:
             self.db.conn.rollback()
@@ -87,6 +132,9 @@ class CongeManager:
     def get_agent_by_id(self, agent_id):
         return self.db.get_agent_by_id(agent_id)
 
+    def get_agents_by_ids(self, agent_ids):
+        return self.db.get_agents_by_ids(agent_ids)
+
     def get_all_conges(self):
         return self.db.get_conges()
 
@@ -99,12 +147,33 @@ class CongeManager:
     def get_certificat_for_conge(self, conge_id):
         return self.db.get_certificat_for_conge(conge_id)
 
+    def get_certificats_for_agent(self, agent_id):
+        return self.db.get_certificats_for_agent(agent_id)
+
+    def scan_certificats(self, repair=False, full=False):
+        """Analyse (et répare si demandé) la cohérence entre les certificats et leurs fichiers."""
+        return scan_certificats(self.db, self.certificats, repair=repair, full=full)
+
+    def get_certificat_preview(self, conge_id):
+        """Chemin de l'aperçu (PNG) du justificatif d'un congé s'il est en cache, sinon None."""
+        cert = self.db.get_certificat_for_conge(conge_id)
+        return self.previews.get(cert[3]) if cert else None
+
     def get_holidays_for_year(self, year):
         return self.db.get_holidays_for_year(year)
 
+    def get_agents_disponibles(self, start_date, end_date, exclude_id=None):
+        agents = self.availability.get_available_agents(start_date, end_date)
+        if exclude_id is None:
+            return list(agents)
+        return [a for a in agents if a.id != exclude_id]
+
     def get_sick_leaves_by_status(self, status, search_term=None):
         return self.db.get_sick_leaves_by_status(status, search_term)
 
+    def count_sick_leaves_by_status(self):
+        return self.db.count_sick_leaves_by_status()
+
     def get_holidays_set_for_period(self, start_year, end_year):
         return get_holidays_set_for_period(self.db, start_year, end_year)
 
@@ -112,13 +181,19 @@ class CongeManager:
         return self.db.get_agents_on_leave_today()
 
     def add_holiday(self, date_sql, name, h_type):
-        return self.db.add_holiday(date_sql, name, h_type)
+        result = self.db.add_holiday(date_sql, name, h_type)
+        self.events.emit(EventType.HOLIDAYS_CHANGED)
+        return result
 
     def delete_holiday(self, date_sql):
-        return self.db.delete_holiday(date_sql)
+        result = self.db.delete_holiday(date_sql)
+        self.events.emit(EventType.HOLIDAYS_CHANGED)
+        return result
 
     def add_or_update_holiday(self, date_sql, name, h_type):
-        return self.db.add_or_update_holiday(date_sql, name, h_type)
+        result = self.db.add_or_update_holiday(date_sql, name, h_type)
+        self.events.emit(EventType.HOLIDAYS_CHANGED)
+        return result
 
     # --- Logique de gestion des soldes ---
     def _debiter_solde(self, agent_id, jours_a_prendre):
@@ -155,11 +230,11 @@ class CongeManager:
         soldes_actifs = sorted([s for s in agent.soldes_annuels if s.statut == SoldeStatus.ACTIF], key=lambda s: s.annee, reverse=True)
         
         jours_restants_a_rendre = float(jours_a_rendre)
+        solde_max_annee = get_settings().conges.solde_annuel_par_defaut
         for solde_annuel in soldes_actifs:
             if jours_restants_a_rendre < 0.001:
                 break
             
-            solde_max_annee = float(CONFIG['conges'].get('solde_annuel_par_defaut', 22.0))
             jours_pouvant_etre_rendus = solde_max_annee - solde_annuel.solde
             jours_a_ajouter = min(jours_restants_a_rendre, jours_pouvant_etre_rendus)
             
@@ -180,7 +255,11 @@ class CongeManager:
         agent = self.get_agent_by_id(agent_id)
         if not agent:
             return {}
+        return self._calculer_deduction(agent, jours_a_prendre)
 
+    @staticmethod
+    def _calculer_deduction(agent, jours_a_prendre):
+        """Répartition par année (de la plus ancienne à la plus récente) des jours à déduire des soldes actifs de l'agent."""
         jours_restants_a_deduire = float(jours_a_prendre)
         deduction_details = {}
         soldes_actifs_tries = sorted([s for s in agent.soldes_annuels if s.statut == SoldeStatus.ACTIF], key=lambda s: s.annee)
@@ -198,10 +277,94 @@ class CongeManager:
         
         return deduction_details
 
+    # --- Décisions de congé ---
+    @staticmethod
+    def get_decision_template_path(templates_dir, grade, fmt="docx"):
+        """
+        Chemin du modèle de décision d'un grade (ex. 'Adjoint Technique' -> adjoint_technique.docx).
+        En PDF, c'est le gabarit texte du grade (adjoint_technique.txt) s'il existe, sinon None
+        (le gabarit par défaut de utils/pdf_utils.py est alors utilisé).
+        """
+        base = os.path.join(templates_dir, grade.lower().replace(' ', '_'))
+        if fmt == "pdf":
+            return f"{base}.txt" if os.path.exists(f"{base}.txt") else None
+        return f"{base}.docx"
+
+    @staticmethod
+    def get_decision_filename(agent, conge, fmt="docx"):
+        """Nom de fichier unique d'une décision générée par lot."""
+        nom = re.sub(r"[^\w\-]+", "_", f"{agent.nom}_{agent.ppr}")
+        return f"Decision_Conge_{nom}_{conge.date_debut.strftime('%Y-%m-%d')}_{conge.id}.{fmt}"
+
+    def build_decision_context(self, agent, conge, holidays_set=None):
+        """Valeurs des balises {{...}} du modèle de décision pour un congé."""
+        details_solde_str = ""
+        if conge.type_conge == "Congé annuel":
+            details = self._calculer_deduction(agent, conge.jours_pris) if conge.jours_pris > 0 else {}
+            parts = [f"{int(round(days))} {'jour' if int(round(days)) == 1 else 'jours'} au titre de l'année {year}" for year, days in sorted(details.items())]
+            details_solde_str = " et ".join(parts)
+
+        if holidays_set is None:
+            holidays_set = self.get_holidays_set_for_period(conge.date_fin.year, conge.date_fin.year + 1)
+        date_reprise = calculate_reprise_date(conge.date_fin, holidays_set)
+
+        return {
+            "{{nom_complet}}": f"{agent.nom} {agent.prenom}", "{{grade}}": agent.grade, "{{ppr}}": agent.ppr,
+            "{{type_conge}}": conge.type_conge,
+            "{{date_debut}}": format_date_for_display(conge.date_debut), "{{date_fin}}": format_date_for_display(conge.date_fin),
+            "{{date_reprise}}": format_date_for_display(date_reprise) if date_reprise else "N/A",
+            "{{jours_pris}}": str(conge.jours_pris), "{{details_solde}}": details_solde_str,
+            "{{date_aujourdhui}}": date.today().strftime("%d/%m/%Y")
+        }
+
+    def get_conges_between(self, start_date, end_date, type_conge=None):
+        return self.db.get_conges_between(start_date, end_date, type_conge)
+
+    def prepare_decision_jobs(self, conge_ids, templates_dir, fmt="docx"):
+        """
+        Prépare la génération par lot des décisions : agents, soldes et jours fériés sont
+        chargés en une fois pour tout le lot. Retourne (jobs, erreurs) où 'jobs' est la
+        liste attendue par utils.decisions.generate_decisions_batch et 'erreurs' la liste
+        des (conge_id, message) des congés écartés. 'fmt' vaut "docx" ou "pdf" ; en PDF,
+        aucun modèle Word n'est nécessaire.
+        """
+        if fmt not in ("docx", "pdf"):
+            raise ValueError(f"Format de décision inconnu : {fmt}")
+        conges = self.db.get_conges_by_ids(conge_ids)
+        trouves = {c.id for c in conges}
+        erreurs = [(conge_id, "Congé introuvable.") for conge_id in conge_ids if conge_id not in trouves]
+        if not conges:
+            return [], erreurs
+
+        agents = self.db.get_agents_by_ids({c.agent_id for c in conges})
+        holidays_set = self.get_holidays_set_for_period(min(c.date_fin.year for c in conges), max(c.date_fin.year for c in conges) + 1)
+        modeles = {}
+        jobs = []
+        for conge in conges:
+            agent = agents.get(conge.agent_id)
+            if not agent:
+                erreurs.append((conge.id, "Agent introuvable."))
+                continue
+            if agent.grade not in modeles:
+                template_path = self.get_decision_template_path(templates_dir, agent.grade, fmt)
+                modeles[agent.grade] = (template_path, fmt == "pdf" or os.path.exists(template_path))
+            template_path, disponible = modeles[agent.grade]
+            if not disponible:
+                erreurs.append((conge.id, f"Modèle introuvable pour le grade '{agent.grade}' : {template_path}"))
+                continue
+            jobs.append({
+                'conge_id': conge.id, 'template_path': template_path,
+                'filename': self.get_decision_filename(agent, conge, fmt),
+                'context': self.build_decision_context(agent, conge, holidays_set),
+            })
+        return jobs, erreurs
+
     # --- Logique de gestion des agents et congés ---
     def save_agent(self, agent_data, is_modification=False):
         if is_modification:
-            return self.db.modifier_agent(agent_data['id'], agent_data['nom'], agent_data['prenom'], agent_data['ppr'], agent_data['grade'])
+            result = self.db.modifier_agent(agent_data['id'], agent_data['nom'], agent_data['prenom'], agent_data['ppr'], agent_data['grade'])
+            self.events.emit(EventType.AGENT_UPDATED, agent_id=agent_data['id'])
+            return result
         else:
             try:
                 agent_id = self.db.ajouter_agent(agent_data['nom'], agent_data['prenom'], agent_data['ppr'], agent_data['grade'])
@@ -211,7 +374,7 @@ class CongeManager:
                 soldes_initiaux = agent_data.get('soldes', {})
                 if not soldes_initiaux:
                     annee_exercice = self.get_annee_exercice()
-                    solde_defaut = float(CONFIG['conges'].get('solde_annuel_par_defaut', 22.0))
+                    solde_defaut = get_settings().conges.solde_annuel_par_defaut
                     if solde_defaut > 0:
                          soldes_initiaux[annee_exercice] = solde_defaut
                 
@@ -219,13 +382,16 @@ class CongeManager:
                     if solde_val > 0:
                         self.db.execute_query("INSERT INTO soldes_annuels (agent_id, annee, solde, statut) VALUES (?, ?, ?, ?)", 
                                               (agent_id, annee, solde_val, SoldeStatus.ACTIF))
+                self.events.emit(EventType.AGENT_CREATED, agent_id=agent_id)
                 return agent_id
             except sqlite3.Error as e:
                 logging.error(f"Échec de la sauvegarde de l'agent (transaction externe) : {e}")
                 raise e
 
     def delete_agent(self, agent_id):
-        return self.db.supprimer_agent(agent_id)
+        result = self.db.supprimer_agent(agent_id)
+        self.events.emit(EventType.AGENT_DELETED, agent_id=agent_id)
+        return result
 
     def handle_conge_submission(self, form_data, is_modification):
         try:
@@ -235,6 +401,7 @@ class CongeManager:
                 raise ValueError("Dates ou type de congé invalides")
 
             conge_id_exclu = form_data.get('conge_id') if is_modification else None
+            self._check_interim_disponible(form_data, start_date, end_date)
             overlaps = self.db.get_overlapping_leaves(form_data['agent_id'], start_date, end_date, conge_id_exclu)
             
             if overlaps:
@@ -242,7 +409,7 @@ class CongeManager:
                 if len(annual_overlaps) != len(overlaps):
                     raise ValueError("Chevauchement invalide. Vous ne pouvez remplacer que des congés de type 'Congé annuel'.")
                 
-                if messagebox.askyesno("Confirmation", "Ce congé chevauche un ou plusieurs congés annuels existants.\nVoulez-vous les remplacer ?", master=form_data.get('parent_form')):
+                if self.interaction.confirm("Confirmation", "Ce congé chevauche un ou plusieurs congés annuels existants.\nVoulez-vous les remplacer ?", parent=form_data.get('parent_form')):
                     return self._split_or_replace_leaves(annual_overlaps, form_data)
                 else:
                     return False
@@ -251,22 +418,37 @@ class CongeManager:
             agent_id = form_data['agent_id']
             jours_pris = form_data['jours_pris']
             type_conge = form_data['type_conge']
+            types_decompte = get_settings().conges.types_decompte_solde
+            certificats_liberes = []
+            old_conge = None
+            soldes_modifies = False
             
             if is_modification:
                 old_conge = self.get_conge_by_id(form_data['conge_id'])
-                if old_conge and old_conge.type_conge in CONFIG['conges']['types_decompte_solde']:
+                if old_conge and old_conge.type_conge in types_decompte:
                     self._crediter_solde(old_conge.agent_id, old_conge.jours_pris)
+                    soldes_modifies = True
+                certificats_liberes = self._get_chemins_certificats([form_data['conge_id']])
                 self.db.supprimer_conge(form_data['conge_id'])
 
-            if type_conge in CONFIG['conges']['types_decompte_solde']:
+            if type_conge in types_decompte:
                 self._debiter_solde(agent_id, jours_pris)
+                soldes_modifies = True
 
             conge_model = Conge(id=None, agent_id=agent_id, type_conge=type_conge, justif=form_data.get('justif'), interim_id=form_data.get('interim_id'), date_debut=start_date.strftime('%Y-%m-%d'), date_fin=end_date.strftime('%Y-%m-%d'), jours_pris=jours_pris)
             new_conge_id = self.db.ajouter_conge(conge_model)
+            conge_model.id = new_conge_id
             self.db.conn.commit()
 
+            if old_conge:
+                self._emit_conge(EventType.CONGE_DELETED, old_conge)
+            self._emit_conge(EventType.CONGE_CREATED, conge_model)
+            if soldes_modifies:
+                self.events.emit(EventType.SOLDES_CHANGED, agent_ids={agent_id} | ({old_conge.agent_id} if old_conge else set()))
+
             if new_conge_id and type_conge == "Congé de maladie": 
-                self._handle_certificat_save(form_data, new_conge_id)
+                certificats_liberes = self._handle_certificat_save(form_data, new_conge_id, certificats_liberes)
+            self._liberer_certificats(certificats_liberes)
             return True
 
         except (ValueError, sqlite3.Error) as e:
@@ -279,6 +461,15 @@ class CongeManager:
             logging.error(f"Erreur inattendue soumission congé: {e}", exc_info=True)
             raise e
 
+    def _check_interim_disponible(self, form_data, start_date, end_date):
+        interim_id = form_data.get('interim_id')
+        if not interim_id:
+            return
+        if interim_id == form_data['agent_id']:
+            raise ValueError("L'agent ne peut pas être son propre intérimaire.")
+        if not self.availability.is_available(interim_id, start_date, end_date):
+            raise ValueError("L'intérimaire sélectionné est lui-même en congé sur cette période.")
+
     def _split_or_replace_leaves(self, annual_overlaps, form_data):
         self.db.conn.execute('BEGIN TRANSACTION')
         try:
@@ -287,6 +478,7 @@ class CongeManager:
             agent_id = form_data['agent_id']
             holidays_set = self.get_holidays_set_for_period(new_start.year - 1, new_end.year + 2)
 
+            certificats_liberes = self._get_chemins_certificats([c.id for c in annual_overlaps])
             for conge in annual_overlaps:
                 self._crediter_solde(agent_id, conge.jours_pris)
                 self.db.supprimer_conge(conge.id)
@@ -294,34 +486,179 @@ class CongeManager:
             type_conge = form_data['type_conge']
             new_conge_model = Conge(id=None, agent_id=agent_id, type_conge=type_conge, justif=form_data.get('justif'), interim_id=form_data.get('interim_id'), date_debut=new_start.strftime('%Y-%m-%d'), date_fin=new_end.strftime('%Y-%m-%d'), jours_pris=form_data['jours_pris'])
             
-            if type_conge in CONFIG['conges']['types_decompte_solde']:
+            if type_conge in get_settings().conges.types_decompte_solde:
                 self._debiter_solde(agent_id, new_conge_model.jours_pris)
             new_conge_id = self.db.ajouter_conge(new_conge_model)
+            new_conge_model.id = new_conge_id
+            crees = [new_conge_model]
 
             min_start_date = min(c.date_debut for c in annual_overlaps)
             max_end_date = max(c.date_fin for c in annual_overlaps)
 
             if min_start_date < new_start:
-                self._create_leave_segment(agent_id, min_start_date, new_start - timedelta(days=1), holidays_set)
+                crees.append(self._create_leave_segment(agent_id, min_start_date, new_start - timedelta(days=1), holidays_set))
             if max_end_date > new_end:
-                self._create_leave_segment(agent_id, new_end + timedelta(days=1), max_end_date, holidays_set)
+                crees.append(self._create_leave_segment(agent_id, new_end + timedelta(days=1), max_end_date, holidays_set))
 
             self.db.conn.commit()
+            for conge in annual_overlaps:
+                self._emit_conge(EventType.CONGE_DELETED, conge)
+            for conge in crees:
+                if conge:
+                    self._emit_conge(EventType.CONGE_CREATED, conge)
+            self.events.emit(EventType.SOLDES_CHANGED, agent_ids={agent_id})
             if new_conge_id and type_conge == "Congé de maladie": 
-                self._handle_certificat_save(form_data, new_conge_id)
+                certificats_liberes = self._handle_certificat_save(form_data, new_conge_id, certificats_liberes)
+            self._liberer_certificats(certificats_liberes)
             return True
         except (ValueError, sqlite3.Error) as e:
             self.db.conn.rollback()
             raise e
 
     def _create_leave_segment(self, agent_id, start_date, end_date, holidays_set):
+        """Crée le congé annuel restant sur [start_date, end_date] et le retourne (None s'il ne compte aucun jour)."""
         if start_date > end_date:
-            return
+            return None
         jours = jours_ouvres(start_date, end_date, holidays_set)
         if jours > 0:
             self._debiter_solde(agent_id, jours)
             segment = Conge(None, agent_id, 'Congé annuel', None, None, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'), jours)
-            self.db.ajouter_conge(segment)
+            segment.id = self.db.ajouter_conge(segment)
+            return segment
+        return None
+
+    # --- Soumission de congés par lot (sans interface) ---
+    def submit_conges_batch(self, demandes):
+        """
+        Enregistre un lot de congés sans aucune interaction utilisateur.
+
+        Toutes les demandes sont validées contre un seul calendrier de jours fériés et un
+        seul instantané des soldes. Les chevauchements (avec l'existant ou à l'intérieur
+        du lot) sont rejetés : aucun remplacement n'est effectué. Les demandes valides sont
+        enregistrées en une seule transaction ; les demandes rejetées n'empêchent pas les autres.
+
+        Chaque demande suit le format de form_data : 'agent_id', 'type_conge', 'date_debut',
+        'date_fin' et, optionnellement, 'jours_pris' (calculé par la stratégie du type si absent),
+        'justif', 'interim_id', 'cert_path', 'agent_ppr'.
+
+        Retourne un rapport par demande, dans l'ordre du lot :
+        {'index', 'statut' ('accepte' ou 'rejete'), 'conge_id', 'jours_pris', 'erreur'}.
+        """
+        rapports = [{'index': i, 'statut': 'rejete', 'conge_id': None, 'jours_pris': None, 'erreur': None}
+                    for i in range(len(demandes))]
+        if not demandes:
+            return rapports
+
+        periodes = [(validate_date(d.get('date_debut')), validate_date(d.get('date_fin'))) for d in demandes]
+        annees = [date.year for periode in periodes for date in periode if date]
+        holidays_set = self.get_holidays_set_for_period(min(annees), max(annees)) if annees else set()
+
+        ids_concernes = {d.get('agent_id') for d in demandes} | {d.get('interim_id') for d in demandes if d.get('interim_id')}
+        agents = self.db.get_agents_by_ids(i for i in ids_concernes if i is not None)
+        soldes_actifs = {
+            agent_id: sorted([s for s in agent.soldes_annuels if s.statut == SoldeStatus.ACTIF], key=lambda s: s.annee)
+            for agent_id, agent in agents.items()
+        }
+
+        periodes_acceptees = {}  # agent_id -> [(debut, fin, index)]
+        soldes_a_mettre_a_jour = {}
+        acceptees = []
+        types_decompte = get_settings().conges.types_decompte_solde
+        for index, (demande, (start_date, end_date)) in enumerate(zip(demandes, periodes)):
+            try:
+                jours_pris = self._valider_demande_du_lot(demande, start_date, end_date, agents, holidays_set, periodes_acceptees)
+                if demande['type_conge'] in types_decompte:
+                    self._planifier_debit(soldes_actifs[demande['agent_id']], jours_pris, soldes_a_mettre_a_jour)
+            except ValueError as e:
+                rapports[index]['erreur'] = str(e)
+                continue
+
+            periodes_acceptees.setdefault(demande['agent_id'], []).append((start_date, end_date, index))
+            rapports[index]['jours_pris'] = jours_pris
+            acceptees.append((index, Conge(id=None, agent_id=demande['agent_id'], type_conge=demande['type_conge'], justif=demande.get('justif'),
+                                           interim_id=demande.get('interim_id'), date_debut=start_date.strftime('%Y-%m-%d'),
+                                           date_fin=end_date.strftime('%Y-%m-%d'), jours_pris=jours_pris)))
+
+        if not acceptees:
+            return rapports
+
+        self.db.conn.execute('BEGIN TRANSACTION')
+        try:
+            self.db.update_soldes_batch(soldes_a_mettre_a_jour)
+            conge_ids = self.db.ajouter_conges_batch([conge for _, conge in acceptees])
+            self.db.conn.commit()
+        except sqlite3.Error as e:
+            self.db.conn.rollback()
+            logging.error(f"Échec de l'enregistrement du lot de congés : {e}", exc_info=True)
+            raise e
+
+        for (index, conge), conge_id in zip(acceptees, conge_ids):
+            conge.id = conge_id
+            self._emit_conge(EventType.CONGE_CREATED, conge)
+        if soldes_a_mettre_a_jour:
+            self.events.emit(EventType.SOLDES_CHANGED, agent_ids={conge.agent_id for _, conge in acceptees if conge.type_conge in types_decompte})
+
+        for (index, conge), conge_id in zip(acceptees, conge_ids):
+            rapports[index]['statut'] = 'accepte'
+            rapports[index]['conge_id'] = conge_id
+            if conge.type_conge == "Congé de maladie":
+                self._handle_certificat_save(demandes[index], conge_id)
+        return rapports
+
+    def _valider_demande_du_lot(self, demande, start_date, end_date, agents, holidays_set, periodes_acceptees):
+        """Valide une demande du lot et retourne le nombre de jours pris. Lève ValueError si elle est rejetée."""
+        agent_id = demande.get('agent_id')
+        type_conge = demande.get('type_conge')
+        if agent_id not in agents:
+            raise ValueError(f"Agent introuvable (id={agent_id}).")
+        if type_conge not in STRATEGIES:
+            raise ValueError(f"Type de congé inconnu : '{type_conge}'.")
+        if not start_date or not end_date or end_date < start_date:
+            raise ValueError("Dates invalides.")
+
+        jours_pris = demande.get('jours_pris')
+        if jours_pris is None:
+            jours_pris = STRATEGIES[type_conge].calculate_days(start_date, end_date, holidays_set)
+        jours_pris = int(jours_pris)
+
+        interim_id = demande.get('interim_id')
+        if interim_id:
+            if interim_id == agent_id:
+                raise ValueError("L'agent ne peut pas être son propre intérimaire.")
+            if interim_id not in agents:
+                raise ValueError(f"Intérimaire introuvable (id={interim_id}).")
+            en_conge_dans_le_lot = any(debut <= end_date and start_date <= fin for debut, fin, _ in periodes_acceptees.get(interim_id, []))
+            if en_conge_dans_le_lot or not self.availability.is_available(interim_id, start_date, end_date):
+                raise ValueError("L'intérimaire sélectionné est lui-même en congé sur cette période.")
+
+        if self.db.get_overlapping_leaves(agent_id, start_date, end_date):
+            raise ValueError("Chevauchement avec un congé existant.")
+        for debut, fin, autre_index in periodes_acceptees.get(agent_id, []):
+            if debut <= end_date and start_date <= fin:
+                raise ValueError(f"Chevauchement avec la demande n°{autre_index} du lot.")
+        return jours_pris
+
+    @staticmethod
+    def _planifier_debit(soldes_actifs, jours_a_prendre, updates):
+        """
+        Débite l'instantané des soldes (du plus ancien au plus récent) et reporte les
+        nouvelles valeurs dans 'updates'. Lève ValueError si le solde est insuffisant.
+        """
+        if jours_a_prendre <= 0:
+            return
+        solde_total = sum(s.solde for s in soldes_actifs)
+        if solde_total < jours_a_prendre:
+            raise ValueError(f"Solde total insuffisant ({solde_total}j) pour décompter {jours_a_prendre}j.")
+
+        jours_restants_a_debiter = float(jours_a_prendre)
+        for solde_annuel in soldes_actifs:
+            if jours_restants_a_debiter < 0.001:
+                break
+            jours_pris_sur_ce_solde = min(solde_annuel.solde, jours_restants_a_debiter)
+            if jours_pris_sur_ce_solde > 0:
+                solde_annuel.solde -= jours_pris_sur_ce_solde
+                updates[solde_annuel.id] = solde_annuel.solde
+                jours_restants_a_debiter -= jours_pris_sur_ce_solde
 
     def delete_conge(self, conge_id):
         conge = self.get_conge_by_id(conge_id)
@@ -330,38 +667,69 @@ class CongeManager:
         
         self.db.conn.execute('BEGIN TRANSACTION')
         try:
-            if conge.type_conge in CONFIG['conges']['types_decompte_solde']:
+            decompte = conge.type_conge in get_settings().conges.types_decompte_solde
+            if decompte:
                 self._crediter_solde(conge.agent_id, conge.jours_pris)
             
+            certificats_liberes = self._get_chemins_certificats([conge_id])
             self.db.supprimer_conge(conge_id)
             self.db.conn.commit()
+            self._emit_conge(EventType.CONGE_DELETED, conge)
+            if decompte:
+                self.events.emit(EventType.SOLDES_CHANGED, agent_ids={conge.agent_id})
+            self._liberer_certificats(certificats_liberes)
             return True
         except (ValueError, sqlite3.Error) as e:
             self.db.conn.rollback()
             raise e
             
-    def _handle_certificat_save(self, form_data, conge_id):
+    def _handle_certificat_save(self, form_data, conge_id, certificats_liberes=()):
+        """
+        Rattache le justificatif du formulaire au congé. Retourne les anciens fichiers
+        qui peuvent être libérés immédiatement : avec l'ingestion en arrière-plan, leur
+        libération est confiée à la file, après l'enregistrement du nouveau certificat.
+        """
         source_path = form_data.get('cert_path')
         if not source_path or not os.path.exists(source_path):
-            return
+            return certificats_liberes
 
-        try:
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-            agent_ppr = form_data.get('agent_ppr', 'unknown')
-            _, extension = os.path.splitext(source_path)
-            safe_filename = f"{timestamp}_{agent_ppr}_{conge_id}{extension}"
-            
-            destination_path = os.path.join(self.certificats_dir, safe_filename)
+        if self.ingestion:
+            self.ingestion.submit(conge_id, source_path, certificats_liberes)
+            return []
 
-            shutil.copy2(source_path, destination_path)
-            self.db.add_certificat(conge_id, destination_path)
+        try:
+            digest, destination_path = self.certificats.ingest(source_path)
+            self.db.add_certificat(conge_id, destination_path, digest)
             logging.info(f"Certificat pour conge_id {conge_id} sauvegardé à {destination_path}")
+            self.events.emit(EventType.CERTIFICAT_CHANGED, conge_ids={conge_id})
+            return certificats_liberes
 
         except Exception as e:
             logging.error(f"Échec de la sauvegarde du certificat pour conge_id {conge_id}: {e}", exc_info=True)
-            messagebox.showwarning("Erreur de Justificatif", 
+            self.interaction.warning("Erreur de Justificatif",
                 "Le congé a été créé, mais une erreur est survenue lors de la sauvegarde du fichier justificatif.\n"
-                f"Veuillez le rattacher manuellement en modifiant le congé.\n\nErreur: {e}")
+                f"Veuillez le rattacher manuellement en modifiant le congé.\n\nErreur: {e}", parent=form_data.get('parent_form'))
+            # L'ancien fichier peut être la source qui vient d'échouer : on le conserve.
+            return []
+
+    def _get_chemins_certificats(self, conge_ids):
+        """Chemins des justificatifs rattachés aux congés (à relever avant leur suppression)."""
+        chemins = []
+        for conge_id in conge_ids:
+            cert = self.db.get_certificat_for_conge(conge_id)
+            if cert and cert[2]:
+                chemins.append(cert[2])
+        return chemins
+
+    def _liberer_certificats(self, chemins):
+        """
+        Supprime les fichiers justificatifs qui ne sont plus référencés par aucun certificat,
+        avec leurs aperçus. À appeler uniquement après validation de la transaction : un
+        rollback ne doit jamais laisser un certificat pointer vers un fichier supprimé.
+        """
+        for chemin in set(chemins):
+            if not self.db.count_certificat_references(chemin):
+                release_certificate_file(self.certificats, self.previews, chemin)
 
     def find_inconsistent_annual_leaves(self, year):
         inconsistencies = []
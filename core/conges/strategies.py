@@ -3,11 +3,11 @@
 # vers la méthode configure_ui pour éviter les erreurs au démarrage.
 
 from abc import ABC, abstractmethod
-from datetime import timedelta
+from datetime import datetime, timedelta
 import os
 
 from utils.date_utils import jours_ouvres
-from utils.config_loader import CONFIG
+from utils.config_loader import get_settings
 
 class CongeStrategy(ABC):
     """Interface de base pour toutes les stratégies de congés."""
@@ -33,9 +33,9 @@ class CongeStrategy(ABC):
         form.cert_frame.pack(fill="x", pady=10)
         if form.is_modification:
             cert = form.manager.get_certificat_for_conge(form.conge_id)
-            if cert and cert[4]: # cert[4] is the file path
-                form.original_cert_path = cert[4]
-                form.cert_path_var.set(cert[4])
+            if cert and cert[2] and cert[4]: # cert[2] : chemin du fichier, cert[4] : fichier présent
+                form.original_cert_path = cert[2]
+                form.cert_path_var.set(cert[2])
         self._update_certificat_display(form)
 
     def _update_certificat_display(self, form):
@@ -67,7 +67,8 @@ class CongeAnnuelStrategy(CongeStrategy):
         temp_date = start_date
         days_counted = 0
         while days_counted < days_to_add:
-            if temp_date.weekday() < 5 and temp_date.date() not in holidays_set:
+            day = temp_date.date() if isinstance(temp_date, datetime) else temp_date
+            if day.weekday() < 5 and day not in holidays_set:
                 days_counted += 1
             if days_counted < days_to_add:
                 temp_date += timedelta(days=1)
@@ -102,7 +103,7 @@ class CongeMaterniteStrategy(CongeCalendaireStrategy):
 
     def configure_ui(self, form):
         # On lit la valeur de CONFIG seulement maintenant, c'est sûr.
-        self.days_value = str(CONFIG['conges']['maternite_duree'])
+        self.days_value = str(get_settings().conges.maternite_duree)
         super().configure_ui(form)
 
 class CongePaterniteStrategy(CongeCalendaireStrategy):
@@ -115,5 +116,16 @@ class CongePaterniteStrategy(CongeCalendaireStrategy):
     
     def configure_ui(self, form):
         # On lit la valeur de CONFIG seulement maintenant.
-        self.days_value = str(CONFIG['conges']['paternite_duree'])
-        super().configure_ui(form)
\ No newline at end of file
+        self.days_value = str(get_settings().conges.paternite_duree)
+        super().configure_ui(form)
+
+
+# --- Correspondance type de congé -> stratégie de calcul ---
+# Partagée par le formulaire de saisie et les traitements sans interface (soumission par lot).
+STRATEGIES = {
+    "Congé annuel": CongeAnnuelStrategy(),
+    "Congé exceptionnel": CongeCalendaireStrategy(),
+    "Congé de maladie": CongeMaladieStrategy(),
+    "Congé de maternité": CongeMaterniteStrategy(),
+    "Congé de paternité": CongePaterniteStrategy(),
+}
@@ -0,0 +1,63 @@
+# Fichier : core/events.py
+# Bus d'événements du moteur métier.
+#
+# CongeManager publie un événement après chaque écriture validée (agent créé, soldes
+# modifiés, congé créé sur une période...). Les abonnés (panneaux de l'interface, cache
+# de disponibilité) ne mettent à jour que ce qui est concerné, au lieu de tout recharger.
+# Comme core/interaction.py, ce module ne dépend pas de Tkinter : les événements sont
+# publiés dans le fil qui a fait l'écriture (le fil Tk pour l'application graphique).
+
+import logging
+from collections import defaultdict
+from enum import Enum
+
+
+class EventType(str, Enum):
+    """
+    Types d'événements et contenu de chaque événement (dictionnaire, en plus de 'type') :
+      AGENT_CREATED / AGENT_UPDATED / AGENT_DELETED : 'agent_id'
+      SOLDES_CHANGED     : 'agent_ids' (ensemble)
+      CONGE_CREATED / CONGE_DELETED : 'conge_id', 'agent_id', 'interim_id', 'type_conge',
+                           'date_debut', 'date_fin' (datetime)
+      CERTIFICAT_CHANGED : 'conge_ids' (ensemble)
+      HOLIDAYS_CHANGED   : aucun (les dates de reprise et les décomptes sont à recalculer)
+      DATA_RELOADED      : aucun (modification globale : clôture, apurement, import...)
+    """
+    AGENT_CREATED = 'agent_created'
+    AGENT_UPDATED = 'agent_updated'
+    AGENT_DELETED = 'agent_deleted'
+    SOLDES_CHANGED = 'soldes_changed'
+    CONGE_CREATED = 'conge_created'
+    CONGE_DELETED = 'conge_deleted'
+    CERTIFICAT_CHANGED = 'certificat_changed'
+    HOLIDAYS_CHANGED = 'holidays_changed'
+    DATA_RELOADED = 'data_reloaded'
+
+    def __str__(self):
+        return self.value
+
+
+class EventBus:
+    """Abonnement et publication d'événements. Une erreur dans un abonné est journalisée sans interrompre les autres."""
+    def __init__(self):
+        self._subscribers = defaultdict(list)
+
+    def subscribe(self, callback, *event_types):
+        """Abonne callback(event) aux types donnés (à tous les types si aucun n'est précisé)."""
+        for event_type in event_types or (None,):
+            self._subscribers[event_type].append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        for callbacks in self._subscribers.values():
+            while callback in callbacks:
+                callbacks.remove(callback)
+
+    def emit(self, event_type, **data):
+        event = dict(data, type=event_type)
+        for callback in list(self._subscribers[event_type]) + list(self._subscribers[None]):
+            try:
+                callback(event)
+            except Exception as e:
+                logging.error(f"Erreur dans un abonné à l'événement '{event_type}' : {e}", exc_info=True)
+        return event
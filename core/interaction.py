@@ -0,0 +1,46 @@
+# Fichier : core/interaction.py
+# Interface d'interaction entre le moteur métier et l'utilisateur (confirmations, notifications).
+# Le cœur de l'application (core/, db/, utils/) ne dépend pas de Tkinter : l'interface
+# graphique installe son propre adaptateur (voir ui/tk_interaction.py).
+
+import logging
+
+
+class InteractionHandler:
+    """
+    Implémentation par défaut, sans interface graphique.
+
+    Les notifications sont journalisées et les demandes de confirmation reçoivent la
+    réponse par défaut (refus, sauf indication contraire). Elle convient aux traitements
+    en ligne de commande, aux processus de travail et aux tests.
+    """
+    def __init__(self, default_confirm=False):
+        self.default_confirm = default_confirm
+
+    def confirm(self, title, message, parent=None):
+        """Demande une confirmation (oui/non) et retourne un booléen."""
+        logging.info(f"Confirmation '{title}' sans interface -> {'oui' if self.default_confirm else 'non'} : {message}")
+        return self.default_confirm
+
+    def info(self, title, message, parent=None):
+        logging.info(f"{title} : {message}")
+
+    def warning(self, title, message, parent=None):
+        logging.warning(f"{title} : {message}")
+
+    def error(self, title, message, parent=None):
+        logging.error(f"{title} : {message}")
+
+
+_current_handler = InteractionHandler()
+
+
+def get_interaction_handler():
+    """Retourne le gestionnaire d'interaction installé pour l'application."""
+    return _current_handler
+
+
+def set_interaction_handler(handler):
+    """Installe le gestionnaire d'interaction utilisé par défaut par le moteur métier."""
+    global _current_handler
+    _current_handler = handler
@@ -0,0 +1,187 @@
+# Fichier : core/tasks.py
+# Service d'exécution des tâches longues (imports, exports, sauvegardes, décisions par lot...).
+#
+# Les tâches tournent dans un pool de threads partagé. Chaque tâche appartient à un groupe
+# dont le nombre d'exécutions simultanées est limité (TaskService.DEFAULT_LIMITS) : les
+# tâches en surnombre attendent leur tour, dans l'ordre de soumission, sans occuper de thread.
+# L'avancement et la fin des tâches sont déposés dans une file que poll() vide dans le fil
+# appelant : l'interface l'appelle depuis la boucle Tk, les rappels s'exécutent donc
+# toujours dans le fil Tk. Comme core/events.py, ce module ne dépend pas de Tkinter.
+#
+# L'annulation est coopérative : la fonction report_progress(fait, total) fournie à la tâche
+# lève TaskCancelled dès que l'annulation a été demandée. Une tâche encore en attente de son
+# tour est annulée sans avoir été lancée. Les tâches des groupes NON_CANCELLABLE_GROUPS
+# (réécriture de la base) ne peuvent plus être annulées une fois lancées : les interrompre
+# laisserait l'application sans base utilisable.
+
+import logging
+import queue
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class TaskCancelled(Exception):
+    """Levée dans une tâche dont l'annulation a été demandée."""
+
+
+class CancellationToken:
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise TaskCancelled("Opération annulée.")
+
+
+class TaskHandle:
+    """Suivi d'une tâche soumise : résultat (future), jeton d'annulation et dernier avancement connu."""
+    def __init__(self, label, group, on_complete=None, on_progress=None, cancellable=True):
+        self.label = label
+        self.group = group
+        self.cancellable = cancellable  # faux : seule l'annulation avant le lancement est possible
+        self.future = Future()
+        self.token = CancellationToken()
+        self.progress = None  # (fait, total), mis à jour par TaskService.poll()
+        self.on_complete = on_complete
+        self.on_progress = on_progress
+
+    def cancel(self):
+        """
+        Demande l'annulation ; une tâche qui n'a pas encore démarré ne le sera pas. Une tâche non
+        annulable déjà lancée va jusqu'au bout. Retourne vrai si la demande a été prise en compte.
+        """
+        if self.future.cancel() or self.cancellable:
+            self.token.cancel()
+            return True
+        return False
+
+    def outcome(self):
+        """Résultat de la tâche terminée, ou l'exception qu'elle a levée (TaskCancelled si annulée)."""
+        if self.future.cancelled():
+            return TaskCancelled("Opération annulée.")
+        return self.future.exception() or self.future.result()
+
+
+class TaskService:
+    # Nombre maximal de tâches simultanées par groupe (1 pour un groupe non listé).
+    DEFAULT_LIMITS = {
+        'ecriture': 1,    # import, restauration : réécrivent la base
+        'sauvegarde': 1,
+        'export': 2,
+        'decisions': 1,   # utilise déjà plusieurs processus
+    }
+    # Groupes dont les tâches ne peuvent plus être annulées une fois lancées.
+    NON_CANCELLABLE_GROUPS = frozenset({'ecriture'})
+
+    def __init__(self, max_workers=4, limits=None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tache")
+        self._limits = dict(self.DEFAULT_LIMITS, **(limits or {}))
+        self._lock = threading.Lock()
+        self._running = defaultdict(int)
+        self._waiting = defaultdict(deque)
+        self._messages = queue.Queue()
+        self._active = []
+        self._closed = False
+
+    @property
+    def active(self):
+        """Tâches soumises dont la fin n'a pas encore été traitée par poll()."""
+        return list(self._active)
+
+    def submit(self, fn, label="", group='export', with_progress=False, on_complete=None, on_progress=None):
+        """
+        Soumet fn() (ou fn(report_progress) si with_progress) et retourne son TaskHandle.
+        on_progress(fait, total) et on_complete(résultat ou exception) sont appelés par poll().
+        """
+        handle = TaskHandle(label, group, on_complete, on_progress, cancellable=group not in self.NON_CANCELLABLE_GROUPS)
+        job = (handle, fn, with_progress)
+        with self._lock:
+            self._active.append(handle)
+            if self._running[group] < self._limits.get(group, 1):
+                self._running[group] += 1
+            else:
+                self._waiting[group].append(job)
+                job = None
+        if job:
+            self._executor.submit(self._run, *job)
+        return handle
+
+    def _run(self, handle, fn, with_progress):
+        try:
+            if not handle.future.set_running_or_notify_cancel():
+                return
+
+            def report_progress(done, total):
+                handle.token.raise_if_cancelled()
+                self._messages.put(('progress', handle, (done, total)))
+
+            try:
+                handle.future.set_result(fn(report_progress) if with_progress else fn())
+            except Exception as e:
+                if not isinstance(e, TaskCancelled):
+                    logging.error(f"Échec de la tâche '{handle.label}' : {e}", exc_info=True)
+                handle.future.set_exception(e)
+        finally:
+            self._messages.put(('done', handle, None))
+            self._release(handle.group)
+
+    def _release(self, group):
+        with self._lock:
+            job = self._waiting[group].popleft() if self._waiting[group] and not self._closed else None
+            if job is None:
+                self._running[group] -= 1
+        if job:
+            self._executor.submit(self._run, *job)
+
+    def poll(self):
+        """
+        Traite, dans le fil appelant, les avancements (seul le dernier de chaque tâche est
+        transmis) puis les fins de tâches. Retourne le nombre de tâches encore actives.
+        """
+        updated, finished = {}, []
+        while True:
+            try:
+                kind, handle, value = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                handle.progress = value
+                updated[id(handle)] = handle
+            else:
+                finished.append(handle)
+
+        for handle in updated.values():
+            if handle.on_progress and not handle.future.done():
+                handle.on_progress(*handle.progress)
+        for handle in finished:
+            with self._lock:
+                self._active.remove(handle)
+            if handle.on_complete:
+                handle.on_complete(handle.outcome())
+        return len(self._active)
+
+    def cancel_all(self):
+        for handle in self.active:
+            handle.cancel()
+
+    def shutdown(self, cancel=False):
+        """Attend la fin des tâches (après en avoir demandé l'annulation si cancel est vrai)."""
+        if cancel:
+            self.cancel_all()
+        with self._lock:
+            self._closed = True
+            waiting = [job for jobs in self._waiting.values() for job in jobs]
+            self._waiting.clear()
+        # Les tâches qui attendaient leur tour ne seront pas lancées.
+        for handle, _, _ in waiting:
+            handle.future.cancel()
+            self._messages.put(('done', handle, None))
+        self._executor.shutdown(wait=True)
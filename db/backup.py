@@ -0,0 +1,92 @@
+# Fichier : db/backup.py
+# Description : Sauvegarde et restauration à chaud de la base SQLite.
+# On utilise l'API de sauvegarde de SQLite (sqlite3.Connection.backup) plutôt qu'une
+# copie brute du fichier : la copie obtenue est cohérente même si la base est modifiée
+# pendant l'opération (et reste correcte en mode WAL). La copie se fait par paquets de
+# pages, ce qui permet de suivre la progression et de l'exécuter dans un thread de travail.
+# Chaque fonction ouvre ses propres connexions : elles peuvent être appelées depuis n'importe quel thread.
+# Les sauvegardes elles-mêmes sont des instantanés du magasin dédupliqué (db/backup_store.py),
+# qui s'appuie sur ces fonctions.
+
+import sqlite3
+import logging
+import os
+
+# Nombre de pages copiées à chaque étape de la sauvegarde.
+DEFAULT_PAGES_PER_STEP = 256
+
+
+class BackupIntegrityError(sqlite3.DatabaseError):
+    """Levée lorsque la vérification d'intégrité d'une sauvegarde échoue."""
+
+
+def copy_database(source_path, dest_path, progress_callback=None, pages=DEFAULT_PAGES_PER_STEP):
+    """
+    Copie la base 'source_path' vers 'dest_path' avec l'API de sauvegarde SQLite.
+    progress_callback(pages_copiees, pages_totales) est appelé après chaque étape.
+    La copie est écrite dans un fichier temporaire puis renommée : 'dest_path' n'est
+    jamais laissé dans un état partiel.
+    """
+    temp_path = f"{dest_path}.part"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    def _on_progress(status, remaining, total):
+        if progress_callback:
+            progress_callback(total - remaining, total)
+
+    source = sqlite3.connect(source_path)
+    try:
+        target = sqlite3.connect(temp_path)
+        try:
+            source.backup(target, pages=pages, progress=_on_progress)
+        finally:
+            target.close()
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    finally:
+        source.close()
+
+    os.replace(temp_path, dest_path)
+    return dest_path
+
+
+def check_integrity(db_path):
+    """
+    Exécute 'PRAGMA integrity_check' sur une base.
+    Retourne un tuple (ok, messages) où messages est la liste des anomalies détectées.
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        messages = [row[0] for row in conn.execute("PRAGMA integrity_check").fetchall()]
+    finally:
+        conn.close()
+    return messages == ["ok"], messages
+
+
+def restore_backup(backup_path, db_path, progress_callback=None, pages=DEFAULT_PAGES_PER_STEP):
+    """
+    Restaure 'backup_path' dans la base 'db_path' avec l'API de sauvegarde SQLite.
+    L'intégrité de la sauvegarde est vérifiée avant d'écraser la base.
+    """
+    ok, messages = check_integrity(backup_path)
+    if not ok:
+        raise BackupIntegrityError(f"La sauvegarde est corrompue, restauration annulée : {'; '.join(messages[:5])}")
+
+    def _on_progress(status, remaining, total):
+        if progress_callback:
+            progress_callback(total - remaining, total)
+
+    source = sqlite3.connect(backup_path)
+    try:
+        target = sqlite3.connect(db_path)
+        try:
+            source.backup(target, pages=pages, progress=_on_progress)
+        finally:
+            target.close()
+    finally:
+        source.close()
+    logging.info(f"Base {db_path} restaurée depuis {backup_path}")
+    return True
@@ -0,0 +1,322 @@
+# Fichier : db/backup_store.py
+# Description : Magasin de sauvegardes incrémentales et dédupliquées.
+#
+# Chaque instantané est découpé en blocs de taille fixe (alignés sur les pages SQLite).
+# Un bloc est stocké une seule fois, compressé, sous le nom de son empreinte SHA-256
+# (stockage adressé par contenu) : entre deux instantanés, seuls les blocs modifiés
+# occupent de la place. Arborescence :
+#
+#   <racine>/manifest.json          index des instantanés (listage instantané, sans stat)
+#   <racine>/snapshots/<id>.json    liste ordonnée des blocs de l'instantané
+#   <racine>/objects/ab/<sha256>    blocs compressés (zlib)
+#   <racine>/lock                   verrou des opérations qui modifient le magasin
+#
+# Les opérations qui modifient le magasin (création, suppression, rétention, nettoyage des
+# blocs) prennent un verrou exclusif sur le fichier 'lock' : une sauvegarde lancée depuis
+# l'interface et une sauvegarde planifiée (python -m conges backup) ne se croisent pas, et le
+# nettoyage ne supprime jamais les blocs d'un instantané en cours de création. Par prudence,
+# le nettoyage épargne aussi les blocs récents (GC_GRACE_SECONDS).
+
+import hashlib
+import json
+import logging
+import os
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from db.backup import BackupIntegrityError, check_integrity, copy_database, restore_backup
+from utils.config_loader import CONFIG
+
+# 64 Kio : multiple de toutes les tailles de page SQLite usuelles (4 Kio par défaut).
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+DEFAULT_RETENTION = {'quotidien': 7, 'hebdomadaire': 4, 'annuel': 5}
+
+
+class BackupStore:
+    """Magasin de sauvegardes dédupliquées avec politique de rétention."""
+    MANIFEST_FILENAME = "manifest.json"
+    LOCK_FILENAME = "lock"
+    # Âge minimal (en secondes) d'un bloc non référencé avant que le nettoyage ne le supprime.
+    GC_GRACE_SECONDS = 3600
+
+    def __init__(self, root_dir, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.root_dir = root_dir
+        self.chunk_size = chunk_size
+        self.objects_dir = os.path.join(root_dir, "objects")
+        self.snapshots_dir = os.path.join(root_dir, "snapshots")
+        self.tmp_dir = os.path.join(root_dir, "tmp")
+        self.manifest_path = os.path.join(root_dir, self.MANIFEST_FILENAME)
+        self.lock_path = os.path.join(root_dir, self.LOCK_FILENAME)
+        for directory in (self.objects_dir, self.snapshots_dir, self.tmp_dir):
+            os.makedirs(directory, exist_ok=True)
+
+    # --- Verrou ---
+    @contextmanager
+    def _locked(self, timeout=None):
+        """
+        Verrou exclusif du magasin, partagé entre threads et processus. Attend indéfiniment si
+        'timeout' vaut None ; lève TimeoutError si le verrou n'est pas obtenu dans le délai.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with open(self.lock_path, 'a+b') as f:
+            while True:
+                try:
+                    if fcntl:
+                        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    else:
+                        f.seek(0)
+                        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        raise TimeoutError("Le magasin de sauvegardes est occupé (une sauvegarde est en cours). Réessayez plus tard.")
+                    time.sleep(0.1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    # --- Index des instantanés ---
+    def list_snapshots(self):
+        """Retourne les instantanés (du plus récent au plus ancien) en lisant uniquement l'index."""
+        if not os.path.exists(self.manifest_path):
+            return []
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            snapshots = json.load(f)
+        return sorted(snapshots, key=lambda s: (s['created'], s['id']), reverse=True)
+
+    def get_snapshot(self, snapshot_id):
+        for snapshot in self.list_snapshots():
+            if snapshot['id'] == snapshot_id:
+                return snapshot
+        return None
+
+    def _write_manifest(self, snapshots):
+        self._write_json_atomic(self.manifest_path, snapshots)
+
+    def _write_json_atomic(self, path, data):
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(temp_path, path)
+
+    # --- Blocs adressés par contenu ---
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _store_chunk(self, data):
+        """Stocke un bloc s'il est absent et retourne (empreinte, octets_écrits)."""
+        digest = hashlib.sha256(data).hexdigest()
+        object_path = self._object_path(digest)
+        if os.path.exists(object_path):
+            return digest, 0
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        compressed = zlib.compress(data, 6)
+        temp_path = f"{object_path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(temp_path, object_path)
+        return digest, len(compressed)
+
+    def _read_chunk(self, digest):
+        with open(self._object_path(digest), 'rb') as f:
+            data = zlib.decompress(f.read())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise BackupIntegrityError(f"Bloc de sauvegarde corrompu : {digest}")
+        return data
+
+    # --- Création / restauration ---
+    def create_snapshot(self, db_path, label, progress_callback=None, permanent=False):
+        """
+        Crée un instantané cohérent de la base (copie à chaud vérifiée) et n'enregistre que
+        les blocs absents du magasin. Un instantané 'permanent' n'est jamais supprimé par la
+        politique de rétention. Retourne l'entrée d'index de l'instantané.
+        """
+        with self._locked():
+            return self._create_snapshot(db_path, label, progress_callback, permanent)
+
+    def _create_snapshot(self, db_path, label, progress_callback, permanent):
+        now = datetime.now()
+        snapshot_id = now.strftime("%Y%m%dT%H%M%S_%f")
+        temp_copy = os.path.join(self.tmp_dir, f"{snapshot_id}.db")
+
+        def _report(percent):
+            if progress_callback:
+                progress_callback(percent, 100)
+
+        try:
+            copy_database(db_path, temp_copy, lambda done, total: _report(int(50 * done / total) if total else 50))
+            ok, messages = check_integrity(temp_copy)
+            if not ok:
+                raise BackupIntegrityError(f"La sauvegarde n'est pas intègre : {'; '.join(messages[:5])}")
+
+            size = os.path.getsize(temp_copy)
+            chunks, stored_bytes = [], 0
+            file_hash = hashlib.sha256()
+            with open(temp_copy, 'rb') as f:
+                while True:
+                    data = f.read(self.chunk_size)
+                    if not data:
+                        break
+                    file_hash.update(data)
+                    digest, written = self._store_chunk(data)
+                    chunks.append(digest)
+                    stored_bytes += written
+                    _report(50 + int(50 * f.tell() / size) if size else 100)
+        finally:
+            if os.path.exists(temp_copy):
+                os.remove(temp_copy)
+
+        self._write_json_atomic(os.path.join(self.snapshots_dir, f"{snapshot_id}.json"),
+                                {'chunk_size': self.chunk_size, 'sha256': file_hash.hexdigest(), 'chunks': chunks})
+        entry = {
+            'id': snapshot_id,
+            'created': now.isoformat(timespec='seconds'),
+            'label': label,
+            'db_filename': os.path.basename(db_path),
+            'size': size,
+            'stored_bytes': stored_bytes,
+            'permanent': permanent,
+        }
+        snapshots = self.list_snapshots()
+        snapshots.append(entry)
+        self._write_manifest(snapshots)
+        logging.info(f"Instantané {snapshot_id} ({label}) créé : {len(chunks)} blocs, {stored_bytes} octets nouveaux.")
+        return entry
+
+    def export_snapshot(self, snapshot_id, dest_path, progress_callback=None):
+        """Reconstitue le fichier de base de données d'un instantané et vérifie son empreinte."""
+        with open(os.path.join(self.snapshots_dir, f"{snapshot_id}.json"), 'r', encoding='utf-8') as f:
+            details = json.load(f)
+        file_hash = hashlib.sha256()
+        temp_path = f"{dest_path}.part"
+        total = len(details['chunks'])
+        with open(temp_path, 'wb') as out:
+            for i, digest in enumerate(details['chunks'], start=1):
+                data = self._read_chunk(digest)
+                file_hash.update(data)
+                out.write(data)
+                if progress_callback:
+                    progress_callback(i, total)
+        if file_hash.hexdigest() != details['sha256']:
+            os.remove(temp_path)
+            raise BackupIntegrityError(f"L'instantané {snapshot_id} est incohérent (empreinte différente).")
+        os.replace(temp_path, dest_path)
+        return dest_path
+
+    def restore_snapshot(self, snapshot_id, db_path, progress_callback=None):
+        """Restaure un instantané dans la base 'db_path' (via l'API de sauvegarde SQLite)."""
+        temp_copy = os.path.join(self.tmp_dir, f"restore_{snapshot_id}.db")
+        try:
+            self.export_snapshot(snapshot_id, temp_copy,
+                                 lambda done, total: progress_callback(int(50 * done / total), 100) if progress_callback else None)
+            restore_backup(temp_copy, db_path,
+                           lambda done, total: progress_callback(50 + int(50 * done / total), 100) if progress_callback and total else None)
+        finally:
+            if os.path.exists(temp_copy):
+                os.remove(temp_copy)
+        return True
+
+    # --- Suppression / rétention ---
+    def delete_snapshot(self, snapshot_id, timeout=None):
+        """Supprime un instantané et ses blocs devenus inutiles (TimeoutError si le magasin reste occupé)."""
+        with self._locked(timeout):
+            snapshots = [s for s in self.list_snapshots() if s['id'] != snapshot_id]
+            self._write_manifest(snapshots)
+            details_path = os.path.join(self.snapshots_dir, f"{snapshot_id}.json")
+            if os.path.exists(details_path):
+                os.remove(details_path)
+            self._collect_garbage()
+
+    def apply_retention(self, quotidien=7, hebdomadaire=4, annuel=5):
+        """
+        Conserve le dernier instantané de chacun des 'quotidien' derniers jours, des
+        'hebdomadaire' dernières semaines ISO et des 'annuel' dernières années, ainsi que
+        les instantanés permanents. Supprime les autres puis les blocs devenus inutiles.
+        Retourne la liste des identifiants supprimés.
+        """
+        with self._locked():
+            return self._apply_retention(quotidien, hebdomadaire, annuel)
+
+    def _apply_retention(self, quotidien, hebdomadaire, annuel):
+        snapshots = self.list_snapshots()  # du plus récent au plus ancien
+        keep = {s['id'] for s in snapshots if s.get('permanent')}
+        periods = [
+            (quotidien, lambda d: d.date()),
+            (hebdomadaire, lambda d: d.isocalendar()[:2]),
+            (annuel, lambda d: d.year),
+        ]
+        for limit, period_of in periods:
+            seen = []
+            for snapshot in snapshots:
+                period = period_of(datetime.fromisoformat(snapshot['created']))
+                if period in seen:
+                    continue
+                if len(seen) >= limit:
+                    break
+                seen.append(period)
+                keep.add(snapshot['id'])
+
+        removed = [s['id'] for s in snapshots if s['id'] not in keep]
+        if removed:
+            self._write_manifest([s for s in snapshots if s['id'] in keep])
+            for snapshot_id in removed:
+                details_path = os.path.join(self.snapshots_dir, f"{snapshot_id}.json")
+                if os.path.exists(details_path):
+                    os.remove(details_path)
+            self._collect_garbage()
+            logging.info(f"Rétention des sauvegardes : {len(removed)} instantané(s) supprimé(s).")
+        return removed
+
+    def collect_garbage(self, grace_seconds=None):
+        """
+        Supprime les blocs qui ne sont plus référencés par aucun instantané, sauf ceux modifiés
+        depuis moins de 'grace_seconds' (GC_GRACE_SECONDS par défaut). Retourne le nombre de blocs supprimés.
+        """
+        with self._locked():
+            return self._collect_garbage(grace_seconds)
+
+    def _collect_garbage(self, grace_seconds=None):
+        grace_seconds = self.GC_GRACE_SECONDS if grace_seconds is None else grace_seconds
+        limit = time.time() - grace_seconds
+        referenced = set()
+        for snapshot in self.list_snapshots():
+            details_path = os.path.join(self.snapshots_dir, f"{snapshot['id']}.json")
+            with open(details_path, 'r', encoding='utf-8') as f:
+                referenced.update(json.load(f)['chunks'])
+
+        removed = 0
+        for shard in os.scandir(self.objects_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name not in referenced and entry.stat().st_mtime < limit:
+                    os.remove(entry.path)
+                    removed += 1
+        return removed
+
+
+def get_backup_store(db_path):
+    """Retourne le magasin de sauvegardes associé à une base, selon la configuration."""
+    backups_dir = CONFIG.get('backups', {}).get('dir', 'backups')
+    return BackupStore(os.path.join(os.path.dirname(os.path.abspath(db_path)), backups_dir, "store"))
+
+
+def get_retention_policy():
+    """Retourne la politique de rétention configurée (section 'backups.retention' de config.yaml)."""
+    policy = dict(DEFAULT_RETENTION)
+    policy.update(CONFIG.get('backups', {}).get('retention') or {})
+    return {key: int(value) for key, value in policy.items() if key in DEFAULT_RETENTION}
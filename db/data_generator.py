@@ -0,0 +1,198 @@
+# Fichier : db/data_generator.py
+# Génération de données synthétiques pour les tests de charge et le dimensionnement.
+#
+# Remplit une base vide (schéma déjà migré) avec :
+#   - des agents répartis sur les grades de la configuration (ui.grades) ;
+#   - leurs soldes annuels sur plusieurs exercices (les plus anciens au statut 'Expiré') ;
+#   - des congés de tous les types (ui.types_conge), sans chevauchement pour un même agent
+#     mais avec les pics de la vie réelle (été, fin d'année) où beaucoup d'agents sont
+#     absents en même temps, des intérimaires et quelques congés annulés ;
+#   - les certificats des congés de maladie (la plupart) et des jours fériés personnalisés.
+#
+# La génération est déterministe pour une graine donnée. Les lignes sont écrites par
+# insertions groupées (executemany) dans une seule transaction : une base d'un million de
+# congés se construit en moins d'une minute. Les fichiers des certificats ne sont pas créés :
+# les certificats sont enregistrés avec fichier_present = 0.
+
+import hashlib
+import logging
+import random
+from bisect import bisect_left
+from itertools import accumulate
+from datetime import date, timedelta
+
+from core.constants import SoldeStatus
+from utils.config_loader import get_settings
+
+NOMS = ["ALAOUI", "BENNANI", "BERRADA", "CHRAIBI", "EL AMRANI", "EL FASSI", "GUESSOUS", "IDRISSI", "KETTANI",
+        "LAHLOU", "MANSOURI", "OUAZZANI", "SEBTI", "SQALLI", "TAZI", "ZIANI"]
+PRENOMS = ["Sara", "Youssef", "Khadija", "Omar", "Salma", "Mehdi", "Imane", "Hamza", "Nadia", "Karim",
+           "Fatima", "Anas", "Meryem", "Ayoub", "Houda", "Rachid"]
+
+# Fréquence relative des types de congé (un type de la configuration non listé vaut 1).
+POIDS_TYPES = {
+    'Congé annuel': 60,
+    'Congé de maladie': 20,
+    'Congé exceptionnel': 15,
+    'Congé de maternité': 2,
+    'Congé de paternité': 3,
+}
+# Part des congés de maladie avec certificat, des congés annuels avec intérimaire, des congés annulés.
+TAUX_CERTIFICATS = 0.85
+TAUX_INTERIMS = 0.3
+TAUX_ANNULES = 0.02
+JOURS_FERIES_PAR_AN = 3
+
+
+def _duree_calendaire(rng, type_conge, settings):
+    """Durée en jours calendaires (fin incluse) d'un congé du type donné."""
+    if type_conge == 'Congé de maternité':
+        return settings.conges.maternite_duree
+    if type_conge == 'Congé de paternité':
+        return settings.conges.paternite_duree
+    if type_conge == 'Congé de maladie':
+        return min(int(rng.expovariate(1 / 5)) + 1, 90)
+    if type_conge == 'Congé exceptionnel':
+        return rng.randint(1, 3)
+    return rng.choice((3, 5, 7, 12, 14, 21))
+
+
+def _jour_debut(rng, type_conge, annee):
+    """Premier jour d'un congé : les congés annuels se concentrent en été et en fin d'année."""
+    if type_conge == 'Congé annuel':
+        tirage = rng.random()
+        if tirage < 0.45:
+            return date(annee, 7, 1) + timedelta(days=rng.randrange(62))
+        if tirage < 0.6:
+            return date(annee, 12, 15) - timedelta(days=rng.randrange(10))
+    return date(annee, 1, 1) + timedelta(days=rng.randrange(335))
+
+
+class _Calendrier:
+    """
+    Jours de la période générée, repérés par leur rang : jours ouvrés cumulés (le décompte
+    d'un congé est une soustraction) et dates déjà formatées pour la base.
+    """
+    def __init__(self, debut, fin, holidays):
+        self.debut = debut
+        self.cumul = [0]
+        self.sql = []
+        jour = debut
+        while jour <= fin:
+            self.cumul.append(self.cumul[-1] + (jour.weekday() < 5 and jour not in holidays))
+            self.sql.append(jour.strftime('%Y-%m-%d 00:00:00'))
+            jour += timedelta(days=1)
+
+    def rang(self, jour):
+        return (jour - self.debut).days
+
+    def jours_ouvres(self, i, j):
+        return self.cumul[j + 1] - self.cumul[i]
+
+
+def generate_synthetic_data(db, agents=1000, conges_par_agent=10, annees=3, seed=None, progress_callback=None,
+                            annee_exercice=None):
+    """
+    Remplit la base de 'db' (DatabaseManager connecté, schéma migré, sans agent) et retourne le
+    nombre de lignes créées par table. Les congés couvrent les 'annees' derniers exercices
+    jusqu'à l'exercice en cours, ou jusqu'à 'annee_exercice' qui devient alors l'exercice de
+    la base (enregistré dans la même transaction que les données). progress_callback(agents_traites,
+    agents) est appelé au fil de l'eau. Lève ValueError si la base contient déjà des agents ou
+    si un paramètre est invalide : la base n'est alors pas modifiée.
+    """
+    if agents < 1 or conges_par_agent < 0 or annees < 1:
+        raise ValueError("Paramètres invalides : il faut au moins un agent et un exercice.")
+    if db.execute_query("SELECT EXISTS (SELECT 1 FROM agents)", fetch="one")[0]:
+        raise ValueError("La base contient déjà des agents : la génération ne se fait que dans une base vide.")
+
+    settings = get_settings()
+    if not settings.grades or not settings.types_conge:
+        raise ValueError("Configuration : ui.grades et ui.types_conge ne doivent pas être vides.")
+    rng = random.Random(seed)
+    nouvel_exercice = annee_exercice is not None
+    if not nouvel_exercice:
+        annee_exercice = db.get_annee_exercice()
+    premiere_annee = annee_exercice - annees + 1
+    types = list(settings.types_conge)
+    poids_cumules = list(accumulate(POIDS_TYPES.get(t, 1) for t in types))
+
+    holidays = {}
+    for annee in range(premiere_annee, annee_exercice + 1):
+        for jour in rng.sample(range(1, 365), JOURS_FERIES_PAR_AN):
+            holidays[date(annee, 1, 1) + timedelta(days=jour - 1)] = f"Fête locale {annee}-{jour}"
+    # Marge après la fin de l'exercice : les congés commencés en décembre débordent sur janvier.
+    calendrier = _Calendrier(date(premiere_annee, 1, 1), date(annee_exercice + 1, 6, 30), set(holidays))
+    types_decompte = settings.conges.types_decompte_solde
+
+    stats = {'agents': agents, 'soldes_annuels': 0, 'conges': 0, 'certificats_medicaux': 0,
+             'jours_feries_personnalises': len(holidays)}
+    cur = db.conn.cursor()
+    # Pendant la génération : pas de synchronisation disque et un grand cache (index et R-tree des congés).
+    synchronous = cur.execute("PRAGMA synchronous").fetchone()[0]
+    cache_size = cur.execute("PRAGMA cache_size").fetchone()[0]
+    cur.execute("PRAGMA synchronous = OFF")
+    cur.execute("PRAGMA cache_size = -262144")
+    try:
+        cur.execute("BEGIN")
+        if nouvel_exercice:
+            cur.execute("REPLACE INTO system_config (config_key, config_value) VALUES ('annee_exercice', ?)", (str(annee_exercice),))
+        cur.executemany("INSERT INTO jours_feries_personnalises (date, nom, type) VALUES (?, ?, ?)",
+                        ((jour.strftime('%Y-%m-%d'), nom, "Personnalisé") for jour, nom in sorted(holidays.items())))
+        cur.executemany("INSERT INTO agents (id, nom, prenom, ppr, grade) VALUES (?, ?, ?, ?, ?)",
+                        ((agent_id, rng.choice(NOMS), rng.choice(PRENOMS), f"S{agent_id:08d}", rng.choice(settings.grades))
+                         for agent_id in range(1, agents + 1)))
+
+        # Les agents sont traités par paquets pour borner la mémoire sur les très gros volumes.
+        paquet, conge_id = 10_000, 0
+        for premier in range(1, agents + 1, paquet):
+            soldes, conges, certificats = [], [], []
+            for agent_id in range(premier, min(premier + paquet, agents + 1)):
+                # Exercices antérieurs à N-2 : soldes expirés, comme après les clôtures successives.
+                for annee in range(premiere_annee, annee_exercice + 1):
+                    statut = SoldeStatus.ACTIF if annee >= annee_exercice - 2 else SoldeStatus.EXPIRE
+                    soldes.append((agent_id, annee, rng.randrange(0, 61) / 2, statut))
+
+                periodes = []  # (rang du début, rang de la fin) triés, pour écarter les chevauchements du même agent
+                for _ in range(conges_par_agent * 3):
+                    if len(periodes) >= conges_par_agent:
+                        break
+                    type_conge = rng.choices(types, cum_weights=poids_cumules)[0]
+                    debut = calendrier.rang(_jour_debut(rng, type_conge, rng.randint(premiere_annee, annee_exercice)))
+                    fin = debut + _duree_calendaire(rng, type_conge, settings) - 1
+                    if fin >= len(calendrier.sql):
+                        continue
+                    i = bisect_left(periodes, (debut, fin))
+                    if (i > 0 and periodes[i - 1][1] >= debut) or (i < len(periodes) and periodes[i][0] <= fin):
+                        continue
+                    periodes.insert(i, (debut, fin))
+
+                    conge_id += 1
+                    interim_id = None
+                    if type_conge in types_decompte and agents > 1 and rng.random() < TAUX_INTERIMS:
+                        interim_id = rng.randint(1, agents - 1)
+                        interim_id += interim_id >= agent_id
+                    statut = 'Annulé' if rng.random() < TAUX_ANNULES else 'Actif'
+                    conges.append((conge_id, agent_id, type_conge, None, interim_id, calendrier.sql[debut],
+                                   calendrier.sql[fin], calendrier.jours_ouvres(debut, fin), statut))
+                    if type_conge == 'Congé de maladie' and rng.random() < TAUX_CERTIFICATS:
+                        sha256 = hashlib.sha256(f"{seed}-{conge_id}".encode()).hexdigest()
+                        certificats.append((conge_id, f"synthetique/{sha256[:2]}/{sha256}.pdf", sha256))
+
+            cur.executemany("INSERT INTO soldes_annuels (agent_id, annee, solde, statut) VALUES (?, ?, ?, ?)", soldes)
+            cur.executemany("INSERT INTO conges (id, agent_id, type_conge, justif, interim_id, date_debut, date_fin, jours_pris, statut) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", conges)
+            cur.executemany("INSERT INTO certificats_medicaux (conge_id, chemin_fichier, sha256, fichier_present) VALUES (?, ?, ?, 0)", certificats)
+            stats['soldes_annuels'] += len(soldes)
+            stats['conges'] += len(conges)
+            stats['certificats_medicaux'] += len(certificats)
+            if progress_callback:
+                progress_callback(min(premier + paquet - 1, agents), agents)
+        db.conn.commit()
+    except Exception:
+        db.conn.rollback()
+        raise
+    finally:
+        cur.execute(f"PRAGMA synchronous = {int(synchronous)}")
+        cur.execute(f"PRAGMA cache_size = {int(cache_size)}")
+    logging.info(f"Données synthétiques générées (graine {seed}) : {stats}")
+    return stats
@@ -5,19 +5,30 @@
 # CRUD (Create, Read, Update, Delete) pour les agents, congés, soldes, etc.
 
 import sqlite3
-from tkinter import messagebox
 import logging
-import os
-import re
+import time
 from datetime import datetime
 
+from db import migration_planner, query_stats
 from db.models import Agent, Conge, SoldeAnnuel
 from core.constants import SoldeStatus
+from core.interaction import get_interaction_handler
 
 class DatabaseManager:
-    def __init__(self, db_file):
+    # Nombre maximal de paramètres par requête "IN (...)" (limite historique de SQLite : 999).
+    MAX_SQL_VARIABLES = 900
+
+    def __init__(self, db_file, interaction=None, stats=None):
         self.db_file = db_file
         self.conn = None
+        self._interaction = interaction
+        # Instrumentation des requêtes (db/query_stats.py) : None quand elle est désactivée.
+        self.query_stats = stats or query_stats.get_active()
+
+    @property
+    def interaction(self):
+        """Gestionnaire des notifications (par défaut, celui installé pour l'application)."""
+        return self._interaction or get_interaction_handler()
 
     def connect(self):
         try:
@@ -25,7 +36,7 @@ class DatabaseManager:
             self.conn.execute("PRAGMA foreign_keys = ON")
             return True
         except sqlite3.Error as e:
-            messagebox.showerror("Erreur Base de Données", f"Impossible de se connecter : {e}")
+            self.interaction.error("Erreur Base de Données", f"Impossible de se connecter : {e}")
             return False
 
     def close(self):
@@ -37,6 +48,8 @@ class DatabaseManager:
             raise sqlite3.Error("Pas de connexion à la base de données.")
         try:
             cursor = self.conn.cursor()
+            if self.query_stats is not None:
+                return self._execute_instrumented(cursor, query, params, fetch)
             cursor.execute(query, params)
             if fetch == "one":
                 return cursor.fetchone()
@@ -49,6 +62,23 @@ class DatabaseManager:
             logging.error(f"Erreur SQL: {query} avec params {params} -> {e}", exc_info=True)
             raise e
 
+    def _execute_instrumented(self, cursor, query, params, fetch):
+        """Variante chronométrée d'execute_query ; la durée inclut la lecture des lignes et le commit."""
+        debut = time.perf_counter()
+        cursor.execute(query, params)
+        if fetch == "one":
+            result = cursor.fetchone()
+            rows = int(result is not None)
+        elif fetch == "all":
+            result = cursor.fetchall()
+            rows = len(result)
+        else:
+            self.conn.commit()
+            result = cursor.lastrowid
+            rows = max(cursor.rowcount, 0)
+        self.query_stats.record(query, (time.perf_counter() - debut) * 1000, rows, params, self.conn, __file__)
+        return result
+
     def _handle_data_migration_from_legacy(self):
         cursor = self.conn.cursor()
         try:
@@ -75,42 +105,38 @@ class DatabaseManager:
                 cursor.execute("REPLACE INTO db_version (version) VALUES (2)")
                 self.conn.commit()
                 logging.info("Migration des données de solde terminée avec succès.")
-                messagebox.showinfo("Mise à jour", "Les données de l'application ont été mises à jour vers la nouvelle version.")
+                self.interaction.info("Mise à jour", "Les données de l'application ont été mises à jour vers la nouvelle version.")
         except sqlite3.Error as e:
             self.conn.rollback()
             logging.error(f"Échec de la migration des données : {e}", exc_info=True)
             raise e
 
     def run_migrations(self):
+        """
+        Met la base à jour (voir db/migration_planner.py). Au démarrage courant, la base est
+        déjà à jour : une seule lecture de pragma suffit.
+        """
+        if migration_planner.is_up_to_date(self.conn):
+            return
+
         self.execute_query("CREATE TABLE IF NOT EXISTS db_version (version INTEGER PRIMARY KEY)")
         self.execute_query("CREATE TABLE IF NOT EXISTS system_config (config_key TEXT PRIMARY KEY NOT NULL, config_value TEXT NOT NULL)")
 
-        current_version_row = self.execute_query("SELECT version FROM db_version", fetch="one")
-        current_version = current_version_row[0] if current_version_row else 0
-        
-        migrations_path = os.path.join(os.path.dirname(__file__), 'migrations')
-        if os.path.exists(migrations_path):
-            migrations = {}
-            for filename in sorted(os.listdir(migrations_path)):
-                match = re.match(r'(\d+)_.*\.sql', filename)
-                if match:
-                    version = int(match.group(1))
-                    if version > current_version:
-                        migrations[version] = os.path.join(migrations_path, filename)
-            
-            if migrations:
-                logging.info(f"Migrations SQL à appliquer : {sorted(migrations.keys())}")
-                for version in sorted(migrations.keys()):
-                    script_path = migrations[version]
-                    with open(script_path, 'r', encoding='utf-8') as f:
-                        script = f.read()
-                    self.conn.cursor().executescript(script)
-                    self.execute_query("REPLACE INTO db_version (version) VALUES (?)", (version,))
-                messagebox.showinfo("Mise à jour", "La structure de la base de données a été mise à jour.")
-        
+        current_version_row = self.execute_query("SELECT MAX(version) FROM db_version", fetch="one")
+        current_version = current_version_row[0] if current_version_row and current_version_row[0] else 0
+
+        migrations = migration_planner.plan_migrations(current_version)
+        if migrations:
+            logging.info(f"Migrations SQL à appliquer : {[version for version, _ in migrations]}")
+            for version, script_path in migrations:
+                migration_planner.apply_migration(self.conn, version, script_path)
+            self.interaction.info("Mise à jour", "La structure de la base de données a été mise à jour.")
+
         if current_version < 2:
             self._handle_data_migration_from_legacy()
 
+        migration_planner.record_fingerprint(self.conn)
+
     def get_annee_exercice(self):
         result = self.execute_query("SELECT config_value FROM system_config WHERE config_key = 'annee_exercice'", fetch="one")
         if result:
@@ -159,19 +185,42 @@ class DatabaseManager:
             return []
             
         agents = [Agent.from_db_row(row) for row in agents_rows]
-        agent_ids = [agent.id for agent in agents]
-        soldes_query = f"SELECT id, agent_id, annee, solde, statut FROM soldes_annuels WHERE agent_id IN ({','.join('?' for _ in agent_ids)})"
-        all_soldes_rows = self.execute_query(soldes_query, agent_ids, fetch="all")
-        soldes_map = {}
-        for row in all_soldes_rows:
-            solde_obj = SoldeAnnuel.from_db_row(row)
-            if solde_obj.agent_id not in soldes_map:
-                soldes_map[solde_obj.agent_id] = []
-            soldes_map[solde_obj.agent_id].append(solde_obj)
+        soldes_map = self.get_soldes_for_agents([agent.id for agent in agents])
         for agent in agents:
             agent.soldes_annuels = soldes_map.get(agent.id, [])
         return agents
 
+    def get_soldes_for_agents(self, agent_ids):
+        """
+        Charge les soldes annuels d'un ensemble d'agents.
+        Retourne un dictionnaire {agent_id: [SoldeAnnuel, ...]}.
+        Les identifiants sont envoyés par paquets pour rester sous la limite de variables de SQLite.
+        """
+        agent_ids = list(agent_ids)
+        soldes_map = {}
+        for i in range(0, len(agent_ids), self.MAX_SQL_VARIABLES):
+            chunk = agent_ids[i:i + self.MAX_SQL_VARIABLES]
+            soldes_query = f"SELECT id, agent_id, annee, solde, statut FROM soldes_annuels WHERE agent_id IN ({','.join('?' for _ in chunk)})"
+            for row in self.execute_query(soldes_query, chunk, fetch="all"):
+                solde_obj = SoldeAnnuel.from_db_row(row)
+                soldes_map.setdefault(solde_obj.agent_id, []).append(solde_obj)
+        return soldes_map
+
+    def get_agents_by_ids(self, agent_ids):
+        """Charge plusieurs agents (avec leurs soldes) et retourne un dictionnaire {agent_id: Agent}."""
+        agent_ids = list(agent_ids)
+        agents = {}
+        for i in range(0, len(agent_ids), self.MAX_SQL_VARIABLES):
+            chunk = agent_ids[i:i + self.MAX_SQL_VARIABLES]
+            q = f"SELECT id, nom, prenom, ppr, grade FROM agents WHERE id IN ({','.join('?' for _ in chunk)})"
+            for row in self.execute_query(q, chunk, fetch="all"):
+                agent = Agent.from_db_row(row)
+                agents[agent.id] = agent
+        soldes_map = self.get_soldes_for_agents(agents.keys())
+        for agent in agents.values():
+            agent.soldes_annuels = soldes_map.get(agent.id, [])
+        return agents
+
     def get_agent_by_id(self, agent_id):
         row = self.execute_query("SELECT id, nom, prenom, ppr, grade FROM agents WHERE id=?", (agent_id,), fetch="one")
         if not row:
@@ -210,13 +259,33 @@ class DatabaseManager:
         return self.execute_query("INSERT INTO conges (agent_id, type_conge, justif, interim_id, date_debut, date_fin, jours_pris) VALUES (?, ?, ?, ?, ?, ?, ?)",
                        (conge_model.agent_id, conge_model.type_conge, conge_model.justif, conge_model.interim_id, conge_model.date_debut, conge_model.date_fin, conge_model.jours_pris))
 
+    def ajouter_conges_batch(self, conge_models):
+        """
+        Insère plusieurs congés et retourne leurs identifiants, dans l'ordre.
+        Ne valide PAS la transaction : la validation est à la charge de l'appelant.
+        """
+        cursor = self.conn.cursor()
+        conge_ids = []
+        for conge_model in conge_models:
+            cursor.execute("INSERT INTO conges (agent_id, type_conge, justif, interim_id, date_debut, date_fin, jours_pris) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                           (conge_model.agent_id, conge_model.type_conge, conge_model.justif, conge_model.interim_id, conge_model.date_debut, conge_model.date_fin, conge_model.jours_pris))
+            conge_ids.append(cursor.lastrowid)
+        return conge_ids
+
+    def update_soldes_batch(self, updates):
+        """
+        Met à jour plusieurs soldes à partir d'un dictionnaire {solde_id: nouvelle_valeur}.
+        Ne valide PAS la transaction : la validation est à la charge de l'appelant.
+        """
+        self.conn.cursor().executemany("UPDATE soldes_annuels SET solde = ? WHERE id = ?",
+                                       [(value, solde_id) for solde_id, value in updates.items()])
+
     def supprimer_conge(self, conge_id):
-        cert = self.execute_query("SELECT chemin_fichier FROM certificats_medicaux WHERE conge_id = ?", (conge_id,), fetch="one")
-        if cert and cert[0] and os.path.exists(cert[0]):
-            try:
-                os.remove(cert[0])
-            except OSError as e:
-                logging.error(f"Erreur suppression certificat pour conge_id {conge_id}: {e}")
+        """
+        Supprime un congé (son certificat est supprimé en cascade dans la base).
+        Le fichier justificatif n'est PAS supprimé ici : il peut être partagé par d'autres
+        congés, c'est au CongeManager de le libérer une fois la transaction validée.
+        """
         self.execute_query("DELETE FROM conges WHERE id=?", (conge_id,))
         return True
 
@@ -229,31 +298,129 @@ class DatabaseManager:
             q += " ORDER BY date_debut DESC"
         return [Conge.from_db_row(r) for r in self.execute_query(q, p, fetch="all") if r]
 
+    def get_conges_by_ids(self, conge_ids):
+        """Charge plusieurs congés par lots de MAX_SQL_VARIABLES identifiants."""
+        conge_ids = list(conge_ids)
+        conges = []
+        for i in range(0, len(conge_ids), self.MAX_SQL_VARIABLES):
+            chunk = conge_ids[i:i + self.MAX_SQL_VARIABLES]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.execute_query(f"SELECT id, agent_id, type_conge, justif, interim_id, date_debut, date_fin, jours_pris, statut FROM conges WHERE id IN ({placeholders})", tuple(chunk), fetch="all")
+            conges.extend(Conge.from_db_row(r) for r in rows if r)
+        return conges
+
+    def get_conges_between(self, start_date, end_date, type_conge=None):
+        """Congés actifs qui débutent entre start_date et end_date (inclus), triés par date."""
+        q = "SELECT id, agent_id, type_conge, justif, interim_id, date_debut, date_fin, jours_pris, statut FROM conges WHERE statut = 'Actif' AND date(date_debut) BETWEEN ? AND ?"
+        p = [start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')]
+        if type_conge:
+            q += " AND type_conge = ?"
+            p.append(type_conge)
+        q += " ORDER BY date_debut"
+        return [Conge.from_db_row(r) for r in self.execute_query(q, tuple(p), fetch="all") if r]
+
     def get_conge_by_id(self, conge_id):
         r = self.execute_query("SELECT id, agent_id, type_conge, justif, interim_id, date_debut, date_fin, jours_pris, statut FROM conges WHERE id=?", (conge_id,), fetch="one")
         return Conge.from_db_row(r) if r else None
         
     def get_overlapping_leaves(self, agent_id, start_date, end_date, conge_id_exclu=None):
-        q = "SELECT * FROM conges WHERE agent_id=? AND date_fin >= ? AND date_debut <= ? AND statut = 'Actif'"
-        p = [agent_id, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')]
+        """
+        Retourne les congés actifs de l'agent qui chevauchent [start_date, end_date].
+        La recherche passe par l'index R*Tree 'conges_intervalles' ; le filtre exact
+        sur les dates est réappliqué sur la table 'conges' (l'index stocke des flottants).
+        """
+        debut_sql, fin_sql = start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
+        q = """
+            SELECT c.id, c.agent_id, c.type_conge, c.justif, c.interim_id, c.date_debut, c.date_fin, c.jours_pris, c.statut
+            FROM conges_intervalles i
+            JOIN conges c ON c.id = i.id
+            WHERE i.agent_min <= ? AND i.agent_max >= ?
+              AND i.jour_debut <= julianday(?) AND i.jour_fin >= julianday(?)
+              AND date(c.date_fin) >= ? AND date(c.date_debut) <= ? AND c.statut = 'Actif'
+        """
+        p = [agent_id, agent_id, fin_sql, debut_sql, debut_sql, fin_sql]
         if conge_id_exclu:
-            q += " AND id != ?"
+            q += " AND c.id != ?"
             p.append(conge_id_exclu)
         return [Conge.from_db_row(r) for r in self.execute_query(q, tuple(p), fetch="all") if r]
 
+    def get_agents_disponibles(self, start_date, end_date):
+        """
+        Retourne les agents (sans soldes) qui n'ont aucun congé actif sur [start_date, end_date].
+        Les agents occupés sont obtenus en une seule interrogation de l'index R*Tree.
+        """
+        debut_sql, fin_sql = start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
+        q = """
+            SELECT id, nom, prenom, ppr, grade FROM agents
+            WHERE id NOT IN (
+                SELECT c.agent_id
+                FROM conges_intervalles i
+                JOIN conges c ON c.id = i.id
+                WHERE i.jour_debut <= julianday(?) AND i.jour_fin >= julianday(?)
+                  AND date(c.date_fin) >= ? AND date(c.date_debut) <= ? AND c.statut = 'Actif'
+            )
+            ORDER BY nom, prenom
+        """
+        rows = self.execute_query(q, (fin_sql, debut_sql, debut_sql, fin_sql), fetch="all")
+        return [Agent.from_db_row(row) for row in rows]
+
     def get_holidays_for_year(self, year):
         return self.execute_query("SELECT date, nom, type FROM jours_feries_personnalises WHERE strftime('%Y', date) = ? ORDER BY date", (str(year),), fetch="all")
         
     def get_certificat_for_conge(self, conge_id):
         return self.execute_query("SELECT * FROM certificats_medicaux WHERE conge_id = ?", (conge_id,), fetch="one")
+
+    def get_certificats_for_agent(self, agent_id):
+        """Certificats de tous les congés d'un agent en une requête : {conge_id: ligne} (mêmes colonnes que get_certificat_for_conge)."""
+        rows = self.execute_query("SELECT cm.* FROM certificats_medicaux cm JOIN conges c ON c.id = cm.conge_id WHERE c.agent_id = ?",
+                                  (agent_id,), fetch="all")
+        return {row[1]: row for row in rows}
     
-    def add_certificat(self, conge_id, file_path):
+    def add_certificat(self, conge_id, file_path, sha256=None):
         """
         Ajoute ou met à jour l'entrée pour un certificat médical.
         Utilise REPLACE pour simplifier la logique (si un cert existe déjà, il est remplacé).
         """
-        query = "REPLACE INTO certificats_medicaux (id, conge_id, chemin_fichier) VALUES ((SELECT id FROM certificats_medicaux WHERE conge_id=?), ?, ?)"
-        self.execute_query(query, (conge_id, conge_id, file_path))
+        query = "REPLACE INTO certificats_medicaux (id, conge_id, chemin_fichier, sha256) VALUES ((SELECT id FROM certificats_medicaux WHERE conge_id=?), ?, ?, ?)"
+        self.execute_query(query, (conge_id, conge_id, file_path, sha256))
+
+    def get_certificats_index(self):
+        """Tous les certificats en une requête : (id, conge_id, chemin_fichier, sha256, fichier_present)."""
+        return self.execute_query("SELECT id, conge_id, chemin_fichier, sha256, fichier_present FROM certificats_medicaux", fetch="all")
+
+    def update_certificats_presence(self, presence):
+        """
+        Met à jour la présence des fichiers à partir d'un dictionnaire {certificat_id: 0|1}.
+        Ne valide PAS la transaction : la validation est à la charge de l'appelant.
+        """
+        self.conn.cursor().executemany("UPDATE certificats_medicaux SET fichier_present = ? WHERE id = ?",
+                                       [(int(present), cert_id) for cert_id, present in presence.items()])
+
+    def relink_certificats(self, chemins):
+        """
+        Fait pointer des certificats vers un nouveau fichier ({certificat_id: chemin}).
+        Ne valide PAS la transaction : la validation est à la charge de l'appelant.
+        """
+        self.conn.cursor().executemany("UPDATE certificats_medicaux SET chemin_fichier = ?, fichier_present = 1 WHERE id = ?",
+                                       [(chemin, cert_id) for cert_id, chemin in chemins.items()])
+
+    def delete_certificats(self, cert_ids):
+        """
+        Supprime des certificats (le congé redevient « sans justificatif »).
+        Ne valide PAS la transaction : la validation est à la charge de l'appelant.
+        """
+        self.conn.cursor().executemany("DELETE FROM certificats_medicaux WHERE id = ?", [(cert_id,) for cert_id in cert_ids])
+
+    def get_config_value(self, key, default=None):
+        result = self.execute_query("SELECT config_value FROM system_config WHERE config_key = ?", (key,), fetch="one")
+        return result[0] if result else default
+
+    def set_config_value(self, key, value):
+        self.execute_query("REPLACE INTO system_config (config_key, config_value) VALUES (?, ?)", (key, str(value)))
+
+    def count_certificat_references(self, file_path):
+        """Nombre de certificats qui référencent le fichier 'file_path' (requête indexée)."""
+        return self.execute_query("SELECT COUNT(*) FROM certificats_medicaux WHERE chemin_fichier = ?", (file_path,), fetch="one")[0]
 
     def add_or_update_holiday(self, date_sql, name, h_type):
         self.execute_query("REPLACE INTO jours_feries_personnalises (date, nom, type) VALUES (?, ?, ?)", (date_sql, name, h_type))
@@ -271,22 +438,34 @@ class DatabaseManager:
         return True
         
     def get_sick_leaves_by_status(self, status='manquant', search_term=None):
+        """
+        Congés de maladie actifs filtrés par statut de justificatif ('manquant', 'justifie' ou 'tous').
+        Le statut est lu dans conges.certificat_status (maintenu par triggers) : la requête
+        parcourt l'index partiel idx_conges_maladie_certificat, sans jointure sur les certificats.
+        """
         query_base = "SELECT a.nom, a.prenom, a.ppr, c.date_debut, c.date_fin, c.jours_pris, c.id FROM conges c JOIN agents a ON c.agent_id = a.id"
         where_clauses = ["c.type_conge = 'Congé de maladie'", "c.statut = 'Actif'"]
         params = []
-        if status == 'manquant':
-            query_join = "LEFT JOIN certificats_medicaux cm ON c.id = cm.conge_id"
-            where_clauses.append("cm.id IS NULL")
-        elif status == 'justifie':
-            query_join = "INNER JOIN certificats_medicaux cm ON c.id = cm.conge_id"
-        else: # 'tous'
-            query_join = "LEFT JOIN certificats_medicaux cm ON c.id = cm.conge_id"
+        if status in ('manquant', 'justifie'):
+            where_clauses.append("c.certificat_status = ?")
+            params.append(status)
         if search_term:
             term = f"%{search_term.lower()}%"
             where_clauses.append("(LOWER(a.nom) LIKE ? OR LOWER(a.prenom) LIKE ? OR LOWER(a.ppr) LIKE ?)")
             params.extend([term, term, term])
-        final_query = f"{query_base} {query_join} WHERE {' AND '.join(where_clauses)} ORDER BY c.date_debut DESC"
+        final_query = f"{query_base} WHERE {' AND '.join(where_clauses)} ORDER BY c.date_debut DESC"
         return self.execute_query(final_query, tuple(params), fetch="all")
+
+    def count_sick_leaves_by_status(self):
+        """Nombre de congés de maladie actifs par statut de justificatif : {'manquant': n, 'justifie': m}."""
+        rows = self.execute_query("""
+            SELECT certificat_status, COUNT(*) FROM conges
+            WHERE type_conge = 'Congé de maladie' AND statut = 'Actif'
+            GROUP BY certificat_status
+        """, fetch="all")
+        counts = {'manquant': 0, 'justifie': 0}
+        counts.update({status: count for status, count in rows if status})
+        return counts
     
     def get_agents_on_leave_today(self):
         query = """
@@ -0,0 +1,81 @@
+# Fichier : db/migration_planner.py
+# Planification et application des migrations SQL (db/migrations/NNN_description.sql).
+#
+# Les versions appliquées sont enregistrées dans la table db_version. Une fois la base à
+# jour, une empreinte est écrite dans l'en-tête du fichier (PRAGMA user_version) :
+#     user_version = (schema_version << 8) | (dernier script de db/migrations, modulo 256)
+# où schema_version est le compteur que SQLite incrémente à chaque modification du
+# schéma. Au démarrage suivant, une lecture de pragma et la liste du dossier des
+# migrations suffisent : si l'empreinte correspond, il n'y a ni création de tables, ni
+# lecture des scripts, ni inspection du schéma. L'ajout d'un script change l'empreinte
+# attendue ; toute modification du schéma faite en dehors des migrations (restauration
+# d'une sauvegarde, outil externe...) change l'empreinte enregistrée : dans les deux cas,
+# une vérification complète est faite.
+#
+# Chaque script est appliqué dans sa propre transaction, avec l'enregistrement de sa
+# version : une migration qui échoue est entièrement annulée. Les scripts ne doivent donc
+# pas ouvrir ni valider de transaction eux-mêmes.
+
+import logging
+import os
+import re
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), 'migrations')
+_SCRIPT_RE = re.compile(r'(\d+)_.*\.sql$')
+# BEGIN [TRANSACTION]; ou COMMIT; en début de ligne (les BEGIN ... END des triggers ne sont pas concernés).
+_TRANSACTION_RE = re.compile(r'^\s*(BEGIN(\s+(DEFERRED|IMMEDIATE|EXCLUSIVE))?(\s+TRANSACTION)?|COMMIT(\s+TRANSACTION)?)\s*;', re.I | re.M)
+
+
+def latest_script_version(migrations_dir=MIGRATIONS_DIR):
+    """Numéro du dernier script de migration disponible (0 s'il n'y en a aucun)."""
+    return max(list_migrations(migrations_dir), default=0)
+
+
+def expected_fingerprint(schema_version, migrations_dir=MIGRATIONS_DIR):
+    return (schema_version << 8) | (latest_script_version(migrations_dir) & 0xFF)
+
+
+def is_up_to_date(conn, migrations_dir=MIGRATIONS_DIR):
+    """Vrai si l'empreinte enregistrée correspond au schéma actuel et aux scripts disponibles."""
+    user_version, schema_version = conn.execute("SELECT * FROM pragma_user_version, pragma_schema_version").fetchone()
+    return user_version != 0 and user_version == expected_fingerprint(schema_version, migrations_dir)
+
+
+def record_fingerprint(conn, migrations_dir=MIGRATIONS_DIR):
+    """Enregistre l'empreinte du schéma courant dans l'en-tête de la base."""
+    schema_version = conn.execute("PRAGMA schema_version").fetchone()[0]
+    conn.execute(f"PRAGMA user_version = {expected_fingerprint(schema_version, migrations_dir)}")
+
+
+def list_migrations(migrations_dir=MIGRATIONS_DIR):
+    """{version: chemin} des scripts de migration disponibles."""
+    migrations = {}
+    if os.path.exists(migrations_dir):
+        for filename in os.listdir(migrations_dir):
+            match = _SCRIPT_RE.match(filename)
+            if match:
+                migrations[int(match.group(1))] = os.path.join(migrations_dir, filename)
+    return migrations
+
+
+def plan_migrations(current_version, migrations_dir=MIGRATIONS_DIR):
+    """Liste ordonnée des (version, chemin) à appliquer au-delà de 'current_version'."""
+    migrations = list_migrations(migrations_dir)
+    return [(version, migrations[version]) for version in sorted(migrations) if version > current_version]
+
+
+def apply_migration(conn, version, script_path):
+    """Applique un script et enregistre sa version, dans une seule transaction."""
+    with open(script_path, 'r', encoding='utf-8') as f:
+        script = f.read()
+    if _TRANSACTION_RE.search(script):
+        raise ValueError(f"Le script {os.path.basename(script_path)} gère lui-même sa transaction : "
+                         "retirez BEGIN TRANSACTION / COMMIT, chaque migration est déjà transactionnelle.")
+    try:
+        # executescript valide d'abord toute transaction en cours, puis exécute le bloc tel quel.
+        conn.executescript(f"BEGIN;\n{script}\n;REPLACE INTO db_version (version) VALUES ({int(version)});\nCOMMIT;")
+    except Exception:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    logging.info(f"Migration {version} appliquée ({os.path.basename(script_path)}).")
@@ -2,9 +2,6 @@
 -- ## Version FINALE V3 : Script de migration 100% sûr                   ##
 -- ##########################################################################
 
-PRAGMA foreign_keys=ON;
-BEGIN TRANSACTION;
-
 -- On crée toutes les tables nécessaires dans leur état final avec "IF NOT EXISTS"
 -- Cela garantit que la structure de base existe, peu importe l'état initial.
 CREATE TABLE IF NOT EXISTS agents (
@@ -64,5 +61,3 @@ CREATE INDEX IF NOT EXISTS idx_soldes_agent_id ON soldes_annuels (agent_id);
 
 -- On insère la version 1 si elle n'existe pas, pour marquer que la structure de base est là.
 INSERT OR IGNORE INTO db_version (version) VALUES (1);
-
-COMMIT;
\ No newline at end of file
@@ -0,0 +1,40 @@
+-- ##########################################################################
+-- ## Version 3 : Index d'intervalles (R*Tree) pour la détection des        ##
+-- ## chevauchements de congés                                             ##
+-- ##########################################################################
+-- Un index B-tree ne peut servir qu'une seule des deux bornes du prédicat
+-- "date_fin >= ? AND date_debut <= ?". L'index R*Tree indexe le couple
+-- (agent, [début, fin]) en jours juliens : la recherche reste logarithmique
+-- quel que soit l'historique de l'agent.
+
+CREATE VIRTUAL TABLE IF NOT EXISTS conges_intervalles USING rtree(
+    id,
+    agent_min, agent_max,
+    jour_debut, jour_fin
+);
+
+-- Alimentation initiale à partir des congés existants.
+INSERT OR REPLACE INTO conges_intervalles (id, agent_min, agent_max, jour_debut, jour_fin)
+    SELECT id, agent_id, agent_id, julianday(date_debut), julianday(date_fin) FROM conges;
+
+-- Maintien automatique de l'index par triggers.
+CREATE TRIGGER IF NOT EXISTS trg_conges_intervalles_insert AFTER INSERT ON conges
+BEGIN
+    INSERT OR REPLACE INTO conges_intervalles (id, agent_min, agent_max, jour_debut, jour_fin)
+    VALUES (new.id, new.agent_id, new.agent_id, julianday(new.date_debut), julianday(new.date_fin));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_conges_intervalles_update AFTER UPDATE OF agent_id, date_debut, date_fin ON conges
+BEGIN
+    UPDATE conges_intervalles
+       SET agent_min = new.agent_id, agent_max = new.agent_id,
+           jour_debut = julianday(new.date_debut), jour_fin = julianday(new.date_fin)
+     WHERE id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_conges_intervalles_delete AFTER DELETE ON conges
+BEGIN
+    DELETE FROM conges_intervalles WHERE id = old.id;
+END;
+
+INSERT OR IGNORE INTO db_version (version) VALUES (3);
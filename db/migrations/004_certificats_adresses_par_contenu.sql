@@ -0,0 +1,12 @@
+-- ##########################################################################
+-- ## Version 4 : Certificats médicaux adressés par contenu                  ##
+-- ##########################################################################
+-- Les certificats sont désormais rangés sous le nom de leur empreinte SHA-256 :
+-- plusieurs congés peuvent référencer le même fichier. L'index sur le chemin
+-- permet de compter les références avant de supprimer un fichier.
+
+ALTER TABLE certificats_medicaux ADD COLUMN sha256 TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_certificats_chemin ON certificats_medicaux (chemin_fichier);
+
+INSERT OR IGNORE INTO db_version (version) VALUES (4);
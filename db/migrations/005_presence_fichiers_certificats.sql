@@ -0,0 +1,10 @@
+-- ##########################################################################
+-- ## Version 5 : Présence des fichiers justificatifs                        ##
+-- ##########################################################################
+-- L'existence du fichier de chaque certificat est mémorisée dans la base et
+-- tenue à jour par l'analyseur de cohérence (core/conges/certificate_scanner.py) :
+-- l'interface n'a plus besoin d'interroger le système de fichiers ligne par ligne.
+
+ALTER TABLE certificats_medicaux ADD COLUMN fichier_present INTEGER NOT NULL DEFAULT 1;
+
+INSERT OR IGNORE INTO db_version (version) VALUES (5);
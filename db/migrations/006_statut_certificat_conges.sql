@@ -0,0 +1,52 @@
+-- ##########################################################################
+-- ## Version 6 : Statut du justificatif maintenu sur les congés de maladie ##
+-- ##########################################################################
+-- conges.certificat_status vaut 'manquant' ou 'justifie' pour un congé de maladie
+-- (NULL pour les autres types). Il est tenu à jour par triggers : le suivi des
+-- justificatifs n'a plus besoin de jointure avec certificats_medicaux, et l'index
+-- partiel ci-dessous ne couvre que les congés de maladie actifs.
+
+ALTER TABLE conges ADD COLUMN certificat_status TEXT;
+
+UPDATE conges
+   SET certificat_status = CASE
+           WHEN EXISTS (SELECT 1 FROM certificats_medicaux cm WHERE cm.conge_id = conges.id) THEN 'justifie'
+           ELSE 'manquant'
+       END
+ WHERE type_conge = 'Congé de maladie';
+
+CREATE INDEX IF NOT EXISTS idx_conges_maladie_certificat
+    ON conges (certificat_status, date_debut DESC)
+    WHERE type_conge = 'Congé de maladie' AND statut = 'Actif';
+
+CREATE TRIGGER IF NOT EXISTS trg_conges_certificat_status_insert AFTER INSERT ON conges
+WHEN new.type_conge = 'Congé de maladie'
+BEGIN
+    UPDATE conges SET certificat_status = 'manquant' WHERE id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_conges_certificat_status_type AFTER UPDATE OF type_conge ON conges
+BEGIN
+    UPDATE conges
+       SET certificat_status = CASE
+               WHEN new.type_conge != 'Congé de maladie' THEN NULL
+               WHEN EXISTS (SELECT 1 FROM certificats_medicaux cm WHERE cm.conge_id = new.id) THEN 'justifie'
+               ELSE 'manquant'
+           END
+     WHERE id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_certificats_status_insert AFTER INSERT ON certificats_medicaux
+BEGIN
+    UPDATE conges SET certificat_status = 'justifie'
+     WHERE id = new.conge_id AND type_conge = 'Congé de maladie';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_certificats_status_delete AFTER DELETE ON certificats_medicaux
+BEGIN
+    UPDATE conges SET certificat_status = 'manquant'
+     WHERE id = old.conge_id AND type_conge = 'Congé de maladie'
+       AND NOT EXISTS (SELECT 1 FROM certificats_medicaux cm WHERE cm.conge_id = old.conge_id);
+END;
+
+INSERT OR IGNORE INTO db_version (version) VALUES (6);
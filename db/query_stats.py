@@ -0,0 +1,174 @@
+# Fichier : db/query_stats.py
+# Instrumentation des requêtes SQL exécutées par DatabaseManager.execute_query (diagnostic).
+#
+# Désactivée par défaut : elle s'active dans config.yaml (section 'diagnostics'). Quand elle
+# est active, chaque requête est chronométrée et comptabilisée sous sa forme normalisée
+# (littéraux et listes "IN (?, ?, ...)" remplacés, espaces regroupés) : nombre d'appels,
+# temps total et maximal, histogramme des durées, lignes retournées ou modifiées et
+# principaux appelants. Les requêtes plus lentes que le seuil 'slow_query_ms' sont écrites
+# dans le journal avec leur plan d'exécution (EXPLAIN QUERY PLAN, calculé une seule fois par
+# requête normalisée).
+#
+# Les requêtes passées directement par db.conn (migrations, insertions groupées) ne sont pas
+# comptabilisées.
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+
+# Bornes supérieures (en ms) des classes de l'histogramme ; une dernière classe reçoit le reste.
+BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+# Cadres ignorés pour désigner l'appelant d'une requête : ce module et l'exécution elle-même.
+_INTERNAL_FILES = {os.path.abspath(__file__)}
+_EXECUTION_FUNCTIONS = {'execute_query', '_execute_instrumented'}
+
+
+@lru_cache(maxsize=4096)
+def normalize_sql(sql):
+    """Forme normalisée d'une requête, qui sert de clé aux statistiques."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _SPACES.sub(" ", sql).strip()
+    return _IN_LIST.sub("(?, ...)", sql)
+
+
+def _frame_label(frame):
+    path = frame.f_code.co_filename
+    parent = os.path.basename(os.path.dirname(path))
+    return f"{parent}/{os.path.basename(path)}:{frame.f_lineno} {frame.f_code.co_name}"
+
+
+def call_site(skip_file=None):
+    """
+    Appelant de la requête : la fonction qui a appelé execute_query et, si elle fait partie de
+    'skip_file' (la couche d'accès aux données), le premier appelant extérieur à ce fichier.
+    """
+    frame = sys._getframe(1)
+    while frame and (os.path.abspath(frame.f_code.co_filename) in _INTERNAL_FILES or frame.f_code.co_name in _EXECUTION_FUNCTIONS):
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    label = _frame_label(frame)
+    if skip_file and frame.f_code.co_filename == skip_file:
+        outer = frame.f_back
+        while outer and outer.f_code.co_filename == skip_file:
+            outer = outer.f_back
+        if outer:
+            label = f"{label} ← {_frame_label(outer)}"
+    return label
+
+
+class QueryStats:
+    """Statistiques des requêtes, regroupées par requête normalisée. Utilisable depuis plusieurs threads."""
+
+    def __init__(self, slow_query_ms=None):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def record(self, sql, duration_ms, rows, params=(), conn=None, skip_file=None):
+        """Comptabilise une exécution ; journalise la requête si elle dépasse le seuil des requêtes lentes."""
+        key = normalize_sql(sql)
+        site = call_site(skip_file)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0,
+                                              'histogram': [0] * (len(BUCKETS_MS) + 1),
+                                              'call_sites': Counter(), 'slow': 0, 'plan': None}
+            entry['count'] += 1
+            entry['total_ms'] += duration_ms
+            entry['max_ms'] = max(entry['max_ms'], duration_ms)
+            entry['rows'] += rows
+            entry['histogram'][bisect_left(BUCKETS_MS, duration_ms)] += 1
+            entry['call_sites'][site] += 1
+            slow = self.slow_query_ms is not None and duration_ms >= self.slow_query_ms
+            if slow:
+                entry['slow'] += 1
+            plan = entry['plan']
+
+        if slow:
+            if plan is None and conn is not None:
+                plan = self._explain(conn, sql, params)
+                with self._lock:
+                    entry['plan'] = plan
+            logging.warning(f"Requête lente ({duration_ms:.1f} ms, {rows} ligne(s)) depuis {site} : "
+                            f"{_SPACES.sub(' ', sql).strip()} | paramètres : {_short_repr(params)} | plan : {plan or '-'}")
+
+    @staticmethod
+    def _explain(conn, sql, params):
+        """Plan d'exécution de la requête, sur une seule ligne ('' si SQLite n'en donne pas)."""
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        except sqlite3.Error:
+            return ""
+        return " ; ".join(row[-1] for row in rows)
+
+    def top(self, n=20, key='total_ms'):
+        """Les n requêtes les plus coûteuses selon 'key' (total_ms, max_ms, mean_ms, count, rows)."""
+        with self._lock:
+            items = [(sql, dict(entry, call_sites=entry['call_sites'].most_common(5), histogram=list(entry['histogram'])))
+                     for sql, entry in self._entries.items()]
+        report = []
+        for sql, entry in items:
+            entry['sql'] = sql
+            entry['mean_ms'] = entry['total_ms'] / entry['count']
+            report.append(entry)
+        report.sort(key=lambda entry: entry[key], reverse=True)
+        return report[:n] if n else report
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+
+    def export_report(self, path, n=None, key='total_ms'):
+        """Écrit les statistiques (toutes les requêtes par défaut) dans un fichier JSON et retourne son chemin."""
+        report = {
+            'generated': datetime.now().isoformat(timespec='seconds'),
+            'slow_query_ms': self.slow_query_ms,
+            'buckets_ms': list(BUCKETS_MS),
+            'queries': self.top(n, key),
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return path
+
+
+def _short_repr(params, limit=200):
+    text = repr(params)
+    return text if len(text) <= limit else f"{text[:limit]}..."
+
+
+_ACTIVE = None
+
+
+def configure(enabled, slow_query_ms=None):
+    """Active (ou désactive) l'instrumentation pour les DatabaseManager créés ensuite."""
+    global _ACTIVE
+    _ACTIVE = QueryStats(slow_query_ms) if enabled else None
+    return _ACTIVE
+
+
+def configure_from_settings(settings):
+    """Applique la section 'diagnostics' de la configuration typée (voir utils/config_loader.py)."""
+    diagnostics = settings.diagnostics
+    return configure(diagnostics.query_stats, diagnostics.slow_query_ms or None)
+
+
+def get_active():
+    """Instrumentation en cours, ou None si elle est désactivée."""
+    return _ACTIVE
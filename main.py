@@ -9,10 +9,14 @@ import os
 import logging
 
 # Imports des modules de l'application, centralisés en haut du fichier.
-from utils.config_loader import load_config, CONFIG
+from utils.config_loader import load_config, CONFIG, get_settings
+from core.interaction import set_interaction_handler
 from db.database import DatabaseManager
+from db import query_stats
 from core.conges.manager import CongeManager
 from ui.main_window import MainWindow
+from ui.tk_interaction import TkInteractionHandler
+from ui import tk_profiler
 
 
 # --- SECTION 1 : Configuration des chemins d'accès ---
@@ -40,12 +44,21 @@ except Exception as e:
 # --- SECTION 3 : Démarrage de l'application ---
 if __name__ == "__main__":
 
+    # Le moteur métier est indépendant de Tkinter : on lui fournit l'adaptateur graphique
+    # pour les confirmations et notifications.
+    set_interaction_handler(TkInteractionHandler())
+
     # Initialisation de l'environnement (chemins, logs).
     CERTIFICATS_DIR_ABS = os.path.join(BASE_DIR, CONFIG['db']['certificates_dir'])
     DB_PATH_ABS = os.path.join(BASE_DIR, CONFIG['db']['filename'])
     LOG_FILE_PATH = os.path.join(BASE_DIR, "conges.log")
     logging.basicConfig(filename=LOG_FILE_PATH, level=logging.INFO,
                         format='%(asctime)s - %(levelname)s - %(name)s - %(message)s')
+    # Diagnostic (section 'diagnostics' de config.yaml) : statistiques et journal des requêtes lentes.
+    query_stats.configure_from_settings(get_settings())
+    diagnostics = get_settings().diagnostics
+    # Le profileur de l'interface doit être installé avant la création des fenêtres.
+    ui_profiler = tk_profiler.install(diagnostics.ui_budget_ms) if diagnostics.ui_profiler else None
 
     # Boucle permettant un redémarrage propre de l'application.
     restart_app = True
@@ -67,15 +80,23 @@ if __name__ == "__main__":
 
         # Initialisation du gestionnaire métier et lancement de l'interface.
         conge_manager = CongeManager(db_manager, CERTIFICATS_DIR_ABS)
+        conge_manager.start_certificate_ingestion()
         
         print(f"--- Lancement de {CONFIG['app']['title']} v{CONFIG['app']['version']} ---")
         app = MainWindow(conge_manager, BASE_DIR)
         app.mainloop()
 
-        # Nettoyage à la fermeture.
+        # Nettoyage à la fermeture (les justificatifs en cours de copie sont terminés avant,
+        # les tâches longues encore en cours sont annulées).
+        app.tasks.shutdown(cancel=True)
+        conge_manager.ingestion.join()
         if hasattr(app, 'restart_on_close') and app.restart_on_close:
             restart_app = True
         
         db_manager.close()
+
+    if ui_profiler:
+        report_path = ui_profiler.write_report(os.path.join(BASE_DIR, diagnostics.ui_profiler_report))
+        print(f"--- Rapport de réactivité de l'interface : {report_path} ---")
     
     print("--- Application fermée, connexion à la base de données terminée. ---")
\ No newline at end of file
@@ -0,0 +1,30 @@
+import sys
+import os
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+from benchmarks.bench_engine import compare
+
+
+def _resultats(cases_par_taille):
+    return {'meta': {'date': '2026-01-01T00:00:00', 'git': 'abc1234'},
+            'scales': {scale: {'dataset': {}, 'cases': cases} for scale, cases in cases_par_taille.items()}}
+
+
+def test_compare_matches_cases_by_scale_and_name(capsys):
+    ancien = _resultats({'1k': {'agents_page': {'median_ms': 10.0}, 'jours_ouvres': {'median_ms': 2.0}}})
+    nouveau = _resultats({'1k': {'agents_page': {'median_ms': 15.0}, 'import_excel': {'skipped': 'openpyxl'}},
+                          '10k': {'agents_page': {'median_ms': 50.0}}})
+
+    assert compare(ancien, nouveau) == 1
+    sortie = capsys.readouterr().out
+    assert "[1k] agents_page" in sortie and "x1.50" in sortie and "plus lent" in sortie
+    assert "[10k]" not in sortie
+
+
+def test_compare_reports_when_nothing_matches(capsys):
+    assert compare(_resultats({'1k': {'agents_page': {'median_ms': 10.0}}}),
+                   _resultats({'10k': {'agents_page': {'median_ms': 10.0}}})) == 0
+    assert "Aucun cas" in capsys.readouterr().out
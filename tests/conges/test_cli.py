@@ -0,0 +1,53 @@
+import sys
+import os
+import subprocess
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, ROOT_DIR)
+# ---------------------------------------------------------------------------
+
+from conges import cli
+from db.backup_store import get_backup_store
+from db.database import DatabaseManager
+
+
+def test_cli_does_not_import_tkinter():
+    code = "import sys, conges.cli; sys.exit(1 if 'tkinter' in sys.modules else 0)"
+    assert subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR).returncode == 0
+
+
+def _main(tmp_path, *args):
+    # Base et certificats dans le dossier temporaire : rien n'est écrit dans le dépôt.
+    return cli.main(["--db", str(tmp_path / "conges.db"), "--certificats", str(tmp_path / "certificats"), *args])
+
+
+def test_backup_command_creates_backup(tmp_path, capsys):
+    db_path = str(tmp_path / "conges.db")
+    assert _main(tmp_path, "backup") == 0
+    assert len(get_backup_store(db_path).list_snapshots()) == 1
+    assert "Sauvegarde créée" in capsys.readouterr().out
+
+
+def test_destructive_commands_require_confirmation(tmp_path):
+    assert _main(tmp_path, "rollover") == 1
+    assert not (tmp_path / "backups").exists()
+
+
+def test_audit_holidays_without_leaves(tmp_path, capsys):
+    assert _main(tmp_path, "audit-holidays", "--year", "2024") == 0
+    assert "Aucune incohérence pour 2024" in capsys.readouterr().out
+
+
+def test_generate_command_fills_empty_database(tmp_path, capsys):
+    assert _main(tmp_path, "generate", "--agents", "50", "--conges-par-agent", "4", "--seed", "3") == 0
+    assert "agents : 50" in capsys.readouterr().out
+    # Une base qui contient déjà des agents n'est jamais complétée, ni son exercice modifié.
+    db = DatabaseManager(str(tmp_path / "conges.db"))
+    assert db.connect()
+    annee = db.get_annee_exercice()
+    db.close()
+    assert _main(tmp_path, "generate", "--agents", "50", "--annee-exercice", str(annee - 5)) == 1
+    assert db.connect()
+    assert db.get_annee_exercice() == annee
+    db.close()
@@ -0,0 +1,36 @@
+import sys
+import os
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+import pytest
+
+from db.database import DatabaseManager
+from core.conges.manager import CongeManager
+from core.interaction import InteractionHandler
+from utils import config_loader
+
+CONGES_CONFIG = {
+    'types_decompte_solde': ['Congé annuel'],
+    'holidays_country': 'MA',
+    'solde_annuel_par_defaut': 22.0,
+}
+
+
+@pytest.fixture(autouse=True)
+def conges_config(monkeypatch):
+    # Section 'conges' fixe, quel que soit le contenu laissé dans CONFIG par les autres tests.
+    # La vue typée (get_settings) est reconstruite à partir de cette section puis restaurée.
+    monkeypatch.setitem(config_loader.CONFIG, 'conges', dict(CONGES_CONFIG))
+    monkeypatch.setattr(config_loader, '_SETTINGS', None)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    db_manager = DatabaseManager(":memory:")
+    assert db_manager.connect()
+    db_manager.run_migrations()
+    yield CongeManager(db_manager, str(tmp_path / "certificats"), interaction=InteractionHandler())
+    db_manager.close()
@@ -0,0 +1,56 @@
+import sys
+import os
+from datetime import date
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+from core.conges.availability import AvailabilityEngine
+
+
+class FakeDb:
+    """Compte les appels à la base pour vérifier le cache par période."""
+    def __init__(self):
+        self.calls = 0
+
+    def get_agents_disponibles(self, start_date, end_date):
+        self.calls += 1
+        return ["agent"]
+
+
+def test_available_agents_are_cached_per_period():
+    db = FakeDb()
+    engine = AvailabilityEngine(db)
+    engine.get_available_agents(date(2024, 8, 5), date(2024, 8, 9))
+    engine.get_available_agents("05/08/2024", "09/08/2024")
+    assert db.calls == 1
+
+    engine.get_available_agents(date(2024, 8, 5), date(2024, 8, 10))
+    assert db.calls == 2
+
+
+def test_invalidate_clears_cache():
+    db = FakeDb()
+    engine = AvailabilityEngine(db)
+    engine.get_available_agents(date(2024, 8, 5), date(2024, 8, 9))
+    engine.invalidate()
+    engine.get_available_agents(date(2024, 8, 5), date(2024, 8, 9))
+    assert db.calls == 2
+
+
+def test_invalid_period_returns_empty_list():
+    db = FakeDb()
+    engine = AvailabilityEngine(db)
+    assert engine.get_available_agents(date(2024, 8, 9), date(2024, 8, 5)) == []
+    assert engine.get_available_agents(None, "") == []
+    assert db.calls == 0
+
+
+def test_cache_is_bounded():
+    db = FakeDb()
+    engine = AvailabilityEngine(db, max_periodes=2)
+    for day in (1, 2, 3):
+        engine.get_available_agents(date(2024, 8, day), date(2024, 8, 20))
+    engine.get_available_agents(date(2024, 8, 1), date(2024, 8, 20))
+    assert db.calls == 4
@@ -0,0 +1,60 @@
+import sys
+import os
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+from core.constants import SoldeStatus
+
+
+def _creer_agent(manager, ppr, solde):
+    agent_id = manager.db.ajouter_agent("Nom", "Prenom", ppr, "PA")
+    manager.db.execute_query("INSERT INTO soldes_annuels (agent_id, annee, solde, statut) VALUES (?, ?, ?, ?)",
+                             (agent_id, 2024, solde, SoldeStatus.ACTIF))
+    return agent_id
+
+
+def test_batch_commits_valid_requests_and_reports_each_item(manager):
+    agent_a = _creer_agent(manager, "A", 10)
+    agent_b = _creer_agent(manager, "B", 10)
+    rapports = manager.submit_conges_batch([
+        {'agent_id': agent_a, 'type_conge': 'Congé annuel', 'date_debut': '05/08/2024', 'date_fin': '09/08/2024', 'jours_pris': 5},
+        {'agent_id': agent_b, 'type_conge': 'Congé exceptionnel', 'date_debut': '2024-08-05', 'date_fin': '2024-08-06'},
+        {'agent_id': 999, 'type_conge': 'Congé annuel', 'date_debut': '05/08/2024', 'date_fin': '09/08/2024'},
+    ])
+    assert [r['statut'] for r in rapports] == ['accepte', 'accepte', 'rejete']
+    assert rapports[1]['jours_pris'] == 2
+    assert len(manager.get_conges_for_agent(agent_a)) == 1
+    assert manager.get_agent_by_id(agent_a).get_solde_total_actif() == 5
+
+
+def test_batch_rejects_intra_batch_overlap(manager):
+    agent_id = _creer_agent(manager, "A", 20)
+    rapports = manager.submit_conges_batch([
+        {'agent_id': agent_id, 'type_conge': 'Congé annuel', 'date_debut': '05/08/2024', 'date_fin': '09/08/2024', 'jours_pris': 5},
+        {'agent_id': agent_id, 'type_conge': 'Congé annuel', 'date_debut': '09/08/2024', 'date_fin': '12/08/2024', 'jours_pris': 2},
+    ])
+    assert [r['statut'] for r in rapports] == ['accepte', 'rejete']
+    assert "n°0" in rapports[1]['erreur']
+
+
+def test_batch_uses_one_balance_snapshot(manager):
+    agent_id = _creer_agent(manager, "A", 6)
+    rapports = manager.submit_conges_batch([
+        {'agent_id': agent_id, 'type_conge': 'Congé annuel', 'date_debut': '05/08/2024', 'date_fin': '09/08/2024', 'jours_pris': 5},
+        {'agent_id': agent_id, 'type_conge': 'Congé annuel', 'date_debut': '12/08/2024', 'date_fin': '13/08/2024', 'jours_pris': 2},
+    ])
+    assert [r['statut'] for r in rapports] == ['accepte', 'rejete']
+    assert "insuffisant" in rapports[1]['erreur']
+    assert manager.get_agent_by_id(agent_id).get_solde_total_actif() == 1
+
+
+def test_batch_rejects_interim_on_leave(manager):
+    agent_id = _creer_agent(manager, "A", 20)
+    interim_id = _creer_agent(manager, "B", 20)
+    rapports = manager.submit_conges_batch([
+        {'agent_id': interim_id, 'type_conge': 'Congé annuel', 'date_debut': '05/08/2024', 'date_fin': '09/08/2024', 'jours_pris': 5},
+        {'agent_id': agent_id, 'type_conge': 'Congé annuel', 'date_debut': '08/08/2024', 'date_fin': '12/08/2024', 'jours_pris': 3, 'interim_id': interim_id},
+    ])
+    assert [r['statut'] for r in rapports] == ['accepte', 'rejete']
@@ -0,0 +1,104 @@
+import sys
+import os
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+import pytest
+
+from db.database import DatabaseManager
+from core.conges.manager import CongeManager
+from core.conges import certificate_ingestion
+from core.conges.certificate_ingestion import PreviewCache
+from core.interaction import InteractionHandler
+
+
+@pytest.fixture
+def manager(tmp_path):
+    db_manager = DatabaseManager(str(tmp_path / "conges.db"))
+    assert db_manager.connect()
+    db_manager.run_migrations()
+    manager = CongeManager(db_manager, str(tmp_path / "certificats"), interaction=InteractionHandler())
+    manager.start_certificate_ingestion()
+    yield manager
+    db_manager.close()
+
+
+def _soumettre_maladie(manager, agent_id, cert_path, conge_id=None):
+    form_data = {'agent_id': agent_id, 'type_conge': 'Congé de maladie', 'date_debut': '01/07/2024',
+                 'date_fin': '02/07/2024', 'jours_pris': 2, 'cert_path': cert_path, 'conge_id': conge_id}
+    manager.handle_conge_submission(form_data, is_modification=conge_id is not None)
+    return manager.get_conges_for_agent(agent_id)[0].id
+
+
+def test_certificate_is_ingested_in_background(manager, tmp_path):
+    scan = tmp_path / "scan.pdf"
+    scan.write_bytes(b"%PDF-1.4 " + b"x" * 4096)
+    agent_id = manager.db.ajouter_agent("Nom", "Prenom", "P1", "PA")
+
+    conge_id = _soumettre_maladie(manager, agent_id, str(scan))
+    manager.ingestion.join()
+
+    [result] = manager.ingestion.poll_results()
+    assert result['erreur'] is None and result['conge_id'] == conge_id
+    cert = manager.get_certificat_for_conge(conge_id)
+    assert cert[2] == result['chemin'] and cert[3] == result['sha256']
+    assert manager.certificats.contains(cert[2])
+
+
+def test_modification_keeps_shared_file_until_new_certificate_is_recorded(manager, tmp_path):
+    scan = tmp_path / "scan.pdf"
+    scan.write_bytes(b"%PDF-1.4 certificat")
+    agent_id = manager.db.ajouter_agent("Nom", "Prenom", "P1", "PA")
+    conge_id = _soumettre_maladie(manager, agent_id, str(scan))
+    manager.ingestion.join()
+    chemin = manager.get_certificat_for_conge(conge_id)[2]
+
+    # On modifie le congé en gardant le même justificatif (déjà dans le magasin).
+    nouveau_id = _soumettre_maladie(manager, agent_id, chemin, conge_id=conge_id)
+    manager.ingestion.join()
+    assert manager.get_certificat_for_conge(nouveau_id)[2] == chemin
+    assert os.path.exists(chemin)
+
+
+def test_preview_cache_skips_unsupported_files(tmp_path):
+    source = tmp_path / "notes.txt"
+    source.write_text("pas d'aperçu")
+    cache = PreviewCache(str(tmp_path / "certificats"))
+    assert cache.ensure("0" * 64, str(source)) is None
+    assert cache.get("0" * 64) is None
+
+
+def test_preview_cache_copies_native_images_without_pillow(tmp_path, monkeypatch):
+    monkeypatch.setattr(certificate_ingestion, "IMAGE_PREVIEW_AVAILABLE", False)
+    source = tmp_path / "certificat.gif"
+    # GIF 1x1 minimal, lisible par tk.PhotoImage.
+    source.write_bytes(b"GIF89a\x01\x00\x01\x00\x00\x00\x00;")
+    cache = PreviewCache(str(tmp_path / "certificats"))
+    path = cache.ensure("1" * 64, str(source))
+    assert path == cache.get("1" * 64)
+    with open(path, "rb") as f:
+        assert f.read() == source.read_bytes()
+
+
+def test_preview_is_removed_with_the_last_reference(manager, tmp_path, monkeypatch):
+    monkeypatch.setattr(certificate_ingestion, "IMAGE_PREVIEW_AVAILABLE", False)
+    premier, second = tmp_path / "premier.gif", tmp_path / "second.gif"
+    premier.write_bytes(b"GIF89a\x01\x00\x01\x00\x00\x00\x00;")
+    second.write_bytes(b"GIF89a\x02\x00\x01\x00\x00\x00\x00;")
+    agent_id = manager.db.ajouter_agent("Nom", "Prenom", "P1", "PA")
+    conge_id = _soumettre_maladie(manager, agent_id, str(premier))
+    manager.ingestion.join()
+    apercu = manager.get_certificat_preview(conge_id)
+    assert apercu and os.path.exists(apercu)
+
+    # Justificatif remplacé : l'aperçu de l'ancien contenu est supprimé avec son fichier.
+    conge_id = _soumettre_maladie(manager, agent_id, str(second), conge_id=conge_id)
+    manager.ingestion.join()
+    assert not os.path.exists(apercu)
+    apercu = manager.get_certificat_preview(conge_id)
+    assert apercu and os.path.exists(apercu)
+
+    manager.delete_conge(conge_id)
+    assert not os.path.exists(apercu)
@@ -0,0 +1,81 @@
+import sys
+import os
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+import pytest
+
+from db.database import DatabaseManager
+from db.models import Conge
+from core.conges.certificate_store import CertificateStore
+from core.conges.certificate_scanner import scan_certificats
+
+
+@pytest.fixture
+def env(tmp_path):
+    db_manager = DatabaseManager(":memory:")
+    assert db_manager.connect()
+    db_manager.run_migrations()
+    store = CertificateStore(str(tmp_path / "certificats"))
+    agent_id = db_manager.ajouter_agent("Nom", "Prenom", "P1", "PA")
+    yield db_manager, store, tmp_path, agent_id
+    db_manager.close()
+
+
+def _rattacher(db_manager, store, tmp_path, agent_id, contenu, jour):
+    source = tmp_path / f"source_{jour}.pdf"
+    source.write_bytes(contenu)
+    conge_id = db_manager.ajouter_conge(Conge(None, agent_id, "Congé de maladie", None, None, f"2024-07-{jour:02d}", f"2024-07-{jour:02d}", 1))
+    digest, chemin = store.ingest(str(source))
+    db_manager.add_certificat(conge_id, chemin, digest)
+    return conge_id, chemin
+
+
+def _vieillir(*chemins):
+    for chemin in chemins:
+        os.utime(chemin, (0, 0))
+
+
+def test_scan_reports_and_repairs_missing_and_orphaned_files(env):
+    db_manager, store, tmp_path, agent_id = env
+    conge_id, chemin = _rattacher(db_manager, store, tmp_path, agent_id, b"certificat A", 1)
+    os.remove(chemin)
+    (tmp_path / "orphelin.pdf").write_bytes(b"jamais enregistre")
+    _, orphelin = store.ingest(str(tmp_path / "orphelin.pdf"))
+
+    rapport = scan_certificats(db_manager, store)
+    assert [m['conge_id'] for m in rapport['manquants']] == [conge_id]
+    assert rapport['orphelins'] == [orphelin]
+    assert db_manager.get_certificat_for_conge(conge_id)[4] == 0
+    assert rapport['fichiers_supprimes'] == 0
+
+    _vieillir(orphelin)
+    rapport = scan_certificats(db_manager, store, repair=True, full=True)
+    assert rapport['certificats_supprimes'] == 1 and rapport['fichiers_supprimes'] == 1
+    assert db_manager.get_certificat_for_conge(conge_id) is None
+    assert not os.path.exists(orphelin)
+
+
+def test_repair_relinks_missing_file_to_stored_content(env):
+    db_manager, store, tmp_path, agent_id = env
+    conge_id, chemin = _rattacher(db_manager, store, tmp_path, agent_id, b"certificat B", 2)
+    ancien_chemin = os.path.join(store.root_dir, "20240101_P1_1.pdf")
+    db_manager.execute_query("UPDATE certificats_medicaux SET chemin_fichier = ? WHERE conge_id = ?", (ancien_chemin, conge_id))
+
+    rapport = scan_certificats(db_manager, store, repair=True)
+    assert rapport['certificats_relies'] == 1
+    assert db_manager.get_certificat_for_conge(conge_id)[2] == chemin
+
+
+def test_incremental_scan_skips_unchanged_shards(env):
+    db_manager, store, tmp_path, agent_id = env
+    _, chemin = _rattacher(db_manager, store, tmp_path, agent_id, b"certificat C", 3)
+    _vieillir(os.path.dirname(chemin))
+
+    complet = scan_certificats(db_manager, store, full=True)
+    incremental = scan_certificats(db_manager, store)
+    assert incremental['dossiers_analyses'] < complet['dossiers_analyses']
+    assert incremental['fichiers_analyses'] == 0
+    assert incremental['manquants'] == [] and complet['manquants'] == []
@@ -0,0 +1,57 @@
+import sys
+import os
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+import hashlib
+
+import pytest
+
+from core.conges.certificate_store import CertificateStore
+
+
+@pytest.fixture
+def scan(tmp_path):
+    path = tmp_path / "scan.PDF"
+    path.write_bytes(b"%PDF-1.4 certificat" * 1000)
+    return str(path)
+
+
+def test_ingest_stores_by_hash_in_sharded_directories(tmp_path, scan):
+    store = CertificateStore(str(tmp_path / "certificats"))
+    digest, path = store.ingest(scan)
+    with open(scan, 'rb') as f:
+        assert digest == hashlib.sha256(f.read()).hexdigest()
+    assert path == store.path_for(digest, ".pdf")
+    assert os.path.relpath(path, store.root_dir).split(os.sep)[:2] == [digest[:2], digest[2:4]]
+    assert store.contains(path)
+    assert os.listdir(store.tmp_dir) == []
+
+
+def test_ingest_deduplicates_identical_content(tmp_path, scan):
+    store = CertificateStore(str(tmp_path / "certificats"))
+    _, first = store.ingest(scan)
+    _, second = store.ingest(scan)
+    assert first == second
+    # Un fichier déjà rangé dans le magasin est réutilisé tel quel.
+    assert store.ingest(first) == (os.path.splitext(os.path.basename(first))[0], first)
+
+
+def test_shared_certificate_is_collected_with_its_last_reference(manager, scan):
+    agent_id = manager.db.ajouter_agent("Nom", "Prenom", "P1", "PA")
+    for debut, fin in (('01/07/2024', '02/07/2024'), ('10/07/2024', '11/07/2024')):
+        manager.handle_conge_submission({
+            'agent_id': agent_id, 'type_conge': 'Congé de maladie', 'date_debut': debut, 'date_fin': fin,
+            'jours_pris': 2, 'cert_path': scan,
+        }, is_modification=False)
+    conge_ids = [c.id for c in manager.get_conges_for_agent(agent_id)]
+    chemins = {manager.get_certificat_for_conge(conge_id)[2] for conge_id in conge_ids}
+    assert len(chemins) == 1
+    chemin = chemins.pop()
+
+    manager.delete_conge(conge_ids[0])
+    assert os.path.exists(chemin)
+    manager.delete_conge(conge_ids[1])
+    assert not os.path.exists(chemin)
@@ -0,0 +1,65 @@
+import sys
+import os
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+import zipfile
+
+from db.models import Conge
+from core.constants import SoldeStatus
+
+
+def _creer_conge(manager, ppr, grade, debut, fin, jours):
+    agent_id = manager.db.ajouter_agent("Nom", "Prenom", ppr, grade)
+    manager.db.execute_query("INSERT INTO soldes_annuels (agent_id, annee, solde, statut) VALUES (?, ?, ?, ?)",
+                             (agent_id, 2024, 22, SoldeStatus.ACTIF))
+    return manager.db.ajouter_conge(Conge(None, agent_id, "Congé annuel", None, None, debut, fin, jours))
+
+
+def test_prepare_decision_jobs_builds_contexts_and_reports_missing_templates(manager, tmp_path):
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "adjoint_technique.docx").write_bytes(b"")
+    avec_modele = _creer_conge(manager, "P1", "Adjoint Technique", "2024-08-05", "2024-08-09", 5)
+    sans_modele = _creer_conge(manager, "P2", "Infirmier", "2024-08-05", "2024-08-06", 2)
+
+    jobs, erreurs = manager.prepare_decision_jobs([avec_modele, sans_modele, 999], str(templates_dir))
+
+    assert [job['conge_id'] for job in jobs] == [avec_modele]
+    job = jobs[0]
+    assert job['template_path'] == str(templates_dir / "adjoint_technique.docx")
+    assert job['filename'].endswith(f"_{avec_modele}.docx")
+    assert job['context']["{{ppr}}"] == "P1"
+    assert job['context']["{{details_solde}}"] == "5 jours au titre de l'année 2024"
+    assert sorted(conge_id for conge_id, _ in erreurs) == [sans_modele, 999]
+
+
+def test_batch_rendering_reports_each_document(tmp_path):
+    from utils.decisions import generate_decisions_batch
+    from tests.utils.test_docx_templates import make_template
+
+    template_path = make_template(tmp_path / "pa.docx")
+    jobs = [{'conge_id': i, 'template_path': template_path, 'filename': f"d{i}.docx",
+             'context': {"{{nom_complet}}": f"Agent {i}"}} for i in range(3)]
+    jobs.append({'conge_id': 9, 'template_path': str(tmp_path / "absent.docx"), 'filename': "d9.docx", 'context': {}})
+    resultat = generate_decisions_batch(jobs, str(tmp_path / "sortie"))
+
+    assert [conge_id for conge_id, _ in resultat['erreurs']] == [9]
+    assert len(resultat['generes']) == 3
+    with zipfile.ZipFile(tmp_path / "sortie" / "d2.docx") as archive:
+        assert "Décision : Agent 2" in archive.read("word/document.xml").decode("utf-8")
+
+
+def test_pdf_jobs_need_no_word_template(manager, tmp_path):
+    from utils.decisions import generate_decisions_batch
+
+    conge_id = _creer_conge(manager, "P3", "Infirmier", "2024-08-05", "2024-08-06", 2)
+    jobs, erreurs = manager.prepare_decision_jobs([conge_id], str(tmp_path / "templates"), fmt="pdf")
+
+    assert erreurs == [] and jobs[0]['template_path'] is None and jobs[0]['filename'].endswith(".pdf")
+    resultat = generate_decisions_batch(jobs, str(tmp_path / "sortie"))
+    [(_, chemin)] = resultat['generes']
+    with open(chemin, 'rb') as f:
+        assert f.read(8) == b"%PDF-1.4"
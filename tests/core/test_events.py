@@ -0,0 +1,65 @@
+import sys
+import os
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+from datetime import datetime
+
+from core.constants import SoldeStatus
+from core.events import EventBus, EventType
+
+
+def _creer_agent(manager, ppr, solde):
+    agent_id = manager.db.ajouter_agent("Nom", "Prenom", ppr, "PA")
+    manager.db.execute_query("INSERT INTO soldes_annuels (agent_id, annee, solde, statut) VALUES (?, ?, ?, ?)",
+                             (agent_id, 2024, solde, SoldeStatus.ACTIF))
+    return agent_id
+
+
+def test_bus_dispatches_by_type_and_isolates_failing_subscribers():
+    bus = EventBus()
+    recus, tous = [], []
+
+    def en_erreur(event):
+        raise RuntimeError("abonné défaillant")
+
+    bus.subscribe(en_erreur, EventType.AGENT_CREATED)
+    bus.subscribe(recus.append, EventType.AGENT_CREATED)
+    bus.subscribe(tous.append)
+
+    bus.emit(EventType.AGENT_CREATED, agent_id=1)
+    bus.emit(EventType.HOLIDAYS_CHANGED)
+    assert recus == [{'type': EventType.AGENT_CREATED, 'agent_id': 1}]
+    assert [e['type'] for e in tous] == [EventType.AGENT_CREATED, EventType.HOLIDAYS_CHANGED]
+
+    bus.unsubscribe(recus.append)
+    bus.emit(EventType.AGENT_CREATED, agent_id=2)
+    assert len(recus) == 1
+
+
+def test_submission_emits_conge_and_soldes_events_and_invalidates_availability(manager):
+    agent_id = _creer_agent(manager, "A", 10)
+    debut, fin = datetime(2024, 8, 5), datetime(2024, 8, 9)
+    manager.get_agents_disponibles(debut, fin)
+    assert manager.availability._cache
+
+    events = []
+    manager.events.subscribe(events.append)
+    form_data = {'agent_id': agent_id, 'type_conge': 'Congé annuel', 'date_debut': '05/08/2024',
+                 'date_fin': '09/08/2024', 'jours_pris': 5, 'justif': '', 'interim_id': None,
+                 'cert_path': '', 'original_cert_path': None, 'annee_exercice': 2024}
+    assert manager.handle_conge_submission(form_data, is_modification=False)
+
+    assert [e['type'] for e in events] == [EventType.CONGE_CREATED, EventType.SOLDES_CHANGED]
+    assert events[0]['agent_id'] == agent_id and events[0]['conge_id']
+    assert events[0]['date_debut'] == debut
+    assert events[1]['agent_ids'] == {agent_id}
+    assert not manager.availability._cache
+
+    conge_id = events[0]['conge_id']
+    events.clear()
+    manager.delete_conge(conge_id)
+    assert [e['type'] for e in events] == [EventType.CONGE_DELETED, EventType.SOLDES_CHANGED]
+    assert events[0]['conge_id'] == conge_id
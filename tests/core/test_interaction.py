@@ -0,0 +1,31 @@
+import sys
+import os
+import subprocess
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, ROOT_DIR)
+# ---------------------------------------------------------------------------
+
+from core.interaction import InteractionHandler, get_interaction_handler, set_interaction_handler
+
+
+def test_core_engine_does_not_import_tkinter():
+    code = ("import sys; import core.conges.manager, core.tasks, db.database, utils.config_loader, utils.date_utils; "
+            "sys.exit(1 if 'tkinter' in sys.modules else 0)")
+    assert subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR).returncode == 0
+
+
+def test_headless_handler_uses_default_answer():
+    assert InteractionHandler().confirm("Titre", "Message") is False
+    assert InteractionHandler(default_confirm=True).confirm("Titre", "Message") is True
+
+
+def test_handler_can_be_replaced():
+    original = get_interaction_handler()
+    custom = InteractionHandler(default_confirm=True)
+    try:
+        set_interaction_handler(custom)
+        assert get_interaction_handler() is custom
+    finally:
+        set_interaction_handler(original)
@@ -0,0 +1,109 @@
+import sys
+import os
+import threading
+import time
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+import pytest
+
+from core.tasks import TaskService, TaskCancelled
+
+
+def _poll_until_idle(service, timeout=5):
+    limite = time.monotonic() + timeout
+    while service.poll():
+        assert time.monotonic() < limite, "les tâches ne se terminent pas"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def service():
+    service = TaskService(max_workers=4, limits={'test': 1})
+    yield service
+    service.shutdown(cancel=True)
+
+
+def test_results_progress_and_errors_are_delivered_by_poll(service):
+    resultats, avancements = [], []
+
+    def avec_progression(report_progress):
+        for i in range(1, 4):
+            report_progress(i, 3)
+        return "ok"
+
+    service.submit(avec_progression, "progression", with_progress=True,
+                   on_complete=resultats.append, on_progress=lambda fait, total: avancements.append((fait, total)))
+    handle = service.submit(lambda: 1 / 0, "erreur", on_complete=resultats.append)
+    _poll_until_idle(service)
+
+    assert "ok" in resultats
+    assert any(isinstance(r, ZeroDivisionError) for r in resultats)
+    assert handle.future.done() and not service.active
+    # Les avancements sont regroupés : seul le dernier connu est transmis à chaque poll().
+    assert all(av in [(1, 3), (2, 3), (3, 3)] for av in avancements)
+
+
+def test_group_limit_serializes_tasks_and_waiting_task_can_be_cancelled(service):
+    libere = threading.Event()
+    en_cours = []
+    resultats = []
+
+    def bloquante():
+        en_cours.append(1)
+        libere.wait(5)
+        return "premiere"
+
+    service.submit(bloquante, "1", group='test', on_complete=resultats.append)
+    seconde = service.submit(lambda: "seconde", "2", group='test', on_complete=resultats.append)
+    time.sleep(0.05)
+    assert en_cours == [1] and not seconde.future.done()
+
+    seconde.cancel()
+    libere.set()
+    _poll_until_idle(service)
+    assert resultats[0] == "premiere"
+    assert isinstance(resultats[1], TaskCancelled)
+
+
+def test_cancellation_is_raised_by_report_progress(service):
+    demarree = threading.Event()
+    resultats = []
+
+    def longue(report_progress):
+        demarree.set()
+        for i in range(500):
+            report_progress(i, 500)
+            time.sleep(0.01)
+        return "terminée"
+
+    handle = service.submit(longue, "longue", with_progress=True, on_complete=resultats.append)
+    assert demarree.wait(5)
+    handle.cancel()
+    _poll_until_idle(service)
+    assert isinstance(resultats[0], TaskCancelled)
+
+
+def test_started_write_task_cannot_be_cancelled(service):
+    demarree = threading.Event()
+    resultats = []
+
+    def ecriture(report_progress):
+        demarree.set()
+        for i in range(20):
+            report_progress(i, 20)
+            time.sleep(0.01)
+        return "écrite"
+
+    handle = service.submit(ecriture, "restauration", group='ecriture', with_progress=True, on_complete=resultats.append)
+    en_attente = service.submit(lambda report_progress: "seconde", "import", group='ecriture',
+                                with_progress=True, on_complete=resultats.append)
+    assert demarree.wait(5)
+    assert not handle.cancel()
+    # Une tâche non annulable qui attend encore son tour peut, elle, être annulée.
+    assert en_attente.cancel()
+    _poll_until_idle(service)
+    assert resultats[0] == "écrite"
+    assert isinstance(resultats[1], TaskCancelled)
@@ -0,0 +1,65 @@
+import sys
+import os
+import sqlite3
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+import pytest
+
+from db.backup import check_integrity, copy_database, restore_backup
+
+
+def _creer_base(path, lignes=2000):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, valeur TEXT)")
+    conn.executemany("INSERT INTO t (valeur) VALUES (?)", [(f"ligne {i}" * 10,) for i in range(lignes)])
+    conn.commit()
+    conn.close()
+
+
+def _compter(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_copy_database_is_incremental_and_atomic(tmp_path):
+    db_path = str(tmp_path / "conges.db")
+    _creer_base(db_path)
+    progress = []
+
+    copy_path = copy_database(db_path, str(tmp_path / "copie.db"), progress_callback=lambda d, t: progress.append((d, t)), pages=8)
+
+    assert check_integrity(copy_path)[0]
+    assert _compter(copy_path) == 2000
+    assert len(progress) > 1 and progress[-1][0] == progress[-1][1]
+    assert not [f for f in os.listdir(tmp_path) if f.endswith(".part")]
+
+
+def test_restore_backup_overwrites_live_database(tmp_path):
+    db_path = str(tmp_path / "conges.db")
+    _creer_base(db_path, lignes=10)
+    backup_path = copy_database(db_path, str(tmp_path / "copie.db"))
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM t")
+    conn.commit()
+    conn.close()
+
+    assert restore_backup(backup_path, db_path)
+    assert _compter(db_path) == 10
+
+
+def test_restore_refuses_corrupted_backup(tmp_path):
+    db_path = str(tmp_path / "conges.db")
+    _creer_base(db_path, lignes=10)
+    corrupted = tmp_path / "corrompu.db"
+    corrupted.write_bytes(b"SQLite format 3\x00" + b"\xff" * 4096)
+
+    with pytest.raises(sqlite3.DatabaseError):
+        restore_backup(str(corrupted), db_path)
+    assert _compter(db_path) == 10
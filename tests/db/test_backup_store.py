@@ -0,0 +1,110 @@
+import sys
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+import pytest
+
+from db.backup_store import BackupStore
+
+
+def _creer_base(path, lignes=3000):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, valeur TEXT)")
+    conn.executemany("INSERT INTO t (valeur) VALUES (?)", [(f"ligne {i}" * 10,) for i in range(lignes)])
+    conn.commit()
+    conn.close()
+
+
+def _count_objects(store):
+    return sum(len(files) for _, _, files in os.walk(store.objects_dir))
+
+
+@pytest.fixture
+def setup(tmp_path):
+    db_path = str(tmp_path / "conges.db")
+    _creer_base(db_path)
+    return db_path, BackupStore(str(tmp_path / "store"))
+
+
+def test_second_snapshot_only_stores_changed_chunks(setup):
+    db_path, store = setup
+    first = store.create_snapshot(db_path, "A")
+    objects_after_first = _count_objects(store)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE t SET valeur = 'modifiée' WHERE id = 2900")
+    conn.commit()
+    conn.close()
+    second = store.create_snapshot(db_path, "B")
+
+    assert second['stored_bytes'] < first['stored_bytes']
+    assert _count_objects(store) - objects_after_first <= 3
+    assert [s['label'] for s in store.list_snapshots()] == ["B", "A"]
+
+
+def test_restore_snapshot_point_in_time(setup, tmp_path):
+    db_path, store = setup
+    snapshot = store.create_snapshot(db_path, "A")
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM t")
+    conn.commit()
+    conn.close()
+
+    store.restore_snapshot(snapshot['id'], db_path)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 3000
+    conn.close()
+
+
+def test_corrupted_chunk_is_detected(setup, tmp_path):
+    db_path, store = setup
+    snapshot = store.create_snapshot(db_path, "A")
+    shard = next(os.scandir(store.objects_dir))
+    victim = next(os.scandir(shard.path)).path
+    with open(victim, 'wb') as f:
+        f.write(b"x")
+
+    with pytest.raises(Exception):
+        store.export_snapshot(snapshot['id'], str(tmp_path / "out.db"))
+
+
+def test_retention_keeps_one_per_period_and_permanent(setup):
+    db_path, store = setup
+    for i in range(4):
+        store.create_snapshot(db_path, f"S{i}", permanent=(i == 0))
+    # On vieillit artificiellement les instantanés : un tous les dix jours.
+    manifest = store.list_snapshots()
+    now = datetime.now()
+    for age, entry in enumerate(manifest):
+        entry['created'] = (now - timedelta(days=age * 10)).isoformat(timespec='seconds')
+    store._write_manifest(manifest)
+
+    removed = store.apply_retention(quotidien=1, hebdomadaire=1, annuel=1)
+
+    kept = {s['label'] for s in store.list_snapshots()}
+    assert kept == {"S3", "S0"}
+    assert len(removed) == 2
+    assert len(os.listdir(store.snapshots_dir)) == 2
+
+
+def test_store_lock_excludes_concurrent_writers_and_gc_spares_recent_chunks(setup, tmp_path):
+    db_path, store = setup
+    snapshot = store.create_snapshot(db_path, "A")
+    # Un autre magasin sur le même dossier (autre processus) pendant une opération en cours.
+    autre = BackupStore(store.root_dir)
+    with store._locked():
+        with pytest.raises(TimeoutError):
+            autre.delete_snapshot(snapshot['id'], timeout=0.2)
+    assert [s['id'] for s in autre.list_snapshots()] == [snapshot['id']]
+
+    # Blocs non encore référencés (instantané en cours d'écriture) : épargnés pendant le délai de grâce.
+    autre.delete_snapshot(snapshot['id'])
+    assert autre.list_snapshots() == [] and _count_objects(store) > 0
+    assert store.collect_garbage(grace_seconds=0) > 0
+    assert _count_objects(store) == 0
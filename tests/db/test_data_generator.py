@@ -0,0 +1,90 @@
+import sys
+import os
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+import pytest
+
+from db.database import DatabaseManager
+from db.data_generator import generate_synthetic_data
+from utils import config_loader
+from utils.date_utils import jours_ouvres, get_holidays_set_for_period
+
+TYPES_CONGE = ["Congé annuel", "Congé exceptionnel", "Congé de maladie", "Congé de maternité", "Congé de paternité"]
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    config = {'ui': {'grades': ["PA", "Technicien", "Administrateur"], 'types_conge': TYPES_CONGE},
+              'conges': {'types_decompte_solde': ["Congé annuel"], 'holidays_country': 'MA'}}
+    monkeypatch.setattr(config_loader, '_SETTINGS', config_loader.build_settings(config))
+
+
+def _base(annee=2024):
+    db = DatabaseManager(":memory:")
+    assert db.connect()
+    db.run_migrations()
+    db.set_annee_exercice(annee)
+    return db
+
+
+def _contenu(db):
+    return (db.execute_query("SELECT * FROM agents ORDER BY id", fetch="all"),
+            db.execute_query("SELECT * FROM conges ORDER BY id", fetch="all"),
+            db.execute_query("SELECT * FROM certificats_medicaux ORDER BY id", fetch="all"))
+
+
+def test_generation_is_reproducible_and_covers_every_type():
+    db1, db2 = _base(), _base()
+    stats = generate_synthetic_data(db1, agents=200, conges_par_agent=8, seed=7)
+    generate_synthetic_data(db2, agents=200, conges_par_agent=8, seed=7)
+
+    assert _contenu(db1) == _contenu(db2)
+    assert stats['agents'] == 200 and stats['soldes_annuels'] == 600
+    assert stats['conges'] == db1.execute_query("SELECT COUNT(*) FROM conges", fetch="one")[0] > 1000
+    types = {row[0] for row in db1.execute_query("SELECT DISTINCT type_conge FROM conges", fetch="all")}
+    assert types == set(TYPES_CONGE)
+    grades = {row[0] for row in db1.execute_query("SELECT DISTINCT grade FROM agents", fetch="all")}
+    assert grades == {"PA", "Technicien", "Administrateur"}
+    # Les certificats ne concernent que des congés de maladie, dont le statut est tenu à jour par les triggers.
+    assert db1.execute_query("SELECT COUNT(*) FROM certificats_medicaux cm JOIN conges c ON c.id = cm.conge_id "
+                             "WHERE c.type_conge != 'Congé de maladie' OR c.certificat_status != 'justifie'", fetch="one")[0] == 0
+    db1.close()
+    db2.close()
+
+
+def test_generated_leaves_do_not_overlap_and_days_match_calendar():
+    db = _base()
+    generate_synthetic_data(db, agents=100, conges_par_agent=10, seed=1)
+
+    chevauchements = db.execute_query(
+        "SELECT COUNT(*) FROM conges a JOIN conges b ON a.agent_id = b.agent_id AND a.id < b.id "
+        "AND a.date_debut <= b.date_fin AND b.date_debut <= a.date_fin", fetch="one")[0]
+    assert chevauchements == 0
+    # Plusieurs agents absents en même temps (pics de l'été).
+    assert db.execute_query("SELECT COUNT(*) FROM conges WHERE date_debut <= '2023-08-01 00:00:00' "
+                            "AND date_fin >= '2023-08-01 00:00:00'", fetch="one")[0] > 5
+
+    holidays_set = get_holidays_set_for_period(db, 2022, 2025)
+    for conge in db.get_conges()[:300]:
+        assert conge.jours_pris == jours_ouvres(conge.date_debut, conge.date_fin, holidays_set)
+    db.close()
+
+
+def test_generation_refuses_a_database_with_agents():
+    db = _base()
+    db.ajouter_agent("Alaoui", "Sara", "PPR1", "PA")
+    with pytest.raises(ValueError):
+        generate_synthetic_data(db, agents=10, seed=1)
+    assert db.execute_query("SELECT COUNT(*) FROM conges", fetch="one")[0] == 0
+    db.close()
+
+
+def test_generation_sets_the_requested_fiscal_year():
+    db = _base(2024)
+    generate_synthetic_data(db, agents=5, conges_par_agent=2, annees=2, seed=1, annee_exercice=2030)
+    assert db.get_annee_exercice() == 2030
+    assert {row[0] for row in db.execute_query("SELECT DISTINCT annee FROM soldes_annuels", fetch="all")} <= {2029, 2030}
+    db.close()
@@ -0,0 +1,100 @@
+import sys
+import os
+from datetime import date
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+import pytest
+
+from db.database import DatabaseManager
+from db.models import Conge
+
+
+@pytest.fixture
+def db_manager():
+    manager = DatabaseManager(":memory:")
+    assert manager.connect()
+    manager.run_migrations()
+    yield manager
+    manager.close()
+
+
+def _ajouter_agent_et_conge(db_manager, debut, fin, statut='Actif', ppr="PPR1"):
+    agent_id = db_manager.execute_query("SELECT id FROM agents WHERE ppr=?", (ppr,), fetch="one")
+    agent_id = agent_id[0] if agent_id else db_manager.ajouter_agent("Alaoui", "Sara", ppr, "PA")
+    conge_id = db_manager.ajouter_conge(Conge(None, agent_id, "Congé annuel", None, None, debut, fin, 1))
+    db_manager.execute_query("UPDATE conges SET statut=? WHERE id=?", (statut, conge_id))
+    return agent_id, conge_id
+
+
+def test_migrations_create_interval_index(db_manager):
+    tables = {r[0] for r in db_manager.execute_query("SELECT name FROM sqlite_master", fetch="all")}
+    assert "conges_intervalles" in tables
+    assert db_manager.execute_query("SELECT MAX(version) FROM db_version", fetch="one")[0] >= 3
+
+
+def test_interval_index_follows_conges(db_manager):
+    agent_id, conge_id = _ajouter_agent_et_conge(db_manager, "2024-08-05", "2024-08-09")
+    assert db_manager.execute_query("SELECT COUNT(*) FROM conges_intervalles WHERE id=?", (conge_id,), fetch="one")[0] == 1
+
+    db_manager.execute_query("UPDATE conges SET date_fin='2024-08-20' WHERE id=?", (conge_id,))
+    assert db_manager.get_overlapping_leaves(agent_id, date(2024, 8, 19), date(2024, 8, 25))
+
+    db_manager.supprimer_conge(conge_id)
+    assert db_manager.execute_query("SELECT COUNT(*) FROM conges_intervalles", fetch="one")[0] == 0
+
+
+def test_get_overlapping_leaves_bounds(db_manager):
+    agent_id, conge_id = _ajouter_agent_et_conge(db_manager, "2024-08-05", "2024-08-09")
+    _ajouter_agent_et_conge(db_manager, "2024-08-05", "2024-08-09", ppr="PPR2")
+
+    assert [c.id for c in db_manager.get_overlapping_leaves(agent_id, date(2024, 8, 9), date(2024, 8, 12))] == [conge_id]
+    assert [c.id for c in db_manager.get_overlapping_leaves(agent_id, date(2024, 8, 1), date(2024, 8, 5))] == [conge_id]
+    assert db_manager.get_overlapping_leaves(agent_id, date(2024, 8, 10), date(2024, 8, 12)) == []
+    assert db_manager.get_overlapping_leaves(agent_id, date(2024, 8, 1), date(2024, 8, 4)) == []
+    assert db_manager.get_overlapping_leaves(agent_id, date(2024, 8, 1), date(2024, 8, 31), conge_id_exclu=conge_id) == []
+
+
+def test_get_overlapping_leaves_ignores_cancelled(db_manager):
+    agent_id, _ = _ajouter_agent_et_conge(db_manager, "2024-08-05", "2024-08-09", statut='Annulé')
+    assert db_manager.get_overlapping_leaves(agent_id, date(2024, 8, 1), date(2024, 8, 31)) == []
+
+
+def test_get_agents_disponibles_excludes_agents_on_leave(db_manager):
+    occupe_id, _ = _ajouter_agent_et_conge(db_manager, "2024-08-05", "2024-08-09")
+    libre_id = db_manager.ajouter_agent("Bennani", "Omar", "PPR2", "PA")
+
+    disponibles = [a.id for a in db_manager.get_agents_disponibles(date(2024, 8, 9), date(2024, 8, 12))]
+    assert disponibles == [libre_id]
+
+    disponibles = {a.id for a in db_manager.get_agents_disponibles(date(2024, 8, 10), date(2024, 8, 12))}
+    assert disponibles == {libre_id, occupe_id}
+
+
+def test_certificat_status_is_maintained_by_triggers(db_manager):
+    agent_id = db_manager.ajouter_agent("Alaoui", "Sara", "PPR9", "PA")
+    maladie_id = db_manager.ajouter_conge(Conge(None, agent_id, "Congé de maladie", None, None, "2024-03-04", "2024-03-05", 2))
+    db_manager.ajouter_conge(Conge(None, agent_id, "Congé annuel", None, None, "2024-04-01", "2024-04-02", 2))
+    statut = lambda: db_manager.execute_query("SELECT certificat_status FROM conges WHERE id=?", (maladie_id,), fetch="one")[0]
+
+    assert statut() == 'manquant'
+    assert db_manager.count_sick_leaves_by_status() == {'manquant': 1, 'justifie': 0}
+
+    db_manager.add_certificat(maladie_id, "/tmp/a.pdf")
+    db_manager.add_certificat(maladie_id, "/tmp/b.pdf")  # remplacement (REPLACE)
+    assert statut() == 'justifie'
+    assert [row[6] for row in db_manager.get_sick_leaves_by_status('justifie')] == [maladie_id]
+    assert db_manager.get_sick_leaves_by_status('manquant') == []
+
+    db_manager.execute_query("DELETE FROM certificats_medicaux WHERE conge_id=?", (maladie_id,))
+    assert statut() == 'manquant'
+    assert len(db_manager.get_sick_leaves_by_status('tous')) == 1
+
+
+def test_sick_leave_follow_up_uses_partial_index(db_manager):
+    plan = db_manager.execute_query(
+        "EXPLAIN QUERY PLAN SELECT c.id FROM conges c WHERE c.type_conge = 'Congé de maladie' AND c.statut = 'Actif' AND c.certificat_status = ?",
+        ('manquant',), fetch="all")
+    assert any("idx_conges_maladie_certificat" in row[-1] for row in plan)
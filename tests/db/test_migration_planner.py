@@ -0,0 +1,88 @@
+import sys
+import os
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+import shutil
+import sqlite3
+
+import pytest
+
+from db import migration_planner
+from db.database import DatabaseManager
+
+
+def _connect(path):
+    manager = DatabaseManager(str(path))
+    assert manager.connect()
+    return manager
+
+
+def test_new_script_invalidates_fingerprint(tmp_path):
+    migrations_dir = tmp_path / "migrations"
+    migrations_dir.mkdir()
+    for script_path in migration_planner.list_migrations().values():
+        shutil.copy(script_path, migrations_dir)
+    manager = _connect(tmp_path / "conges.db")
+    manager.run_migrations()
+    assert migration_planner.is_up_to_date(manager.conn, str(migrations_dir))
+
+    latest = migration_planner.latest_script_version()
+    (migrations_dir / f"{latest + 1:03d}_nouvelle_colonne.sql").write_text("ALTER TABLE agents ADD COLUMN note TEXT;\n", encoding="utf-8")
+    assert not migration_planner.is_up_to_date(manager.conn, str(migrations_dir))
+    assert [version for version, _ in migration_planner.plan_migrations(latest, str(migrations_dir))] == [latest + 1]
+    manager.close()
+
+
+def test_second_launch_skips_migration_planning(tmp_path, monkeypatch):
+    manager = _connect(tmp_path / "conges.db")
+    manager.run_migrations()
+    manager.close()
+
+    def _interdit(*args, **kwargs):
+        raise AssertionError("les migrations ne doivent pas être replanifiées")
+
+    manager = _connect(tmp_path / "conges.db")
+    monkeypatch.setattr(migration_planner, "plan_migrations", _interdit)
+    manager.run_migrations()
+    assert migration_planner.is_up_to_date(manager.conn)
+    manager.close()
+
+
+def test_external_schema_change_triggers_full_check(tmp_path):
+    manager = _connect(tmp_path / "conges.db")
+    manager.run_migrations()
+    manager.execute_query("CREATE TABLE ajout_externe (id INTEGER)")
+    assert not migration_planner.is_up_to_date(manager.conn)
+
+    manager.run_migrations()
+    assert migration_planner.is_up_to_date(manager.conn)
+    manager.close()
+
+
+def test_failing_script_is_rolled_back(tmp_path):
+    manager = _connect(tmp_path / "conges.db")
+    manager.run_migrations()
+    script = tmp_path / "007_echec.sql"
+    script.write_text("CREATE TABLE partielle (id INTEGER);\nINSERT INTO table_absente VALUES (1);\n", encoding="utf-8")
+
+    with pytest.raises(sqlite3.Error):
+        migration_planner.apply_migration(manager.conn, 7, str(script))
+
+    tables = {r[0] for r in manager.execute_query("SELECT name FROM sqlite_master", fetch="all")}
+    assert "partielle" not in tables
+    assert manager.execute_query("SELECT MAX(version) FROM db_version", fetch="one")[0] == migration_planner.latest_script_version()
+    manager.close()
+
+
+def test_script_managing_its_own_transaction_is_rejected(tmp_path):
+    manager = _connect(tmp_path / "conges.db")
+    manager.run_migrations()
+    script = tmp_path / "007_transaction.sql"
+    script.write_text("BEGIN TRANSACTION;\nCREATE TABLE t (id INTEGER);\nCOMMIT;\n", encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        migration_planner.apply_migration(manager.conn, 7, str(script))
+    manager.close()
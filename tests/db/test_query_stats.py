@@ -0,0 +1,64 @@
+import sys
+import os
+import json
+import logging
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+from db.database import DatabaseManager
+from db.query_stats import QueryStats, normalize_sql, BUCKETS_MS
+
+
+def _db(stats):
+    db = DatabaseManager(":memory:", stats=stats)
+    assert db.connect()
+    db.run_migrations()
+    stats.reset()
+    return db
+
+
+def test_normalize_sql_groups_literals_and_in_lists():
+    assert normalize_sql("SELECT *  FROM conges\n WHERE id IN (?, ?,?) AND statut = 'Actif' LIMIT 50") == \
+        "SELECT * FROM conges WHERE id IN (?, ...) AND statut = ? LIMIT ?"
+    assert normalize_sql("SELECT solde_2024 FROM t1 WHERE x = -3.5") == "SELECT solde_2024 FROM t1 WHERE x = ?"
+
+
+def test_execute_query_records_timings_rows_and_call_sites():
+    stats = QueryStats()
+    db = _db(stats)
+    for i in range(3):
+        db.ajouter_agent(f"Nom{i}", "Prénom", f"PPR{i}", "PA")
+    db.execute_query("SELECT id FROM agents", fetch="all")
+    db.execute_query("SELECT id FROM agents WHERE ppr = 'PPR1'", fetch="one")
+    db.execute_query("SELECT id FROM agents WHERE ppr = 'PPR9'", fetch="one")
+
+    entries = {entry['sql']: entry for entry in stats.top(n=None)}
+    par_ppr = entries["SELECT id FROM agents WHERE ppr = ?"]
+    assert par_ppr['count'] == 2 and par_ppr['rows'] == 1
+    assert entries["SELECT id FROM agents"]['rows'] == 3
+    insertion = next(entry for sql, entry in entries.items() if sql.startswith("INSERT INTO agents"))
+    assert insertion['count'] == 3 and sum(insertion['histogram']) == 3
+    assert len(insertion['histogram']) == len(BUCKETS_MS) + 1
+    # L'appelant d'une méthode de la couche d'accès est complété par son propre appelant.
+    site = insertion['call_sites'][0][0]
+    assert "ajouter_agent" in site and "test_query_stats.py" in site
+    assert stats.top(1, key='count')[0]['count'] >= 3
+    db.close()
+
+
+def test_slow_queries_are_logged_with_their_plan_and_exported(tmp_path, caplog):
+    stats = QueryStats(slow_query_ms=0)
+    db = _db(stats)
+    with caplog.at_level(logging.WARNING):
+        db.execute_query("SELECT * FROM agents WHERE ppr = ?", ("PPR1",), fetch="all")
+    assert "Requête lente" in caplog.text and "SEARCH agents" in caplog.text
+    entry = stats.top(1)[0]
+    assert entry['slow'] == 1 and "SEARCH agents" in entry['plan']
+
+    report = json.loads(open(stats.export_report(str(tmp_path / "requetes.json")), encoding="utf-8").read())
+    assert report['slow_query_ms'] == 0 and report['queries'][0]['sql'] == entry['sql']
+    stats.reset()
+    assert stats.top() == []
+    db.close()
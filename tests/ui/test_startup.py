@@ -0,0 +1,40 @@
+import sys
+import os
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, ROOT_DIR)
+# ---------------------------------------------------------------------------
+
+import subprocess
+
+# Budget d'import de la fenêtre principale (tout ce qui est chargé avant le premier affichage).
+# Large par rapport à la mesure habituelle (~0,1 s) pour rester stable sur une machine chargée.
+STARTUP_IMPORT_BUDGET_US = 1_500_000
+
+# Modules lourds qui ne doivent être chargés qu'à leur première utilisation.
+LAZY_MODULES = {
+    "openpyxl", "docx", "tkcalendar", "holidays",            # exports, calendrier, jours fériés
+    "utils.file_utils", "utils.decisions", "concurrent.futures.process",
+    "ui.widgets.secondary_windows",
+}
+
+
+def _import_times(module):
+    """Importe 'module' dans un interpréteur neuf avec -X importtime : {module: temps cumulé en µs}."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_main_window_import_stays_light():
+    times = _import_times("ui.main_window")
+
+    assert not LAZY_MODULES & set(times), f"Modules chargés au démarrage : {sorted(LAZY_MODULES & set(times))}"
+    assert times["ui.main_window"] < STARTUP_IMPORT_BUDGET_US
@@ -0,0 +1,86 @@
+import sys
+import os
+import time
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+import tkinter
+
+import pytest
+
+from ui import tk_profiler
+
+
+class _Widget:
+    """Remplace le widget d'un CallWrapper : seul le signalement des exceptions est utilisé."""
+    def __init__(self):
+        self.exceptions = 0
+
+    def _report_exception(self):
+        self.exceptions += 1
+
+
+@pytest.fixture
+def profiler():
+    profiler = tk_profiler.install(budget_ms=20, max_snapshots=2)
+    yield profiler
+    tk_profiler.uninstall()
+    assert tkinter.CallWrapper is tk_profiler._ORIGINAL_CALL_WRAPPER
+
+
+def _lent():
+    time.sleep(0.03)
+
+
+def _rapide():
+    pass
+
+
+def _after(func):
+    # Même forme que l'enveloppe créée par Misc.after().
+    def callit():
+        func()
+    return callit
+
+
+def test_callbacks_are_timed_flagged_and_profiled(profiler, tmp_path):
+    widget = _Widget()
+    lent = tkinter.CallWrapper(_after(_lent), None, widget)
+    rapide = tkinter.CallWrapper(_rapide, None, widget)
+    for _ in range(3):
+        lent()
+        rapide()
+
+    stats = profiler.stats
+    nom_lent = next(name for name in stats if "_lent" in name)
+    assert nom_lent.startswith("after: _lent (test_tk_profiler.py:")
+    assert stats[nom_lent]['count'] == 3 and stats[nom_lent]['over_budget'] == 3
+    assert stats[nom_lent]['max_ms'] >= 30
+    assert next(entry for name, entry in stats.items() if "_rapide" in name)['over_budget'] == 0
+    # Le premier dépassement déclenche le profilage des exécutions suivantes.
+    snapshots = profiler.snapshots()
+    assert len(snapshots) == 2 and all(name == nom_lent and "sleep" in text for _, name, text in snapshots)
+
+    report = open(profiler.write_report(str(tmp_path / "ui_profile.txt")), encoding="utf-8").read()
+    assert nom_lent in report and "Budget par traitement : 20 ms" in report
+
+
+def test_nested_callbacks_are_not_counted_twice_and_errors_are_reported(profiler):
+    widget = _Widget()
+    interne = tkinter.CallWrapper(_lent, None, widget)
+
+    def externe():
+        interne()
+
+    def en_erreur():
+        raise RuntimeError("échec")
+
+    tkinter.CallWrapper(externe, None, widget)()
+    tkinter.CallWrapper(en_erreur, None, widget)()
+
+    stats = {name.split(" ")[0]: entry for name, entry in profiler.stats.items()}
+    assert stats['_lent']['max_ms'] >= 30
+    assert stats['test_nested_callbacks_are_not_counted_twice_and_errors_are_reported.<locals>.externe']['max_ms'] < 20
+    assert widget.exceptions == 1
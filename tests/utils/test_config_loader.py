@@ -0,0 +1,83 @@
+import sys
+import os
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+import dataclasses
+
+import pytest
+import yaml
+
+from utils import config_loader
+
+YAML = """
+app: {title: "Test", version: "1.0"}
+db: {filename: "test.db", certificates_dir: "certificats"}
+conges:
+  types_decompte_solde: ["Congé annuel"]
+  holidays_country: "MA"
+  solde_annuel_par_defaut: "%s"
+  maternite_duree: 98
+"""
+
+
+@pytest.fixture(autouse=True)
+def isolated_config(monkeypatch):
+    # load_config remplit la configuration globale : on l'isole des autres tests.
+    monkeypatch.setattr(config_loader, "CONFIG", {})
+    monkeypatch.setattr(config_loader, "_SETTINGS", None)
+
+
+def test_settings_are_typed_and_frozen(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(YAML % "22", encoding="utf-8")
+    config_loader.load_config(str(path))
+
+    settings = config_loader.get_settings()
+    assert settings.conges.types_decompte_solde == frozenset({"Congé annuel"})
+    assert settings.conges.solde_annuel_par_defaut == 22.0
+    assert settings.conges.paternite_duree == 15  # valeur par défaut
+    assert config_loader.CONFIG['db']['filename'] == "test.db"
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        settings.conges.holidays_country = "FR"
+
+
+def test_unchanged_file_is_loaded_from_cache(tmp_path, monkeypatch):
+    path = tmp_path / "config.yaml"
+    path.write_text(YAML % "22", encoding="utf-8")
+    config_loader.load_config(str(path))
+
+    def _interdit(*args, **kwargs):
+        raise AssertionError("le YAML ne doit pas être relu")
+
+    safe_load = yaml.safe_load
+    monkeypatch.setattr(yaml, "safe_load", _interdit)
+    monkeypatch.setattr(config_loader, "CONFIG", {})
+    config_loader.load_config(str(path))
+    assert config_loader.CONFIG['app']['title'] == "Test"
+
+    monkeypatch.setattr(yaml, "safe_load", safe_load)
+    path.write_text(YAML % "30", encoding="utf-8")
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000_000))
+    config_loader.load_config(str(path))
+    assert config_loader.get_settings().conges.solde_annuel_par_defaut == 30.0
+
+
+def test_invalid_values_are_rejected_at_load(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(YAML % "beaucoup", encoding="utf-8")
+    with pytest.raises(ValueError, match="solde_annuel_par_defaut"):
+        config_loader.load_config(str(path))
+
+
+def test_quoted_booleans_are_rejected():
+    config = {'app': {}, 'db': {}, 'conges': {}, 'diagnostics': {'query_stats': "false"}}
+    with pytest.raises(ValueError, match="diagnostics.query_stats"):
+        config_loader.build_settings(config)
+    config['diagnostics']['query_stats'] = False
+    assert config_loader.build_settings(config).diagnostics.query_stats is False
+    config['diagnostics']['ui_profiler'] = "true"
+    with pytest.raises(ValueError, match="diagnostics.ui_profiler"):
+        config_loader.build_settings(config)
@@ -0,0 +1,27 @@
+import sys
+import os
+from datetime import date
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+from utils.date_utils import HolidaysCache
+
+
+def test_holidays_cache_loads_a_widened_span_once():
+    appels = []
+
+    def loader(start_year, end_year):
+        appels.append((start_year, end_year))
+        return {date(year, 1, 1) for year in range(start_year, end_year + 2)}
+
+    cache = HolidaysCache(loader)
+    # Les trois recalculs du formulaire de congé pour une saisie en 2024.
+    holidays = cache.get(2024, 2026)
+    assert cache.get(2024, 2024) is holidays and cache.get(2024, 2025) is holidays
+    assert appels == [(2023, 2027)]
+
+    # Une année hors de la période élargit la période chargée.
+    assert date(2020, 1, 1) in cache.get(2020, 2021)
+    assert appels[-1] == (2020, 2027) and len(appels) == 2
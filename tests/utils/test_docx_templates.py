@@ -0,0 +1,86 @@
+import sys
+import os
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+import zipfile
+
+from utils.docx_templates import compile_template, get_compiled_template, render_template, substitute_placeholders
+
+W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+DOCUMENT_XML = (
+    f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document {W_NS}><w:body>'
+    # Balise coupée entre plusieurs runs, comme Word le fait souvent.
+    '<w:p><w:pPr><w:jc w:val="center"/></w:pPr><w:r><w:t>Décision : {{nom_</w:t></w:r><w:r><w:rPr><w:b/></w:rPr><w:t>complet}}</w:t></w:r></w:p>'
+    '<w:tbl><w:tr><w:tc><w:p><w:r><w:t xml:space="preserve">Du {{date_debut}} au {{inconnu}}</w:t></w:r></w:p>'
+    # Tableau imbriqué dans une cellule.
+    '<w:tbl><w:tr><w:tc><w:p><w:r><w:t>PPR : {{ ppr }}</w:t></w:r></w:p></w:tc></w:tr></w:tbl>'
+    '</w:tc></w:tr></w:tbl>'
+    '<w:p><w:r><w:t>Texte fixe</w:t></w:r><w:r><w:tab/><w:t>sans balise</w:t></w:r></w:p>'
+    '</w:body></w:document>'
+)
+
+
+def make_template(path, document_xml=DOCUMENT_XML):
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", "<Types/>")
+        archive.writestr("word/document.xml", document_xml)
+        archive.writestr("word/header1.xml", f'<w:hdr {W_NS}><w:p><w:r><w:t>Réf. {{{{ppr}}}}</w:t></w:r></w:p></w:hdr>')
+        archive.writestr("word/footer1.xml", f'<w:ftr {W_NS}><w:p><w:r><w:t>Le {{{{date_aujourdhui}}}}</w:t></w:r></w:p></w:ftr>')
+        archive.writestr("word/media/image1.png", b"\x89PNG" + b"\x00" * 2048)
+    return str(path)
+
+
+def test_compile_records_placeholders_split_across_runs(tmp_path):
+    compiled = compile_template(make_template(tmp_path / "pa.docx"))
+    assert compiled.placeholders == {"nom_complet", "date_debut", "inconnu", "ppr", "date_aujourdhui"}
+
+
+def test_render_fills_slots_escapes_values_and_keeps_other_parts(tmp_path):
+    template = make_template(tmp_path / "pa.docx")
+    output = tmp_path / "sortie.docx"
+    render_template(template, str(output), {"{{nom_complet}}": "Alaoui & Fils <Sara>", "{{date_debut}}": "01/07/2024",
+                                            "{{ppr}}": "123456", "{{date_aujourdhui}}": "02/07/2024"})
+
+    with zipfile.ZipFile(output) as archive:
+        document = archive.read("word/document.xml").decode("utf-8")
+        header = archive.read("word/header1.xml").decode("utf-8")
+        footer = archive.read("word/footer1.xml").decode("utf-8")
+        assert archive.read("word/media/image1.png").startswith(b"\x89PNG")
+        assert len(archive.namelist()) == 5
+    assert '<w:t xml:space="preserve">Décision : Alaoui &amp; Fils &lt;Sara&gt;</w:t>' in document
+    assert "Du 01/07/2024 au {{inconnu}}" in document
+    assert "PPR : 123456" in document  # tableau imbriqué
+    assert "Réf. 123456" in header and "Le 02/07/2024" in footer
+    assert "<w:t>Texte fixe</w:t>" in document  # paragraphe sans balise inchangé
+
+
+def test_compiled_template_is_cached_until_file_changes(tmp_path):
+    template = make_template(tmp_path / "pa.docx")
+    first = get_compiled_template(template)
+    assert get_compiled_template(template) is first
+
+    make_template(tmp_path / "pa.docx", DOCUMENT_XML.replace("{{date_debut}}", "{{date_fin}}"))
+    os.utime(template, ns=(0, 0))
+    assert "date_fin" in get_compiled_template(template).placeholders
+
+
+def test_substitute_placeholders_single_pass():
+    context = {"{{nom}}": "{{prenom}}", "prenom": "Sara"}
+    # Une seule passe : une valeur qui ressemble à une balise n'est pas remplacée à son tour.
+    assert substitute_placeholders("{{nom}} / {{ prenom }} / {{autre}}", context) == "{{prenom}} / Sara / {{autre}}"
+
+
+def test_split_tag_is_merged_without_moving_tabs_and_breaks(tmp_path):
+    paragraph = ('<w:p><w:r><w:t>Nom :</w:t></w:r><w:r><w:tab/><w:t>{{nom_</w:t></w:r>'
+                 '<w:r><w:t>complet}}</w:t><w:br/><w:t>Grade : {{grade}}</w:t></w:r></w:p>')
+    template = make_template(tmp_path / "pa.docx", f'<w:document {W_NS}><w:body>{paragraph}</w:body></w:document>')
+    output = tmp_path / "sortie.docx"
+    render_template(template, str(output), {"nom_complet": "A B", "grade": "G"})
+
+    with zipfile.ZipFile(output) as archive:
+        document = archive.read("word/document.xml").decode("utf-8")
+    assert ('<w:r><w:t>Nom :</w:t></w:r><w:r><w:tab/><w:t xml:space="preserve">A B</w:t></w:r>'
+            '<w:r><w:t></w:t><w:br/><w:t>Grade : G</w:t></w:r>') in document
@@ -0,0 +1,59 @@
+import sys
+import os
+
+# --- Configuration pour permettre l'importation depuis le dossier racine ---
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+# ---------------------------------------------------------------------------
+
+import re
+import zlib
+
+import pytest
+
+from utils.pdf_utils import (UnsupportedTextError, build_pdf, layout_pages, parse_layout, render_decision_pdf,
+                             wrap_text, text_width)
+
+CONTEXT = {"{{nom_complet}}": "ALAOUI Sara", "{{grade}}": "PA", "{{ppr}}": "P1", "{{type_conge}}": "Congé annuel",
+           "{{jours_pris}}": "5", "{{date_debut}}": "05/08/2024", "{{date_fin}}": "09/08/2024",
+           "{{date_reprise}}": "12/08/2024", "{{details_solde}}": "", "{{date_aujourdhui}}": "01/08/2024"}
+
+
+def _page_texts(pdf):
+    """Texte (cp1252) de chaque flux de contenu du PDF."""
+    streams = re.findall(rb"stream\n(.*?)\nendstream", pdf, re.S)
+    return [zlib.decompress(s).decode("cp1252") for s in streams]
+
+
+def test_rendered_pdf_is_well_formed_and_contains_the_fields(tmp_path):
+    output = tmp_path / "decision.pdf"
+    render_decision_pdf(str(output), CONTEXT)
+    pdf = output.read_bytes()
+
+    assert pdf.startswith(b"%PDF-1.4") and pdf.rstrip().endswith(b"%%EOF")
+    # Chaque entrée de la table xref pointe sur le début de l'objet correspondant.
+    xref = int(re.search(rb"startxref\n(\d+)", pdf).group(1))
+    offsets = [int(o) for o in re.findall(rb"(\d{10}) 00000 n", pdf[xref:])]
+    for number, offset in enumerate(offsets, start=1):
+        assert pdf[offset:].startswith(b"%d 0 obj" % number)
+
+    [texte] = _page_texts(pdf)
+    assert "ALAOUI Sara" in texte and "Congé annuel" in texte and "12/08/2024" in texte
+    assert "Article 3" not in texte  # paragraphe facultatif : details_solde est vide
+
+
+def test_long_text_is_wrapped_and_paginated():
+    lignes = wrap_text("mot " * 200, 300)
+    assert len(lignes) > 1 and all(text_width(l) <= 300 for l in lignes)
+
+    layout = parse_layout("\n".join(["Paragraphe {{nom_complet}} (suite)"] * 80))
+    pages = layout_pages(layout, CONTEXT)
+    assert len(pages) == 2
+    textes = _page_texts(build_pdf(pages))
+    assert len(textes) == 2 and "Paragraphe ALAOUI Sara \\(suite\\)" in textes[1]
+
+
+def test_non_latin_names_are_rejected_before_writing(tmp_path):
+    output = tmp_path / "decision.pdf"
+    with pytest.raises(UnsupportedTextError, match="Word"):
+        render_decision_pdf(str(output), dict(CONTEXT, **{"{{nom_complet}}": "العلوي سارة"}))
+    assert not output.exists()
@@ -5,7 +5,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 
-from utils.config_loader import CONFIG
+from utils.config_loader import CONFIG, get_settings
 from ui.widgets.arabic_keyboard import ArabicKeyboard
 
 class AgentForm(tk.Toplevel):
@@ -95,7 +95,7 @@ class AgentForm(tk.Toplevel):
             ttk.Label(solde_frame, text=f"Solde initial ({an_n}):").grid(row=2, column=0, sticky="w", padx=5, pady=3)
             self.solde_entries[an_n] = ttk.Entry(solde_frame)
             self.solde_entries[an_n].grid(row=2, column=1, sticky="ew")
-            self.solde_entries[an_n].insert(0, str(CONFIG['conges'].get('solde_annuel_par_defaut', 22.0)))
+            self.solde_entries[an_n].insert(0, str(get_settings().conges.solde_annuel_par_defaut))
 
         btn_frame = ttk.Frame(frame)
         btn_frame.grid(row=5, columnspan=2, pady=(10, 0))
@@ -130,7 +130,6 @@ class AgentForm(tk.Toplevel):
 
             if success:
                 self.parent.set_status(message)
-                self.parent.refresh_all(self.agent_id)
                 self.destroy()
             else:
                 messagebox.showerror("Erreur", f"Le PPR '{agent_data['ppr']}' est déjà utilisé ou une autre erreur est survenue.", parent=self)
@@ -7,22 +7,13 @@ import sqlite3
 import logging
 from datetime import datetime
 
-from core.conges.strategies import (
-    CongeAnnuelStrategy, CongeMaladieStrategy, CongeMaterniteStrategy,
-    CongePaterniteStrategy, CongeCalendaireStrategy
-)
+from core.conges.strategies import STRATEGIES
 from ui.widgets.date_picker import DatePickerWindow
-from utils.date_utils import validate_date, format_date_for_display, calculate_reprise_date
+from utils.date_utils import validate_date, format_date_for_display, calculate_reprise_date, HolidaysCache
 from utils.config_loader import CONFIG
 
 class CongeForm(tk.Toplevel):
-    STRATEGIES = {
-        "Congé annuel": CongeAnnuelStrategy(),
-        "Congé exceptionnel": CongeCalendaireStrategy(),
-        "Congé de maladie": CongeMaladieStrategy(),
-        "Congé de maternité": CongeMaterniteStrategy(),
-        "Congé de paternité": CongePaterniteStrategy(),
-    }
+    STRATEGIES = STRATEGIES
 
     def __init__(self, parent, manager, agent_id, conge_id=None):
         super().__init__(parent)
@@ -47,9 +38,15 @@ class CongeForm(tk.Toplevel):
         self.grab_set()
         self.resizable(False, False)
 
+        self.interim_agents = {}
+        self._interim_choices = []
+        # Jours fériés partagés par tous les recalculs du formulaire (et toutes les stratégies) :
+        # la fenêtre est modale, ils ne peuvent pas changer tant qu'elle est ouverte.
+        self._holidays = HolidaysCache(self.manager.get_holidays_set_for_period)
+        self._pending_updates = {}  # nom du recalcul -> identifiant after() en attente
+
         self._create_variables()
         self._create_widgets()
-        self._load_interim_agents()
         
         if self.is_modification:
             self._populate_data()
@@ -98,8 +95,11 @@ class CongeForm(tk.Toplevel):
         self.justif_entry = ttk.Entry(form_frame, width=40)
         self.justif_entry.grid(row=5, column=1, columnspan=2, sticky="ew")
 
-        self.interim_combo = ttk.Combobox(form_frame, textvariable=self.interim_var, state="readonly", width=38)
+        # La liste des intérimaires est chargée à l'ouverture de la liste déroulante,
+        # à partir des agents disponibles sur la période saisie (saisie semi-automatique).
+        self.interim_combo = ttk.Combobox(form_frame, textvariable=self.interim_var, width=38, postcommand=self._load_interim_agents)
         self.interim_combo.grid(row=6, column=1, columnspan=2, sticky="ew")
+        self.interim_combo.bind("<KeyRelease>", self._filter_interim_agents)
 
         self.cert_frame = ttk.LabelFrame(main_frame, text="Certificat Médical", padding=10)
         self.cert_file_label = ttk.Label(self.cert_frame, text="Aucun fichier attaché.", anchor="w", wraplength=350)
@@ -117,12 +117,34 @@ class CongeForm(tk.Toplevel):
         ttk.Button(btn_frame, text="Annuler", command=self.destroy).pack(side="right", padx=10)
 
         self.type_var.trace_add("write", lambda *args: self._on_type_change())
-        self.start_date_entry.bind("<FocusOut>", lambda e: self.after(100, self._update_end_date_from_days))
-        self.start_date_entry.bind("<<DatePicked>>", lambda e: self.after(100, self._update_end_date_from_days))
-        self.days_spinbox.bind("<FocusOut>", lambda e: self.after(100, self._update_end_date_from_days))
-        self.days_spinbox.bind("<Return>", lambda e: self.after(100, self._update_end_date_from_days))
-        self.end_date_entry.bind("<FocusOut>", lambda e: self.after(100, self._update_days_from_dates))
-        self.end_date_entry.bind("<<DatePicked>>", lambda e: self.after(100, self._update_days_from_dates))
+        self.start_date_entry.bind("<FocusOut>", lambda e: self._schedule_update(self._update_end_date_from_days))
+        self.start_date_entry.bind("<<DatePicked>>", lambda e: self._schedule_update(self._update_end_date_from_days))
+        self.days_spinbox.bind("<FocusOut>", lambda e: self._schedule_update(self._update_end_date_from_days))
+        self.days_spinbox.bind("<Return>", lambda e: self._schedule_update(self._update_end_date_from_days))
+        self.end_date_entry.bind("<FocusOut>", lambda e: self._schedule_update(self._update_days_from_dates))
+        self.end_date_entry.bind("<<DatePicked>>", lambda e: self._schedule_update(self._update_days_from_dates))
+        self.bind("<Destroy>", self._on_destroy)
+
+    def _schedule_update(self, update):
+        """
+        Planifie un recalcul dans 100 ms. Une demande du même recalcul encore en attente est
+        remplacée : les événements rapprochés (FocusOut puis Return, <<DatePicked>> puis FocusOut)
+        ne déclenchent qu'un seul calcul.
+        """
+        pending = self._pending_updates.pop(update.__name__, None)
+        if pending:
+            self.after_cancel(pending)
+        self._pending_updates[update.__name__] = self.after(100, self._run_update, update)
+
+    def _run_update(self, update):
+        self._pending_updates.pop(update.__name__, None)
+        update()
+
+    def _on_destroy(self, event):
+        if event.widget is self:
+            for pending in self._pending_updates.values():
+                self.after_cancel(pending)
+            self._pending_updates.clear()
 
     def _on_type_change(self, event=None):
         type_conge = self.type_var.get()
@@ -130,7 +152,7 @@ class CongeForm(tk.Toplevel):
             return
         self.current_strategy = self.STRATEGIES[type_conge]
         self.current_strategy.configure_ui(self)
-        self.after(100, self._update_end_date_from_days)
+        self._schedule_update(self._update_end_date_from_days)
 
     def _update_end_date_from_days(self):
         try:
@@ -139,7 +161,7 @@ class CongeForm(tk.Toplevel):
             if not start_date or days < 0:
                 self._update_reprise_date()
                 return
-            holidays_set = self.manager.get_holidays_set_for_period(start_date.year, start_date.year + 2)
+            holidays_set = self._holidays.get(start_date.year, start_date.year + 2)
             end_date = self.current_strategy.calculate_end_date(start_date, days, holidays_set)
             current_state = self.end_date_entry.cget('state')
             self.end_date_entry.config(state="normal")
@@ -159,7 +181,7 @@ class CongeForm(tk.Toplevel):
                 self.days_var.set("0")
                 self._update_reprise_date()
                 return
-            holidays_set = self.manager.get_holidays_set_for_period(start_date.year, end_date.year)
+            holidays_set = self._holidays.get(start_date.year, end_date.year)
             days = self.current_strategy.calculate_days(start_date, end_date, holidays_set)
             current_state = self.days_spinbox.cget('state')
             self.days_spinbox.config(state="normal")
@@ -175,7 +197,7 @@ class CongeForm(tk.Toplevel):
         self.reprise_date_entry.delete(0, tk.END)
         end_date = validate_date(self.end_date_entry.get())
         if end_date:
-            holidays_set = self.manager.get_holidays_set_for_period(end_date.year, end_date.year + 1)
+            holidays_set = self._holidays.get(end_date.year, end_date.year + 1)
             reprise = calculate_reprise_date(end_date, holidays_set)
             if reprise:
                 self.reprise_date_entry.insert(0, reprise.strftime("%d/%m/%Y"))
@@ -193,17 +215,41 @@ class CongeForm(tk.Toplevel):
         self.end_date_entry.insert(0, format_date_for_display(conge.date_fin.strftime('%Y-%m-%d')))
         self.justif_entry.insert(0, conge.justif or "")
         self.days_var.set(str(conge.jours_pris))
-        self.after(100, self._update_reprise_date)
+        self._schedule_update(self._update_reprise_date)
         if conge.interim_id:
-            for name, id_ in self.interim_agents.items():
-                if id_ == conge.interim_id:
-                    self.interim_var.set(name)
-                    break
+            interim = self.manager.get_agent_by_id(conge.interim_id)
+            if interim:
+                name = self._format_interim_name(interim)
+                self.interim_agents[name] = interim.id
+                self.interim_var.set(name)
+
+    @staticmethod
+    def _format_interim_name(agent):
+        return f"{agent.nom} {agent.prenom} (PPR: {agent.ppr})"
 
     def _load_interim_agents(self):
-        agents = self.manager.get_all_agents(exclude_id=self.agent_id)
-        self.interim_agents = {f"{a.nom} {a.prenom} (PPR: {a.ppr})": a.id for a in agents}
-        self.interim_combo['values'] = [""] + sorted(list(self.interim_agents.keys()))
+        """Charge les agents libres sur toute la période saisie (résultat mis en cache par le manager)."""
+        start_date = validate_date(self.start_date_entry.get())
+        end_date = validate_date(self.end_date_entry.get())
+        agents = self.manager.get_agents_disponibles(start_date, end_date, exclude_id=self.agent_id)
+
+        current_name = self.interim_var.get()
+        current_id = self.interim_agents.get(current_name)
+        self.interim_agents = {self._format_interim_name(a): a.id for a in agents}
+        if current_id is not None and any(a.id == current_id for a in agents):
+            self.interim_agents[current_name] = current_id
+        self._interim_choices = sorted(self.interim_agents.keys())
+        self._filter_interim_agents()
+
+    def _filter_interim_agents(self, event=None):
+        """Restreint la liste déroulante aux intérimaires contenant le texte saisi."""
+        if event is not None and event.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
+            return
+        term = self.interim_var.get().strip().lower()
+        if term and term in (name.lower() for name in self.interim_agents):
+            term = ""
+        choices = [name for name in self._interim_choices if term in name.lower()] if term else self._interim_choices
+        self.interim_combo['values'] = [""] + choices
 
     def _attach_certificate(self):
         filetypes = CONFIG.get('ui', {}).get('certificat_file_types', [("Tous les fichiers", "*.*")])
@@ -219,6 +265,10 @@ class CongeForm(tk.Toplevel):
     
     def _on_validate(self):
         try:
+            interim_name = self.interim_var.get().strip()
+            if interim_name and interim_name not in self.interim_agents:
+                raise ValueError(f"Intérimaire inconnu ou indisponible sur la période : '{interim_name}'.")
+
             form_data = {
                 'agent_id': self.agent_id,
                 'agent_ppr': self.agent_ppr,
@@ -228,7 +278,7 @@ class CongeForm(tk.Toplevel):
                 'date_fin': self.end_date_entry.get(),
                 'jours_pris': int(self.days_var.get()),
                 'justif': self.justif_entry.get().strip(),
-                'interim_id': self.interim_agents.get(self.interim_var.get()),
+                'interim_id': self.interim_agents.get(interim_name),
                 'cert_path': self.cert_path_var.get(),
                 'original_cert_path': self.original_cert_path,
                 'annee_exercice': self.annee_exercice,
@@ -240,7 +290,6 @@ class CongeForm(tk.Toplevel):
             if success:
                 message = "Congé modifié." if self.is_modification else "Congé ajouté."
                 self.parent.set_status(message)
-                self.parent.refresh_all(self.agent_id)
                 self.destroy()
 
         except (ValueError, sqlite3.Error) as e:
@@ -7,14 +7,13 @@ from tkinter import ttk, messagebox, filedialog
 import logging
 import os
 import sqlite3
-import threading
-from datetime import datetime, date
+from datetime import datetime
 import subprocess
 import sys
 
 from core.conges.manager import CongeManager
-from utils.file_utils import generate_decision_from_template
-from utils.date_utils import format_date_for_display, calculate_reprise_date
+from core.events import EventType
+from core.tasks import TaskService, TaskCancelled
 from utils.config_loader import CONFIG
 
 # --- Imports des panneaux et utilitaires UI ---
@@ -25,10 +24,17 @@ from ui.ui_utils import treeview_sort_column
 
 
 class MainWindow(tk.Tk):
+    # Groupes de tâches (voir core/tasks.py) qui réécrivent la base : les boutons d'édition
+    # sont désactivés tant qu'une de ces tâches est en cours.
+    BLOCKING_TASK_GROUPS = ('ecriture',)
+
     def __init__(self, manager: CongeManager, base_dir: str):
         super().__init__()
         self.manager = manager
         self.base_dir = base_dir
+        self.tasks = TaskService()
+        self._tasks_polling = False
+        self._ui_blocked = False
         self.title(f"{CONFIG['app']['title']} - v{CONFIG['app']['version']}")
         self.minsize(1400, 700)
         self.protocol("WM_DELETE_WINDOW", self.on_close)
@@ -41,10 +47,23 @@ class MainWindow(tk.Tk):
         self.dashboard_panel = None
 
         self.create_widgets()
-        self.refresh_all()
+        # Les agents sont affichés tout de suite ; le tableau de bord (jours fériés, agents en
+        # congé, justificatifs) n'est rempli qu'une fois la fenêtre affichée.
+        self.refresh_all(include_dashboard=False)
+        self._first_map_binding = self.bind("<Map>", self._on_first_map, add="+")
+        self._poll_certificate_ingestion()
+
+    def _on_first_map(self, event):
+        if event.widget is not self:
+            return
+        self.unbind("<Map>", self._first_map_binding)
+        self.after_idle(self.dashboard_panel.refresh_stats)
 
     def on_close(self):
-        if messagebox.askokcancel("Quitter", "Voulez-vous vraiment quitter ?"):
+        message = "Voulez-vous vraiment quitter ?"
+        if self.tasks.active:
+            message = "Des tâches sont en cours, elles seront annulées.\n\n" + message
+        if messagebox.askokcancel("Quitter", message):
             self.destroy()
 
     def trigger_restart(self):
@@ -81,14 +100,18 @@ class MainWindow(tk.Tk):
         right_pane.add(self.dashboard_panel, weight=1)
         # --- FIN DE LA CORRECTION ---
 
-        status_bar = ttk.Label(self, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
-        status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        status_frame = ttk.Frame(self)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        self.btn_cancel_task = ttk.Button(status_frame, text="Annuler la tâche", command=self.cancel_last_task, state="disabled")
+        self.btn_cancel_task.pack(side=tk.RIGHT)
+        status_bar = ttk.Label(status_frame, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
+        status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
         self.btn_generate_decision = ttk.Button(self.conges_panel.btn_frame_conges, text="Générer Décision", 
                                                 command=self.on_generate_decision_click, state="disabled")
         self.btn_generate_decision.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=2)
 
-    def refresh_all(self, agent_to_select_id=None):
+    def refresh_all(self, agent_to_select_id=None, include_dashboard=True):
         if agent_to_select_id is None and self.agents_panel:
             agent_to_select_id = self.agents_panel.get_selected_agent_id()
 
@@ -96,7 +119,7 @@ class MainWindow(tk.Tk):
             self.agents_panel.refresh_agents_list(agent_to_select_id)
         if self.conges_panel:
             self.conges_panel.display_conges_for_agent(agent_to_select_id)
-        if self.dashboard_panel:
+        if self.dashboard_panel and include_dashboard:
             self.dashboard_panel.refresh_stats()
         
         self._update_conge_action_buttons_state()
@@ -127,48 +150,74 @@ class MainWindow(tk.Tk):
             messagebox.showerror("Erreur", "Impossible de récupérer les informations.")
             return
 
-        templates_dir_name = CONFIG.get('paths', {}).get('templates_dir', 'templates')
-        grade_str = agent.grade.lower().replace(" ", "_")
-        template_name = f"{grade_str}.docx"
-        template_path = os.path.join(self.base_dir, templates_dir_name, template_name)
-
-        if not os.path.exists(template_path):
-            messagebox.showerror("Modèle manquant", f"Le modèle pour le grade '{agent.grade}' est introuvable.\nIl devrait être ici : {template_path}")
-            return
-            
-        details_solde_str = ""
-        if conge.type_conge == "Congé annuel":
-            details = self.manager.get_deduction_details(agent.id, conge.jours_pris)
-            parts = [f"{int(round(days))} {'jour' if int(round(days)) == 1 else 'jours'} au titre de l'année {year}" for year, days in sorted(details.items())]
-            details_solde_str = " et ".join(parts)
-
-        holidays_set = self.manager.get_holidays_set_for_period(conge.date_fin.year, conge.date_fin.year + 1)
-        date_reprise = calculate_reprise_date(conge.date_fin, holidays_set)
-
-        context = {
-            "{{nom_complet}}": f"{agent.nom} {agent.prenom}", "{{grade}}": agent.grade, "{{ppr}}": agent.ppr,
-            "{{date_debut}}": format_date_for_display(conge.date_debut), "{{date_fin}}": format_date_for_display(conge.date_fin),
-            "{{date_reprise}}": format_date_for_display(date_reprise) if date_reprise else "N/A",
-            "{{jours_pris}}": str(conge.jours_pris), "{{details_solde}}": details_solde_str,
-            "{{date_aujourdhui}}": date.today().strftime("%d/%m/%Y")
-        }
-
         initial_filename = f"Decision_Conge_{agent.nom}_{conge.date_debut.strftime('%Y-%m-%d')}.docx"
         save_path = filedialog.asksaveasfilename(
             title="Enregistrer la décision", initialfile=initial_filename, defaultextension=".docx",
-            filetypes=[("Documents Word", "*.docx"), ("Tous les fichiers", "*.*")]
+            filetypes=[("Documents Word", "*.docx"), ("Documents PDF", "*.pdf"), ("Tous les fichiers", "*.*")]
         )
 
         if not save_path:
             return
 
+        fmt = "pdf" if save_path.lower().endswith(".pdf") else "docx"
+        template_path = self.manager.get_decision_template_path(self.get_templates_dir(), agent.grade, fmt)
+
+        if fmt == "docx" and not os.path.exists(template_path):
+            messagebox.showerror("Modèle manquant", f"Le modèle pour le grade '{agent.grade}' est introuvable.\nIl devrait être ici : {template_path}\n\n"
+                                 "Vous pouvez générer la décision au format PDF, qui ne nécessite pas de modèle Word.")
+            return
+
+        context = self.manager.build_decision_context(agent, conge)
+
         try:
+            from utils.decisions import generate_decision_from_template
             generate_decision_from_template(template_path, save_path, context)
             if messagebox.askyesno("Succès", "La décision a été générée.\nVoulez-vous ouvrir le fichier ?", parent=self):
                 self._open_file(save_path)
         except Exception as e:
             messagebox.showerror("Erreur de Génération", f"Une erreur est survenue:\n{e}", parent=self)
 
+    def get_templates_dir(self):
+        return os.path.join(self.base_dir, CONFIG.get('paths', {}).get('templates_dir', 'templates'))
+
+    def generate_decisions_batch(self, conge_ids, output_dir, fmt="docx"):
+        """Génère en arrière-plan (plusieurs processus) les décisions des congés 'conge_ids' dans 'output_dir' (Word ou PDF)."""
+        jobs, erreurs_preparation = self.manager.prepare_decision_jobs(conge_ids, self.get_templates_dir(), fmt)
+        if not jobs:
+            messagebox.showerror("Génération impossible", "Aucune décision ne peut être générée :\n" +
+                                 "\n".join(message for _, message in erreurs_preparation[:10]), parent=self)
+            return
+
+        def task(report_progress):
+            from utils.decisions import generate_decisions_batch, write_batch_report
+            resultat = generate_decisions_batch(jobs, output_dir, progress_callback=report_progress)
+            resultat['rapport'] = write_batch_report(output_dir, resultat, erreurs_preparation)
+            return resultat
+
+        def on_complete(result):
+            if isinstance(result, TaskCancelled):
+                self.set_status("Génération annulée : les décisions déjà produites restent dans le dossier.")
+                return
+            if isinstance(result, Exception):
+                messagebox.showerror("Erreur de Génération", f"Une erreur est survenue:\n{result}", parent=self)
+                return
+            nb_erreurs = len(result['erreurs']) + len(erreurs_preparation)
+            if messagebox.askyesno("Génération terminée",
+                                   f"{len(result['generes'])} décision(s) générée(s), {nb_erreurs} erreur(s).\n"
+                                   f"Le rapport a été enregistré dans le dossier de destination.\n\nVoulez-vous ouvrir le dossier ?", parent=self):
+                self._open_file(output_dir)
+
+        self._run_long_task(task, on_complete, f"Génération de {len(jobs)} décision(s)...", with_progress=True, group='decisions')
+
+    def _poll_certificate_ingestion(self):
+        """Récupère les justificatifs traités en arrière-plan ; les panneaux concernés sont prévenus par le manager."""
+        for result in self.manager.poll_certificate_ingestion():
+            if result['erreur']:
+                messagebox.showwarning("Erreur de Justificatif",
+                    "Le congé a été enregistré, mais le fichier justificatif n'a pas pu être sauvegardé.\n"
+                    f"Veuillez le rattacher manuellement en modifiant le congé.\n\nErreur: {result['erreur']}", parent=self)
+        self.after(500, self._poll_certificate_ingestion)
+
     def _open_file(self, filepath):
         filepath = os.path.realpath(filepath)
         try:
@@ -178,39 +227,72 @@ class MainWindow(tk.Tk):
         except Exception as e:
             messagebox.showerror("Erreur d'Ouverture", f"Impossible d'ouvrir le fichier:\n{e}", parent=self)
             
-    def _run_long_task(self, task_lambda, on_complete, status_message):
-        self.set_status(status_message)
-        self.config(cursor="watch")
-        self._toggle_buttons_state("disabled")
-        
-        result_container = []
-        def task_wrapper():
-            try: result_container.append(task_lambda())
-            except Exception as e: result_container.append(e)
-                
-        worker_thread = threading.Thread(target=task_wrapper)
-        worker_thread.start()
-        self._check_thread_completion(worker_thread, result_container, on_complete)
-    
-    def _check_thread_completion(self, thread, result_container, on_complete):
-        if thread.is_alive():
-            self.after(100, lambda: self._check_thread_completion(thread, result_container, on_complete))
-        else:
-            result = result_container[0] if result_container else None
+    def _run_long_task(self, task_lambda, on_complete, status_message, with_progress=False, group='export'):
+        """
+        Soumet task_lambda au service de tâches partagé puis appelle on_complete(résultat) dans le thread Tk.
+        Si with_progress est vrai, task_lambda reçoit une fonction report_progress(fait, total),
+        qui lève TaskCancelled si l'utilisateur annule, et l'avancement est affiché dans la barre d'état.
+        Les tâches de BLOCKING_TASK_GROUPS désactivent les boutons ; les autres tournent en
+        parallèle de l'interface, dans la limite fixée pour leur groupe.
+        """
+        def _on_complete(result):
+            self._refresh_tasks_state()
             on_complete(result)
-            self.config(cursor="")
-            self._toggle_buttons_state("normal")
-            self.set_status("Prêt.")
-    
+
+        handle = self.tasks.submit(task_lambda, status_message, group, with_progress,
+                                   on_complete=_on_complete, on_progress=lambda done, total: self._refresh_tasks_state())
+        self._refresh_tasks_state()
+        if not self._tasks_polling:
+            self._tasks_polling = True
+            self.after(100, self._poll_tasks)
+        return handle
+
+    def _poll_tasks(self):
+        if self.tasks.poll():
+            self.after(100, self._poll_tasks)
+        else:
+            self._tasks_polling = False
+
+    def _refresh_tasks_state(self):
+        """Barre d'état (tâches en cours et avancement), bouton d'annulation et blocage de l'édition."""
+        active = self.tasks.active
+        parts = []
+        for handle in active:
+            done, total = handle.progress or (0, 0)
+            parts.append(f"{handle.label} {int(done * 100 / total)} %" if total else handle.label)
+        self.set_status(" | ".join(parts) if parts else "Prêt.")
+        self.btn_cancel_task.config(state="normal" if active else "disabled")
+
+        blocked = any(handle.group in self.BLOCKING_TASK_GROUPS for handle in active)
+        if blocked != self._ui_blocked:
+            self._ui_blocked = blocked
+            self.config(cursor="watch" if blocked else "")
+            self._toggle_buttons_state("disabled" if blocked else "normal")
+
+    def cancel_last_task(self):
+        """Demande l'annulation de la dernière tâche lancée."""
+        active = self.tasks.active
+        if not active:
+            return
+        handle = active[-1]
+        if not handle.cancellable and handle.future.running():
+            messagebox.showinfo("Annuler", f"La tâche « {handle.label} » réécrit la base : elle ne peut plus être annulée.", parent=self)
+        elif messagebox.askyesno("Annuler", f"Annuler la tâche « {handle.label} » ?", parent=self):
+            handle.cancel()
+
     def _on_task_complete(self, result):
-        if isinstance(result, Exception):
+        if isinstance(result, TaskCancelled):
+            self.set_status("Opération annulée.")
+        elif isinstance(result, Exception):
             messagebox.showerror("Erreur", f"L'opération a échoué:\n{result}")
         elif result:
             messagebox.showinfo("Succès", result)
     
     def _on_import_complete(self, result):
         self._on_task_complete(result)
-        if not isinstance(result, Exception): self.refresh_all()
+        # L'import écrit par sa propre connexion : les abonnés du manager (panneaux, cache de
+        # disponibilité) sont prévenus que toutes les données ont pu changer.
+        if not isinstance(result, Exception): self.manager.events.emit(EventType.DATA_RELOADED)
 
     def _toggle_buttons_state(self, state):
         if self.agents_panel: self.agents_panel.toggle_buttons_state(state)
@@ -7,9 +7,9 @@ from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
 
 from core.constants import SoldeStatus
+from core.events import EventType
 from ui.forms.agent_form import AgentForm
 from ui.ui_utils import treeview_sort_column
-from utils.file_utils import export_agents_to_excel, import_agents_from_excel
 
 class AgentsPanel(ttk.Frame):
     def __init__(self, parent_widget, main_app, manager, base_dir, on_agent_select_callback):
@@ -30,6 +30,16 @@ class AgentsPanel(ttk.Frame):
         self._create_widgets()
         self.refresh_agents_list()
 
+        # Soldes ou fiche modifiés : seules les lignes affichées concernées sont relues.
+        self.manager.events.subscribe(self._on_agents_changed, EventType.AGENT_UPDATED, EventType.SOLDES_CHANGED)
+        self.manager.events.subscribe(self._on_agents_list_changed, EventType.AGENT_CREATED, EventType.AGENT_DELETED, EventType.DATA_RELOADED)
+        self.bind("<Destroy>", self._on_destroy)
+
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self.manager.events.unsubscribe(self._on_agents_changed)
+            self.manager.events.unsubscribe(self._on_agents_list_changed)
+
     def _create_widgets(self):
         agents_frame = ttk.LabelFrame(self, text="Agents")
         agents_frame.pack(fill=tk.BOTH, expand=True)
@@ -80,9 +90,32 @@ class AgentsPanel(ttk.Frame):
         selection = self.list_agents.selection()
         return int(self.list_agents.item(selection[0])["values"][0]) if selection else None
 
+    def _agent_values(self, agent):
+        soldes = {s.annee: s.solde for s in agent.soldes_annuels if s.statut == SoldeStatus.ACTIF}
+        solde_total = agent.get_solde_total_actif()
+        an_n, an_n1, an_n2 = self.annee_exercice, self.annee_exercice - 1, self.annee_exercice - 2
+        return (agent.id, agent.nom, agent.prenom, agent.ppr, agent.grade, 
+                f"{soldes.get(an_n2, 0.0):.1f} j", f"{soldes.get(an_n1, 0.0):.1f} j", 
+                f"{soldes.get(an_n, 0.0):.1f} j", f"{solde_total:.1f} j")
+
+    def _on_agents_changed(self, event):
+        """Met à jour en place les lignes des agents concernés qui sont affichées sur la page courante."""
+        agent_ids = event['agent_ids'] if 'agent_ids' in event else {event['agent_id']}
+        visibles = [agent_id for agent_id in agent_ids if self.list_agents.exists(str(agent_id))]
+        if not visibles:
+            return
+        for agent in self.manager.get_agents_by_ids(visibles).values():
+            self.list_agents.item(str(agent.id), values=self._agent_values(agent))
+
+    def _on_agents_list_changed(self, event):
+        """Agent ajouté ou supprimé, ou données rechargées : la page courante est reconstruite."""
+        if event['type'] == EventType.AGENT_CREATED:
+            self.refresh_agents_list(event['agent_id'])
+        else:
+            self.refresh_agents_list(self.get_selected_agent_id())
+
     def refresh_agents_list(self, agent_to_select_id=None):
-        for row in self.list_agents.get_children():
-            self.list_agents.delete(row)
+        self.list_agents.delete(*self.list_agents.get_children())
         
         term = self.search_var.get().strip().lower() or None
         total_items = self.manager.get_agents_count(term)
@@ -93,14 +126,9 @@ class AgentsPanel(ttk.Frame):
         agents = self.manager.get_all_agents(term=term, limit=self.items_per_page, offset=offset)
         
         selected_item_id = None
-        an_n, an_n1, an_n2 = self.annee_exercice, self.annee_exercice - 1, self.annee_exercice - 2
         for agent in agents:
-            soldes = {s.annee: s.solde for s in agent.soldes_annuels if s.statut == SoldeStatus.ACTIF}
-            solde_total = agent.get_solde_total_actif()
-            values = (agent.id, agent.nom, agent.prenom, agent.ppr, agent.grade, 
-                      f"{soldes.get(an_n2, 0.0):.1f} j", f"{soldes.get(an_n1, 0.0):.1f} j", 
-                      f"{soldes.get(an_n, 0.0):.1f} j", f"{solde_total:.1f} j")
-            item_id = self.list_agents.insert("", "end", values=values)
+            # L'identifiant de la ligne est celui de l'agent (mise à jour ciblée, voir _on_agents_changed).
+            item_id = self.list_agents.insert("", "end", iid=str(agent.id), values=self._agent_values(agent))
             if agent.id == agent_to_select_id:
                 selected_item_id = item_id
 
@@ -152,25 +180,29 @@ class AgentsPanel(ttk.Frame):
             try:
                 self.manager.delete_agent(agent.id)
                 self.main_app.set_status(f"Agent '{agent.nom}' supprimé.")
-                self.main_app.refresh_all() # CORRIGÉ
             except Exception as e:
                 messagebox.showerror("Erreur", f"Une erreur est survenue : {e}")
                 
     def import_agents(self):
         source_path = filedialog.askopenfilename(title="Sélectionner un fichier Excel", filetypes=[("Fichiers Excel", "*.xlsx")])
         if not source_path: return
-        self.main_app._run_long_task( # CORRIGÉ
-            lambda: import_agents_from_excel(self.manager.db.db_file, self.manager.certificats_dir, source_path), 
-            self.main_app._on_import_complete, "Importation en cours..."
-        )
+
+        def task():
+            # openpyxl n'est chargé qu'au premier import/export, dans le fil de la tâche.
+            from utils.file_utils import import_agents_from_excel
+            return import_agents_from_excel(self.manager.db.db_file, self.manager.certificats_dir, source_path)
+
+        self.main_app._run_long_task(task, self.main_app._on_import_complete, "Importation en cours...", group='ecriture')
 
     def export_agents(self):
         save_path = filedialog.asksaveasfilename(defaultextension=".xlsx", initialfile=f"Export_Agents_{datetime.now().strftime('%Y-%m-%d')}.xlsx")
         if not save_path: return
-        self.main_app._run_long_task( # CORRIGÉ
-            lambda: export_agents_to_excel(self.manager.db.db_file, self.manager.certificats_dir, save_path), 
-            self.main_app._on_task_complete, "Exportation en cours..."
-        )
+
+        def task():
+            from utils.file_utils import export_agents_to_excel
+            return export_agents_to_excel(self.manager.db.db_file, self.manager.certificats_dir, save_path)
+
+        self.main_app._run_long_task(task, self.main_app._on_task_complete, "Exportation en cours...")
 
     def toggle_buttons_state(self, state):
         for frame in [self.btn_frame_agents, self.io_frame_agents]:
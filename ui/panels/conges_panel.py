@@ -6,8 +6,8 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from collections import defaultdict
 import logging
-import os
 
+from core.events import EventType
 from ui.forms.conge_form import CongeForm
 from ui.ui_utils import treeview_sort_column
 from utils.date_utils import format_date_for_display_short, calculate_reprise_date
@@ -24,9 +24,40 @@ class CongesPanel(ttk.LabelFrame):
         self.on_conge_select_callback = on_conge_select_callback
 
         self.current_agent_id = None
+        # Congés et intérimaires affichés, pour savoir si un événement concerne la liste.
+        self._conges_affiches = set()
+        self._interims_affiches = set()
         self.conge_filter_var = tk.StringVar(value="Tous")
 
         self._create_widgets()
+        self.manager.events.subscribe(self._on_data_changed)
+        self.bind("<Destroy>", self._on_destroy)
+
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self.manager.events.unsubscribe(self._on_data_changed)
+
+    def _concerne_liste(self, event):
+        """Vrai si l'événement modifie les congés affichés pour l'agent courant."""
+        event_type = event['type']
+        if event_type in (EventType.CONGE_CREATED, EventType.CONGE_DELETED):
+            return event['agent_id'] == self.current_agent_id
+        if event_type in (EventType.AGENT_UPDATED, EventType.AGENT_DELETED):
+            return event['agent_id'] in self._interims_affiches
+        if event_type == EventType.CERTIFICAT_CHANGED:
+            return not self._conges_affiches.isdisjoint(event['conge_ids'])
+        return event_type in (EventType.HOLIDAYS_CHANGED, EventType.DATA_RELOADED)
+
+    def _on_data_changed(self, event):
+        if self.current_agent_id is None:
+            return
+        if event['type'] == EventType.AGENT_DELETED and event['agent_id'] == self.current_agent_id:
+            self.display_conges_for_agent(None)
+        elif self._concerne_liste(event):
+            self.display_conges_for_agent(self.current_agent_id)
+        else:
+            return
+        self.on_conge_select_callback()
 
     def _create_widgets(self):
         """Crée et organise tous les widgets de ce panneau."""
@@ -75,6 +106,7 @@ class CongesPanel(ttk.LabelFrame):
     def display_conges_for_agent(self, agent_id):
         self.current_agent_id = agent_id
         self.list_conges.delete(*self.list_conges.get_children())
+        self._conges_affiches, self._interims_affiches = set(), set()
 
         if not agent_id:
             return
@@ -90,17 +122,29 @@ class CongesPanel(ttk.LabelFrame):
                 conges_par_annee[c.date_debut.year].append(c)
             else:
                 logging.warning(f"Date de début invalide pour congé ID {c.id}")
+        if not conges_par_annee:
+            return
+
+        # Certificats, intérimaires et jours fériés sont chargés une fois pour toute la liste.
+        certificats = self.manager.get_certificats_for_agent(agent_id)
+        self._interims_affiches = {c.interim_id for conges in conges_par_annee.values() for c in conges if c.interim_id}
+        interims = self.manager.get_agents_by_ids(self._interims_affiches) if self._interims_affiches else {}
+        holidays_set = self.manager.get_holidays_set_for_period(min(conges_par_annee), max(conges_par_annee) + 1)
 
         for annee in sorted(conges_par_annee.keys(), reverse=True):
             total_jours = sum(c.jours_pris for c in conges_par_annee[annee] if c.type_conge == 'Congé annuel' and c.statut == 'Actif')
             summary_id = self.list_conges.insert("", "end", values=("", "", f"📅 ANNÉE {annee}", "", "", "", total_jours, f"{total_jours} jours pris", ""), tags=("summary",), open=True)
             
-            holidays_set = self.manager.get_holidays_set_for_period(annee, annee + 1)
             for conge in sorted(conges_par_annee[annee], key=lambda c: c.date_debut):
-                cert_status = "✅ Fourni" if self.manager.get_certificat_for_conge(conge.id) else "❌ Manquant" if conge.type_conge == 'Congé de maladie' else ""
+                self._conges_affiches.add(conge.id)
+                cert = certificats.get(conge.id)
+                if cert:
+                    cert_status = "✅ Fourni" if cert[4] else "⚠️ Introuvable"
+                else:
+                    cert_status = "❌ Manquant" if conge.type_conge == 'Congé de maladie' else ""
                 interim_info = ""
                 if conge.interim_id:
-                    interim = self.manager.get_agent_by_id(conge.interim_id)
+                    interim = interims.get(conge.interim_id)
                     interim_info = f"{interim.nom} {interim.prenom}" if interim else "Agent Supprimé"
                 
                 reprise_date = calculate_reprise_date(conge.date_fin, holidays_set)
@@ -137,7 +181,6 @@ class CongesPanel(ttk.LabelFrame):
             try:
                 if self.manager.delete_conge(conge_id):
                     self.main_app.set_status("Congé supprimé.") # CORRIGÉ
-                    self.main_app.refresh_all(self.current_agent_id) # CORRIGÉ
             except Exception as e:
                 messagebox.showerror("Erreur de suppression", str(e))
 
@@ -147,7 +190,15 @@ class CongesPanel(ttk.LabelFrame):
             return
         
         cert = self.manager.get_certificat_for_conge(conge_id)
-        if cert and cert[2] and os.path.exists(cert[2]):
+        if cert and cert[2] and cert[4]:
+            preview_path = self.manager.get_certificat_preview(conge_id)
+            if preview_path:
+                try:
+                    from ui.widgets.secondary_windows import CertificatePreviewWindow
+                    CertificatePreviewWindow(self.main_app, preview_path, cert[2], self.main_app._open_file)
+                    return
+                except tk.TclError as e:
+                    logging.warning(f"Aperçu illisible pour conge_id {conge_id}: {e}")
             try:
                 self.main_app._open_file(cert[2]) # CORRIGÉ
             except Exception as e:
@@ -4,11 +4,10 @@
 
 import tkinter as tk
 from tkinter import ttk, filedialog
-from datetime import datetime
+from datetime import datetime, date
 
-from ui.widgets.secondary_windows import AdminWindow, JustificatifsWindow
+from core.events import EventType
 from utils.date_utils import format_date_for_display, calculate_reprise_date
-from utils.file_utils import export_all_conges_to_excel
 
 class DashboardPanel(ttk.LabelFrame):
     """
@@ -21,8 +20,33 @@ class DashboardPanel(ttk.LabelFrame):
         
         self.annee_exercice = self.manager.get_annee_exercice()
         
+        # Le contenu est chargé par MainWindow une fois la fenêtre affichée (refresh_stats).
         self._create_widgets()
-        self.refresh_stats()
+        self.manager.events.subscribe(self._on_data_changed)
+        self.bind("<Destroy>", self._on_destroy)
+
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self.manager.events.unsubscribe(self._on_data_changed)
+
+    def _on_data_changed(self, event):
+        """Ne recharge que ce que l'événement peut modifier : la liste du jour et/ou le compteur de justificatifs."""
+        event_type = event['type']
+        if event_type in (EventType.HOLIDAYS_CHANGED, EventType.DATA_RELOADED):
+            self.refresh_stats()
+            return
+        if event_type in (EventType.CONGE_CREATED, EventType.CONGE_DELETED):
+            if event['date_debut'] and event['date_fin'] and event['date_debut'].date() <= date.today() <= event['date_fin'].date():
+                self._refresh_on_leave()
+            if event['type_conge'] == 'Congé de maladie':
+                self._refresh_justificatifs_badge()
+        elif event_type in (EventType.AGENT_UPDATED, EventType.AGENT_DELETED):
+            if self.list_on_leave.get_children():
+                self._refresh_on_leave()
+            if event_type == EventType.AGENT_DELETED:
+                self._refresh_justificatifs_badge()
+        elif event_type == EventType.CERTIFICAT_CHANGED:
+            self._refresh_justificatifs_badge()
 
     def _create_widgets(self):
         """Crée et organise tous les widgets de ce panneau."""
@@ -45,14 +69,19 @@ class DashboardPanel(ttk.LabelFrame):
         self.global_actions_frame.pack(fill=tk.X, padx=5, pady=(5, 5))
         
         ttk.Button(self.global_actions_frame, text="Actualiser", command=self.main_app.refresh_all).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=2) # CORRIGÉ
-        ttk.Button(self.global_actions_frame, text="Suivi Justificatifs", command=self.open_justificatifs_suivi).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=2)
+        self.btn_justificatifs = ttk.Button(self.global_actions_frame, text="Suivi Justificatifs", command=self.open_justificatifs_suivi)
+        self.btn_justificatifs.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=2)
+        ttk.Button(self.global_actions_frame, text="Décisions par Lot", command=self.open_batch_decisions).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=2)
         ttk.Button(self.global_actions_frame, text="Administration", command=self.open_admin_window).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=2)
         ttk.Button(self.global_actions_frame, text="Exporter Tous les Congés", command=self.export_conges).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=2)
 
     def refresh_stats(self):
-        """Met à jour la liste des agents actuellement en congé."""
-        for row in self.list_on_leave.get_children():
-            self.list_on_leave.delete(row)
+        """Met à jour la liste des agents actuellement en congé et le compteur de justificatifs manquants."""
+        self._refresh_on_leave()
+        self._refresh_justificatifs_badge()
+
+    def _refresh_on_leave(self):
+        self.list_on_leave.delete(*self.list_on_leave.get_children())
             
         try:
             holidays_set = self.manager.get_holidays_set_for_period(self.annee_exercice, self.annee_exercice + 1)
@@ -65,14 +94,29 @@ class DashboardPanel(ttk.LabelFrame):
         except Exception as e:
             self.list_on_leave.insert("", "end", values=(f"Erreur DB: {e}", "", "", ""))
 
+    def _refresh_justificatifs_badge(self):
+        """Affiche sur le bouton de suivi le nombre de justificatifs manquants (requête indexée)."""
+        try:
+            manquants = self.manager.count_sick_leaves_by_status()['manquant']
+        except Exception:
+            manquants = 0
+        self.btn_justificatifs.config(text=f"Suivi Justificatifs ({manquants} manquant{'s' if manquants > 1 else ''})" if manquants else "Suivi Justificatifs")
+
     def open_admin_window(self):
         """Ouvre la fenêtre d'administration."""
+        from ui.widgets.secondary_windows import AdminWindow
         AdminWindow(self.main_app, self.manager) # CORRIGÉ
 
     def open_justificatifs_suivi(self):
         """Ouvre la fenêtre de suivi des justificatifs."""
+        from ui.widgets.secondary_windows import JustificatifsWindow
         JustificatifsWindow(self.main_app, self.manager) # CORRIGÉ
 
+    def open_batch_decisions(self):
+        """Ouvre la fenêtre de génération des décisions par lot."""
+        from ui.widgets.secondary_windows import BatchDecisionWindow
+        BatchDecisionWindow(self.main_app, self.manager, self.main_app)
+
     def export_conges(self):
         """Ouvre une boîte de dialogue pour exporter tous les congés."""
         save_path = filedialog.asksaveasfilename(
@@ -87,11 +131,12 @@ class DashboardPanel(ttk.LabelFrame):
         db_path = self.manager.db.db_file
         cert_path = self.manager.certificats_dir
         
-        self.main_app._run_long_task( # CORRIGÉ
-            lambda: export_all_conges_to_excel(db_path, cert_path, save_path), 
-            self.main_app._on_task_complete, 
-            "Exportation de tous les congés en cours..."
-        )
+
+        def task():
+            from utils.file_utils import export_all_conges_to_excel
+            return export_all_conges_to_excel(db_path, cert_path, save_path)
+
+        self.main_app._run_long_task(task, self.main_app._on_task_complete, "Exportation de tous les congés en cours...")
 
     def toggle_buttons_state(self, state):
         """Active ou désactive tous les widgets interactifs du panneau."""
@@ -0,0 +1,24 @@
+# Fichier : ui/tk_interaction.py
+# Adaptateur Tkinter de l'interface d'interaction du moteur métier (core/interaction.py).
+
+from tkinter import messagebox
+
+from core.interaction import InteractionHandler
+
+
+class TkInteractionHandler(InteractionHandler):
+    """Affiche les confirmations et notifications du moteur métier dans des boîtes de dialogue Tk."""
+    def confirm(self, title, message, parent=None):
+        return messagebox.askyesno(title, message, parent=parent)
+
+    def info(self, title, message, parent=None):
+        super().info(title, message, parent)
+        messagebox.showinfo(title, message, parent=parent)
+
+    def warning(self, title, message, parent=None):
+        super().warning(title, message, parent)
+        messagebox.showwarning(title, message, parent=parent)
+
+    def error(self, title, message, parent=None):
+        super().error(title, message, parent)
+        messagebox.showerror(title, message, parent=parent)
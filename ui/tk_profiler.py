@@ -0,0 +1,157 @@
+# Fichier : ui/tk_profiler.py
+# Profilage de la réactivité de l'interface (diagnostic, désactivé par défaut).
+#
+# Tous les rappels Python appelés par Tk (command=, bind, after, validations...) passent par
+# tkinter.CallWrapper. Une fois le profileur installé, chaque rappel est chronométré : c'est le
+# temps pendant lequel la boucle Tk est bloquée. Le temps des rappels imbriqués (boucle locale
+# d'une fenêtre modale, update()) est compté pour le rappel imbriqué, pas pour son parent ; les
+# boîtes de dialogue natives (messagebox) restent en revanche comptées dans le rappel qui les ouvre.
+#
+# Un traitement qui dépasse le budget est signalé dans le journal, puis ses exécutions suivantes
+# sont profilées avec cProfile : les profils des appels les plus lents sont conservés et écrits
+# avec le résumé par traitement dans le rapport (write_report).
+
+import cProfile
+import heapq
+import io
+import itertools
+import logging
+import os
+import pstats
+import tkinter
+from datetime import datetime
+from time import perf_counter
+
+_ORIGINAL_CALL_WRAPPER = tkinter.CallWrapper
+
+
+def handler_name(func):
+    """Nom lisible d'un rappel : nom qualifié et emplacement, à travers l'enveloppe de Misc.after()."""
+    prefix = ""
+    code = getattr(func, '__code__', None)
+    if code is not None and code.co_name == 'callit' and 'func' in code.co_freevars and func.__closure__:
+        func = func.__closure__[code.co_freevars.index('func')].cell_contents
+        prefix = "after: "
+    target = getattr(func, '__func__', func)
+    qualname = getattr(target, '__qualname__', None) or type(func).__qualname__
+    code = getattr(target, '__code__', None)
+    location = f" ({os.path.basename(code.co_filename)}:{code.co_firstlineno})" if code else ""
+    return f"{prefix}{qualname}{location}"
+
+
+class TkCallbackProfiler:
+    # Exécutions profilées après un premier dépassement du budget, par traitement.
+    PROFILED_CALLS_PER_HANDLER = 3
+
+    def __init__(self, budget_ms=50, max_snapshots=10):
+        self.budget_ms = budget_ms
+        self.max_snapshots = max_snapshots
+        self.stats = {}        # nom -> {'count', 'total_ms', 'max_ms', 'over_budget'}
+        self._snapshots = []   # tas (durée, ordre, nom, profil texte) des appels profilés les plus lents
+        self._to_profile = {}  # nom -> nombre d'exécutions restant à profiler
+        self._stack = []       # temps des rappels imbriqués, par niveau
+        self._profiling = False
+        self._order = itertools.count()
+
+    def run(self, name, call, args):
+        """Exécute call(*args) pour le rappel 'name' en mesurant le temps de blocage."""
+        profile = None
+        if not self._profiling and self._to_profile.get(name):
+            self._to_profile[name] -= 1
+            profile = cProfile.Profile()
+            self._profiling = True
+        self._stack.append(0.0)
+        start = perf_counter()
+        try:
+            if profile is None:
+                return call(*args)
+            return profile.runcall(call, *args)
+        finally:
+            elapsed = (perf_counter() - start) * 1000
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            if profile is not None:
+                self._profiling = False
+            self._record(name, elapsed - nested, profile)
+
+    def _record(self, name, blocked_ms, profile):
+        entry = self.stats.get(name)
+        if entry is None:
+            entry = self.stats[name] = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'over_budget': 0}
+        entry['count'] += 1
+        entry['total_ms'] += blocked_ms
+        entry['max_ms'] = max(entry['max_ms'], blocked_ms)
+        if blocked_ms <= self.budget_ms:
+            return
+
+        entry['over_budget'] += 1
+        if entry['over_budget'] == 1:
+            logging.warning(f"Interface bloquée {blocked_ms:.0f} ms par {name} (budget : {self.budget_ms:g} ms).")
+            self._to_profile[name] = self.PROFILED_CALLS_PER_HANDLER
+        if profile is not None and (len(self._snapshots) < self.max_snapshots or blocked_ms > self._snapshots[0][0]):
+            snapshot = (blocked_ms, next(self._order), name, self._format_profile(profile))
+            if len(self._snapshots) < self.max_snapshots:
+                heapq.heappush(self._snapshots, snapshot)
+            else:
+                heapq.heapreplace(self._snapshots, snapshot)
+
+    @staticmethod
+    def _format_profile(profile, limit=25):
+        out = io.StringIO()
+        pstats.Stats(profile, stream=out).sort_stats('cumulative').print_stats(limit)
+        return out.getvalue()
+
+    def snapshots(self):
+        """Profils conservés, du plus lent au plus rapide : [(durée en ms, nom, profil texte)]."""
+        return [(ms, name, text) for ms, _, name, text in sorted(self._snapshots, reverse=True)]
+
+    def write_report(self, path):
+        """Écrit le résumé par traitement (les plus bloquants d'abord) et les profils conservés."""
+        lines = [f"Profil de réactivité de l'interface - {datetime.now():%Y-%m-%d %H:%M:%S}",
+                 f"Budget par traitement : {self.budget_ms:g} ms", "",
+                 f"{'Max (ms)':>9} {'Total (ms)':>11} {'Appels':>7} {'Hors budget':>11}  Traitement"]
+        for name, entry in sorted(self.stats.items(), key=lambda item: item[1]['max_ms'], reverse=True):
+            lines.append(f"{entry['max_ms']:9.1f} {entry['total_ms']:11.1f} {entry['count']:7d} "
+                         f"{entry['over_budget']:11d}  {name}")
+        for blocked_ms, name, text in self.snapshots():
+            lines += ["", f"=== {name} : {blocked_ms:.1f} ms ===", text.rstrip()]
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+
+class _ProfilingCallWrapper(_ORIGINAL_CALL_WRAPPER):
+    """CallWrapper chronométré par le profileur actif."""
+    def __call__(self, *args):
+        if _ACTIVE is None:
+            return super().__call__(*args)
+        name = self.__dict__.get('_profile_name')
+        if name is None:
+            name = self._profile_name = handler_name(self.func)
+        return _ACTIVE.run(name, super().__call__, args)
+
+
+_ACTIVE = None
+
+
+def install(budget_ms=50, max_snapshots=10):
+    """
+    Active le profileur pour les rappels enregistrés ensuite : à appeler avant de créer les
+    fenêtres. Retourne le profileur.
+    """
+    global _ACTIVE
+    _ACTIVE = TkCallbackProfiler(budget_ms, max_snapshots)
+    tkinter.CallWrapper = _ProfilingCallWrapper
+    return _ACTIVE
+
+
+def uninstall():
+    global _ACTIVE
+    _ACTIVE = None
+    tkinter.CallWrapper = _ORIGINAL_CALL_WRAPPER
+
+
+def get_active():
+    """Profileur installé, ou None."""
+    return _ACTIVE
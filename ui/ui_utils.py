@@ -1,6 +1,9 @@
 # Fichier : ui/ui_utils.py
 # NOUVEAU FICHIER : Contient les fonctions utilitaires partagées par les composants de l'interface.
 
+import tkinter as tk
+
+
 def treeview_sort_column(tv, col, reverse):
     """Fonction utilitaire pour trier une colonne de Treeview."""
     items_list = [(tv.set(k, col), k) for k in tv.get_children('')]
@@ -28,4 +31,15 @@ def treeview_sort_column(tv, col, reverse):
     # Réassigne la commande de tri à l'en-tête pour permettre le tri inversé au prochain clic
     tv.heading(col, command=lambda: treeview_sort_column(tv, col, not reverse))
 
-print("Le fichier ui/ui_utils.py a été créé avec succès.")
\ No newline at end of file
+
+def load_preview_image(path, master=None, max_size=(320, 320)):
+    """
+    Charge un aperçu de justificatif (PNG ou GIF). Une image plus grande que max_size
+    (copie d'origine faute de Pillow) est réduite par sous-échantillonnage. Lève tk.TclError
+    si le fichier est illisible.
+    """
+    image = tk.PhotoImage(master=master, file=path)
+    factor = max(1, -(-image.width() // max_size[0]), -(-image.height() // max_size[1]))
+    return image.subsample(factor) if factor > 1 else image
+
+print("Le fichier ui/ui_utils.py a été créé avec succès.")
@@ -3,11 +3,10 @@
 
 import tkinter as tk
 from tkinter import ttk
-from tkcalendar import Calendar
 from datetime import datetime
 
 # Import des utilitaires nécessaires
-from utils.config_loader import CONFIG
+from utils.config_loader import get_settings
 
 class DatePickerWindow(tk.Toplevel):
     """
@@ -41,9 +40,7 @@ class DatePickerWindow(tk.Toplevel):
     def _load_holidays(self):
         """Charge les jours fériés si le type de congé le requiert."""
         self.holidays_dict = {}
-        types_decompte = CONFIG['conges']['types_decompte_solde']
-        
-        if self.conge_type in types_decompte:
+        if self.conge_type in get_settings().conges.types_decompte_solde:
             year = datetime.now().year
             # AXE 2 : On appelle la méthode du manager pour obtenir les jours fériés.
             # L'interface ne sait plus comment ces jours sont récupérés (DB, API, etc.).
@@ -53,6 +50,8 @@ class DatePickerWindow(tk.Toplevel):
 
     def _create_widgets(self):
         """Crée et configure le widget Calendrier et les boutons."""
+        # tkcalendar (et babel) ne sont chargés qu'à la première ouverture d'un calendrier.
+        from tkcalendar import Calendar
         self.cal = Calendar(
             self,
             selectmode='day',
@@ -2,23 +2,19 @@
 # Ce fichier utilise la nouvelle fonction validate_date sans nécessiter de modification.
 
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
 import sqlite3
 import os
-import shutil
-import sys
-
-# La bibliothèque 'holidays' est utilisée ici, mais elle est gérée de manière
-# optionnelle dans date_utils, donc aucune modification n'est nécessaire ici.
-try:
-    import holidays
-except ImportError:
-    pass
 
+from core.tasks import TaskCancelled
+from db.backup import restore_backup
+from db.backup_store import get_backup_store, get_retention_policy
+from db.query_stats import BUCKETS_MS
+from ui.ui_utils import load_preview_image
 from ui.widgets.date_picker import DatePickerWindow
-from utils.date_utils import validate_date, format_date_for_display
-from utils.config_loader import CONFIG
+from utils.date_utils import validate_date, format_date_for_display, get_holidays_module
+from utils.config_loader import CONFIG, get_settings
 
 class EditHolidayWindow(tk.Toplevel):
     """Fenêtre modale pour modifier un jour férié personnalisé."""
@@ -75,7 +71,9 @@ class BackupWindow(tk.Toplevel):
         self.main_app = main_app_instance
         self.db_path = self.manager.db.get_db_path()
         self.base_dir = os.path.dirname(self.db_path)
-        self.backups_dir = os.path.join(self.base_dir, "backups")
+        self.store = get_backup_store(self.db_path)
+        # Les anciennes sauvegardes (copies complètes) sont à côté du magasin, dans le dossier configuré (backups.dir).
+        self.backups_dir = os.path.dirname(self.store.root_dir)
         
         self.title("Gérer les Sauvegardes et Restaurer")
         self.geometry("700x400")
@@ -94,7 +92,7 @@ class BackupWindow(tk.Toplevel):
         
         cols = ("Fichier", "Date de création", "Taille")
         self.tree = ttk.Treeview(list_frame, columns=cols, show="headings")
-        self.tree.heading("Fichier", text="Nom du Fichier")
+        self.tree.heading("Fichier", text="Sauvegarde")
         self.tree.heading("Date de création", text="Date de création")
         self.tree.heading("Taille", text="Taille")
         
@@ -109,68 +107,118 @@ class BackupWindow(tk.Toplevel):
         ttk.Button(btn_frame, text="Fermer", command=self.destroy).pack(side="right")
         ttk.Button(btn_frame, text="Restaurer la version sélectionnée", command=self._run_restore).pack(side="right", padx=10)
         ttk.Button(btn_frame, text="Supprimer la sauvegarde", command=self._delete_backup).pack(side="left")
+        ttk.Button(btn_frame, text="Nouvelle sauvegarde", command=self._create_backup).pack(side="left", padx=10)
+
+    @staticmethod
+    def _format_size(size):
+        return f"{size / 1024:.1f} KB" if size < 1024*1024 else f"{size / (1024*1024):.1f} MB"
 
     def _populate_backups(self):
         for row in self.tree.get_children():
             self.tree.delete(row)
-        
+
+        # Instantanés du magasin dédupliqué : lus depuis l'index, sans accès aux fichiers.
+        for snapshot in self.store.list_snapshots():
+            date_str = datetime.fromisoformat(snapshot['created']).strftime('%d/%m/%Y %H:%M:%S')
+            self.tree.insert("", "end", iid=f"store:{snapshot['id']}",
+                             values=(snapshot['label'], date_str, self._format_size(snapshot['size'])))
+
+        # Anciennes sauvegardes (copies complètes du fichier), toujours restaurables.
         if not os.path.exists(self.backups_dir):
             return
-            
         backups = []
-        for filename in os.listdir(self.backups_dir):
-            if filename.endswith((".db", ".sqlite3")):
-                full_path = os.path.join(self.backups_dir, filename)
-                try:
-                    mtime = os.path.getmtime(full_path)
-                    size = os.path.getsize(full_path)
-                    backups.append((filename, mtime, size))
-                except OSError:
-                    continue
+        with os.scandir(self.backups_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith((".db", ".sqlite3")):
+                    try:
+                        stat = entry.stat()
+                        backups.append((entry.name, stat.st_mtime, stat.st_size))
+                    except OSError:
+                        continue
                     
         backups.sort(key=lambda x: x[1], reverse=True)
         for filename, mtime, size in backups:
             date_str = datetime.fromtimestamp(mtime).strftime('%d/%m/%Y %H:%M:%S')
-            size_str = f"{size / 1024:.1f} KB" if size < 1024*1024 else f"{size / (1024*1024):.1f} MB"
-            self.tree.insert("", "end", values=(filename, date_str, size_str))
+            self.tree.insert("", "end", iid=f"file:{filename}", values=(filename, date_str, self._format_size(size)))
 
-    def _get_selected_backup_path(self):
+    def _get_selected_backup(self):
+        """Retourne (type, référence) : ('store', id_instantané) ou ('file', chemin)."""
         selection = self.tree.selection()
         if not selection:
             messagebox.showwarning("Aucune sélection", "Veuillez sélectionner une sauvegarde.", parent=self)
-            return None
-        filename = self.tree.item(selection[0], "values")[0]
-        return os.path.join(self.backups_dir, filename)
+            return None, None
+        kind, ref = selection[0].split(":", 1)
+        if kind == "file":
+            return kind, os.path.join(self.backups_dir, ref)
+        return kind, ref
+
+    def _create_backup(self):
+        store, db_path = self.store, self.db_path
+        def task(report_progress):
+            snapshot = store.create_snapshot(db_path, "MANUELLE", report_progress)
+            store.apply_retention(**get_retention_policy())
+            return snapshot
+        self.main_app._run_long_task(task, self._on_create_backup_complete, "Sauvegarde en cours...", with_progress=True, group='sauvegarde')
+
+    def _on_create_backup_complete(self, result):
+        if isinstance(result, Exception):
+            messagebox.showerror("Échec de la Sauvegarde", f"La sauvegarde a échoué : {result}", parent=self)
+        self._populate_backups()
 
     def _delete_backup(self):
-        backup_path = self._get_selected_backup_path()
-        if not backup_path:
+        kind, ref = self._get_selected_backup()
+        if not kind:
             return
-        if messagebox.askyesno("Confirmation", f"Supprimer définitivement le fichier de sauvegarde ?\n\n{os.path.basename(backup_path)}", parent=self):
+        name = self.tree.item(self.tree.selection()[0], "values")[0]
+        if messagebox.askyesno("Confirmation", f"Supprimer définitivement la sauvegarde ?\n\n{name}", parent=self):
             try:
-                os.remove(backup_path)
+                if kind == "store":
+                    # Pas d'attente dans l'interface : si une sauvegarde est en cours, TimeoutError (OSError).
+                    self.store.delete_snapshot(ref, timeout=0)
+                else:
+                    os.remove(ref)
                 messagebox.showinfo("Succès", "La sauvegarde a été supprimée.", parent=self)
                 self._populate_backups()
             except OSError as e:
-                messagebox.showerror("Erreur", f"Impossible de supprimer le fichier : {e}", parent=self)
+                messagebox.showerror("Erreur", f"Impossible de supprimer la sauvegarde : {e}", parent=self)
     
     def _run_restore(self):
-        backup_path = self._get_selected_backup_path()
-        if not backup_path:
+        # Le thread d'ingestion des justificatifs écrit par sa propre connexion : il doit aussi avoir terminé.
+        ingestion = self.manager.ingestion
+        if self.main_app.tasks.active or (ingestion and ingestion.pending):
+            messagebox.showwarning("Tâches en cours", "Des tâches sont en cours (import, export, sauvegarde, "
+                                   "enregistrement de justificatifs...).\n\n"
+                                   "Attendez leur fin avant de restaurer une sauvegarde.", parent=self)
+            return
+        kind, ref = self._get_selected_backup()
+        if not kind:
             return
             
         msg = ("Êtes-vous certain de vouloir restaurer cette version ?\n\n"
                "ATTENTION : Toutes les données actuelles seront PERDUES.\n"
                "Cette action est IRRÉVERSIBLE.")
         if messagebox.askyesno("Confirmation de Restauration", msg, icon='warning', parent=self):
-            try:
-                self.manager.db.close()
-                shutil.copy2(backup_path, self.db_path)
-                messagebox.showinfo("Restauration Réussie", "Restauration effectuée.\n\nL'application va redémarrer.", parent=self)
-                self.main_app.trigger_restart()
-            except Exception as e:
-                messagebox.showerror("Erreur Critique", f"La restauration a échoué : {e}\n\nRedémarrez l'application.", parent=self)
+            self.manager.db.close()
+            db_path, store = self.db_path, self.store
+            if kind == "store":
+                task = lambda report_progress: store.restore_snapshot(ref, db_path, report_progress)
+            else:
+                task = lambda report_progress: restore_backup(ref, db_path, report_progress)
+            self.main_app._run_long_task(task, self._on_restore_complete, "Restauration en cours...", with_progress=True, group='ecriture')
+
+    def _on_restore_complete(self, result):
+        if isinstance(result, Exception):
+            # Restauration annulée avant son lancement ou échouée : la base actuelle est rouverte.
+            if not self.manager.db.connect():
+                messagebox.showerror("Erreur Critique", f"La restauration a échoué : {result}\n\nRedémarrez l'application.", parent=self)
                 self.destroy()
+            elif isinstance(result, TaskCancelled):
+                messagebox.showinfo("Restauration annulée", "La restauration n'a pas été lancée : la base actuelle est conservée.", parent=self)
+            else:
+                messagebox.showerror("Erreur", f"La restauration a échoué : {result}\n\nLa base actuelle a été rouverte.", parent=self)
+            return
+        messagebox.showinfo("Restauration Réussie", "Restauration effectuée.\n\nL'application va redémarrer.", parent=self)
+        self.main_app.trigger_restart()
 
 class AdminWindow(tk.Toplevel):
     """Fenêtre d'administration pour les tâches de haut niveau."""
@@ -196,14 +244,17 @@ class AdminWindow(tk.Toplevel):
         tab_gestion = ttk.Frame(notebook)
         tab_soldes = ttk.Frame(notebook)
         tab_feries = ttk.Frame(notebook)
+        tab_diagnostics = ttk.Frame(notebook)
         
         notebook.add(tab_gestion, text=" Gestion Annuelle ")
         notebook.add(tab_soldes, text=" Gestion Manuelle des Soldes ")
         notebook.add(tab_feries, text=" Jours Fériés ")
+        notebook.add(tab_diagnostics, text=" Diagnostics ")
         
         self._populate_gestion_tab(tab_gestion)
         self._populate_soldes_tab(tab_soldes)
         self._populate_feries_tab(tab_feries)
+        self._populate_diagnostics_tab(tab_diagnostics)
 
     def _populate_soldes_tab(self, parent_frame):
         selection_frame = ttk.LabelFrame(parent_frame, text="Sélectionner un Agent", padding=10)
@@ -301,7 +352,6 @@ class AdminWindow(tk.Toplevel):
         try:
             if self.manager.save_manual_soldes(agent_id, updates_to_perform, creations_to_perform):
                 messagebox.showinfo("Succès", "Les soldes ont été mis à jour.", parent=self)
-                self.parent_window.refresh_all(agent_id)
                 self._on_agent_selected_for_soldes()
         except AttributeError:
             messagebox.showerror("Fonctionnalité manquante", "La méthode `save_manual_soldes` n'est pas encore implémentée dans le CongeManager.", parent=self)
@@ -399,6 +449,87 @@ class AdminWindow(tk.Toplevel):
         
         self.refresh_holidays_list()
 
+    def _populate_diagnostics_tab(self, parent_frame):
+        self.query_stats = self.manager.db.query_stats
+        main_frame = ttk.Frame(parent_frame, padding=10)
+        main_frame.pack(fill="both", expand=True)
+
+        if self.query_stats is None:
+            ttk.Label(main_frame, wraplength=700, text="Les statistiques des requêtes SQL sont désactivées.\n"
+                      "Pour les activer, mettez 'query_stats: true' dans la section 'diagnostics' de config.yaml "
+                      "puis redémarrez l'application.").pack(pady=20)
+            return
+
+        seuil = self.query_stats.slow_query_ms
+        info = f"Requêtes lentes journalisées au-delà de {seuil:g} ms." if seuil else "Journal des requêtes lentes désactivé."
+        ttk.Label(main_frame, text=f"Requêtes les plus coûteuses depuis le démarrage (ou la dernière réinitialisation). {info}",
+                  wraplength=700).pack(fill="x", pady=(0, 5))
+
+        cols = ("Requête", "Appels", "Total (ms)", "Moyenne (ms)", "Max (ms)", "Lignes")
+        self.queries_tree = ttk.Treeview(main_frame, columns=cols, show="headings", height=12, selectmode="browse")
+        for col in cols:
+            self.queries_tree.heading(col, text=col)
+            self.queries_tree.column(col, width=90, anchor="e")
+        self.queries_tree.column("Requête", width=320, anchor="w")
+        self.queries_tree.pack(fill="both", expand=True)
+        self.queries_tree.bind("<<TreeviewSelect>>", self._on_query_selected)
+
+        self.query_details = tk.Text(main_frame, height=8, wrap="word", state="disabled")
+        self.query_details.pack(fill="x", pady=5)
+
+        btn_frame = ttk.Frame(main_frame)
+        btn_frame.pack(fill="x")
+        ttk.Button(btn_frame, text="Actualiser", command=self.refresh_query_stats).pack(side="left")
+        ttk.Button(btn_frame, text="Réinitialiser", command=self._reset_query_stats).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Exporter (JSON)...", command=self._export_query_stats).pack(side="right")
+
+        self.refresh_query_stats()
+
+    def refresh_query_stats(self):
+        self.queries_tree.delete(*self.queries_tree.get_children())
+        self._query_entries = {}
+        for i, entry in enumerate(self.query_stats.top(50)):
+            iid = str(i)
+            self._query_entries[iid] = entry
+            self.queries_tree.insert("", "end", iid=iid, values=(
+                entry['sql'][:120], entry['count'], f"{entry['total_ms']:.1f}", f"{entry['mean_ms']:.2f}",
+                f"{entry['max_ms']:.1f}", entry['rows']))
+        self._show_query_details("")
+
+    def _on_query_selected(self, event=None):
+        selection = self.queries_tree.selection()
+        entry = self._query_entries.get(selection[0]) if selection else None
+        if not entry:
+            return
+        classes = [f"≤ {borne:g} ms" for borne in BUCKETS_MS] + [f"> {BUCKETS_MS[-1]:g} ms"]
+        histogram = ", ".join(f"{classe} : {n}" for classe, n in zip(classes, entry['histogram']) if n)
+        appelants = "\n".join(f"  {n} × {site}" for site, n in entry['call_sites'])
+        self._show_query_details(
+            f"{entry['sql']}\n\nDurées : {histogram}\nRequêtes lentes : {entry['slow']}"
+            f"\nPlan : {entry['plan'] or '(calculé à la première exécution lente)'}\nAppelants :\n{appelants}")
+
+    def _show_query_details(self, text):
+        self.query_details.configure(state="normal")
+        self.query_details.delete("1.0", "end")
+        self.query_details.insert("1.0", text)
+        self.query_details.configure(state="disabled")
+
+    def _reset_query_stats(self):
+        self.query_stats.reset()
+        self.refresh_query_stats()
+
+    def _export_query_stats(self):
+        path = filedialog.asksaveasfilename(
+            parent=self, title="Exporter les statistiques des requêtes", defaultextension=".json",
+            initialfile=f"requetes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json", filetypes=[("JSON", "*.json")])
+        if not path:
+            return
+        try:
+            self.query_stats.export_report(path)
+            messagebox.showinfo("Export réussi", f"Statistiques exportées vers :\n{path}", parent=self)
+        except OSError as e:
+            messagebox.showerror("Erreur d'Export", f"L'export a échoué : {e}", parent=self)
+
     def refresh_soldes_expires_list(self):
         for row in self.tree_expires.get_children():
             self.tree_expires.delete(row)
@@ -412,27 +543,28 @@ class AdminWindow(tk.Toplevel):
 
     def _run_glissement_annuel(self):
         if messagebox.askyesno("Confirmation", f"Êtes-vous sûr de vouloir clôturer l'exercice {self.annee_exercice} ?\nCette action est IRRÉVERSIBLE.", icon='warning', parent=self):
-            try:
-                db_path = self.manager.db.get_db_path()
-                base_dir = os.path.dirname(db_path)
-                backups_dir = os.path.join(base_dir, "backups")
-                os.makedirs(backups_dir, exist_ok=True)
-                timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-                db_filename = os.path.basename(db_path)
-                backup_filename = f"backup_{timestamp}_AVANT_CLOTURE_{self.annee_exercice}_{db_filename}"
-                backup_path = os.path.join(backups_dir, backup_filename)
-                shutil.copy2(db_path, backup_path)
-            except Exception as e:
-                messagebox.showerror("Échec de la Sauvegarde", f"La sauvegarde automatique a échoué. Opération annulée.\n\nErreur : {e}", parent=self)
-                return
-            
-            try:
-                self.manager.effectuer_glissement_annuel()
-                messagebox.showinfo("Succès", "Le glissement annuel a été effectué.\nUne sauvegarde a été créée.\n\nL'application va maintenant redémarrer pour appliquer le nouvel exercice.", parent=self)
-                self.parent_window.trigger_restart()
-                self.destroy()
-            except Exception as e:
-                messagebox.showerror("Erreur de Clôture", f"Le glissement a échoué : {e}\n\nPensez à vérifier la sauvegarde avant de réessayer.", parent=self)
+            # La sauvegarde (copie à chaud + contrôle d'intégrité) est faite dans un thread de travail ;
+            # la clôture n'est lancée que si elle a réussi.
+            db_path = self.manager.db.get_db_path()
+            store = get_backup_store(db_path)
+            label = f"AVANT_CLOTURE_{self.annee_exercice}"
+            self.parent_window._run_long_task(
+                lambda report_progress: store.create_snapshot(db_path, label, report_progress, permanent=True),
+                self._on_backup_before_glissement_complete, "Sauvegarde avant clôture...", with_progress=True, group='ecriture'
+            )
+
+    def _on_backup_before_glissement_complete(self, result):
+        if isinstance(result, Exception):
+            messagebox.showerror("Échec de la Sauvegarde", f"La sauvegarde automatique a échoué. Opération annulée.\n\nErreur : {result}", parent=self)
+            return
+
+        try:
+            self.manager.effectuer_glissement_annuel()
+            messagebox.showinfo("Succès", "Le glissement annuel a été effectué.\nUne sauvegarde a été créée.\n\nL'application va maintenant redémarrer pour appliquer le nouvel exercice.", parent=self)
+            self.parent_window.trigger_restart()
+            self.destroy()
+        except Exception as e:
+            messagebox.showerror("Erreur de Clôture", f"Le glissement a échoué : {e}\n\nPensez à vérifier la sauvegarde avant de réessayer.", parent=self)
 
     def _run_apurement(self):
         selection = self.tree_expires.selection()
@@ -453,10 +585,11 @@ class AdminWindow(tk.Toplevel):
             self.holidays_tree.delete(row)
         try:
             year = int(self.year_var.get())
-            country_code = CONFIG['conges']['holidays_country']
+            country_code = get_settings().conges.holidays_country
             
             all_holidays_dict = {}
-            if 'holidays' in sys.modules:
+            holidays = get_holidays_module()
+            if holidays:
                  official_holidays = holidays.country_holidays(country_code, years=year)
                  for h_date, h_name in official_holidays.items():
                     all_holidays_dict[h_date] = (h_name, "Officiel")
@@ -563,9 +696,10 @@ class JustificatifsWindow(tk.Toplevel):
         
         status_frame = ttk.Frame(filter_frame)
         status_frame.pack(side="left", fill="x", expand=True)
-        ttk.Radiobutton(status_frame, text="Manquants", variable=self.filter_var, value="manquant", command=self.refresh_list).pack(anchor="w")
-        ttk.Radiobutton(status_frame, text="Fournis", variable=self.filter_var, value="justifie", command=self.refresh_list).pack(anchor="w")
-        ttk.Radiobutton(status_frame, text="Tous", variable=self.filter_var, value="tous", command=self.refresh_list).pack(anchor="w")
+        self.status_buttons = {}
+        for value, text in (("manquant", "Manquants"), ("justifie", "Fournis"), ("tous", "Tous")):
+            self.status_buttons[value] = ttk.Radiobutton(status_frame, text=text, variable=self.filter_var, value=value, command=self.refresh_list)
+            self.status_buttons[value].pack(anchor="w")
         
         search_frame = ttk.Frame(filter_frame)
         search_frame.pack(side="left", fill="x", expand=True, padx=(20, 0))
@@ -581,12 +715,22 @@ class JustificatifsWindow(tk.Toplevel):
         
         ttk.Button(search_frame, text="Rechercher", command=self.refresh_list).pack(anchor="w", pady=5)
         
+        content_frame = ttk.Frame(main_frame)
+        content_frame.pack(fill="both", expand=True)
+
+        preview_frame = ttk.LabelFrame(content_frame, text="Aperçu", padding=5)
+        preview_frame.pack(side="right", fill="y", padx=(5, 0), pady=5)
+        self.preview_label = ttk.Label(preview_frame, text="Aucun aperçu.", anchor="center", width=40)
+        self.preview_label.pack(fill="both", expand=True)
+        self._preview_image = None
+
         cols = ("Agent", "PPR", "Date Début", "Date Fin", "Jours Pris")
-        self.tree = ttk.Treeview(main_frame, columns=cols, show="headings", height=10)
+        self.tree = ttk.Treeview(content_frame, columns=cols, show="headings", height=10)
         for col in cols:
             self.tree.heading(col, text=col)
             self.tree.column(col, width=120)
-        self.tree.pack(fill="both", expand=True, padx=5, pady=5)
+        self.tree.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+        self.tree.bind("<<TreeviewSelect>>", self._show_preview)
         
     def _clear_search(self):
         self.search_var.set("")
@@ -599,15 +743,143 @@ class JustificatifsWindow(tk.Toplevel):
             filtre_choisi = self.filter_var.get()
             terme_recherche = self.search_var.get().strip()
             conges_list = self.manager.get_sick_leaves_by_status(status=filtre_choisi, search_term=terme_recherche)
+            counts = self.manager.count_sick_leaves_by_status()
+            self.status_buttons["manquant"].config(text=f"Manquants ({counts['manquant']})")
+            self.status_buttons["justifie"].config(text=f"Fournis ({counts['justifie']})")
+            self.status_buttons["tous"].config(text=f"Tous ({counts['manquant'] + counts['justifie']})")
             for row_data in conges_list:
                 agent_fullname = f"{row_data[0]} {row_data[1]}"
                 ppr = row_data[2]
                 date_debut = format_date_for_display(row_data[3])
                 date_fin = format_date_for_display(row_data[4])
                 jours_pris = row_data[5]
-                self.tree.insert("", "end", values=(agent_fullname, ppr, date_debut, date_fin, jours_pris))
+                self.tree.insert("", "end", iid=str(row_data[6]), values=(agent_fullname, ppr, date_debut, date_fin, jours_pris))
         except sqlite3.Error as e:
             messagebox.showerror("Erreur BD", f"Impossible de charger la liste : {e}", parent=self)
+        self._show_preview()
+
+    def _show_preview(self, event=None):
+        """Affiche l'aperçu en cache du justificatif sélectionné (aucune génération ici)."""
+        selection = self.tree.selection()
+        preview_path = self.manager.get_certificat_preview(int(selection[0])) if selection else None
+        if not preview_path:
+            self._preview_image = None
+            self.preview_label.config(image="", text="Aucun aperçu." if selection else "")
+            return
+        try:
+            self._preview_image = load_preview_image(preview_path, master=self)
+            self.preview_label.config(image=self._preview_image, text="")
+        except tk.TclError:
+            self._preview_image = None
+            self.preview_label.config(image="", text="Aperçu illisible.")
+
+
+class BatchDecisionWindow(tk.Toplevel):
+    """Sélection d'un ensemble de congés (par période) pour générer leurs décisions en une fois."""
+    def __init__(self, parent, manager, main_app_instance):
+        super().__init__(parent)
+        self.manager = manager
+        self.main_app = main_app_instance
+        self.title("Génération des Décisions par Lot")
+        self.grab_set()
+        self.geometry("850x550")
+        self.type_var = tk.StringVar(value="Congé annuel")
+        self.format_var = tk.StringVar(value="docx")
+        self._create_widgets()
+
+    def _create_widgets(self):
+        main_frame = ttk.Frame(self, padding=10)
+        main_frame.pack(fill="both", expand=True)
+
+        filter_frame = ttk.LabelFrame(main_frame, text="Congés débutant sur la période", padding=10)
+        filter_frame.pack(fill="x", pady=(0, 10))
+        ttk.Label(filter_frame, text="Du :").grid(row=0, column=0, sticky="w")
+        self.start_entry = ttk.Entry(filter_frame, width=12)
+        self.start_entry.grid(row=0, column=1, padx=5)
+        ttk.Button(filter_frame, text="📅", width=2, command=lambda: DatePickerWindow(self, self.start_entry, self.manager)).grid(row=0, column=2)
+        ttk.Label(filter_frame, text="Au :").grid(row=0, column=3, sticky="w", padx=(15, 0))
+        self.end_entry = ttk.Entry(filter_frame, width=12)
+        self.end_entry.grid(row=0, column=4, padx=5)
+        ttk.Button(filter_frame, text="📅", width=2, command=lambda: DatePickerWindow(self, self.end_entry, self.manager)).grid(row=0, column=5)
+        ttk.Label(filter_frame, text="Type :").grid(row=0, column=6, sticky="w", padx=(15, 0))
+        ttk.Combobox(filter_frame, textvariable=self.type_var, values=["Tous"] + CONFIG['ui']['types_conge'], state="readonly", width=22).grid(row=0, column=7, padx=5)
+        ttk.Button(filter_frame, text="Rechercher", command=self.refresh_list).grid(row=0, column=8, padx=(10, 0))
+
+        cols = ("ID", "Agent", "Grade", "Type", "Début", "Fin", "Jours")
+        self.tree = ttk.Treeview(main_frame, columns=cols, show="headings", selectmode="extended")
+        for col in cols:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=90)
+        self.tree.column("ID", width=50, anchor="center")
+        self.tree.column("Agent", width=200)
+        self.tree.pack(fill="both", expand=True, pady=5)
+
+        btn_frame = ttk.Frame(main_frame)
+        btn_frame.pack(fill="x", pady=(5, 0))
+        self.count_label = ttk.Label(btn_frame, text="")
+        self.count_label.pack(side="left")
+        ttk.Label(btn_frame, text="Format :").pack(side="left", padx=(20, 5))
+        ttk.Radiobutton(btn_frame, text="Word", variable=self.format_var, value="docx").pack(side="left")
+        ttk.Radiobutton(btn_frame, text="PDF", variable=self.format_var, value="pdf").pack(side="left")
+        ttk.Button(btn_frame, text="Fermer", command=self.destroy).pack(side="right")
+        ttk.Button(btn_frame, text="Générer les décisions sélectionnées...", command=self._generate).pack(side="right", padx=5)
+        self.tree.bind("<<TreeviewSelect>>", lambda e: self._update_count())
+
+    def refresh_list(self):
+        start, end = validate_date(self.start_entry.get()), validate_date(self.end_entry.get())
+        if not start or not end or end < start:
+            messagebox.showwarning("Période invalide", "Veuillez saisir une période valide (JJ/MM/AAAA).", parent=self)
+            return
+        self.tree.delete(*self.tree.get_children())
+        type_conge = None if self.type_var.get() == "Tous" else self.type_var.get()
+        conges = self.manager.get_conges_between(start, end, type_conge)
+        agents = self.manager.db.get_agents_by_ids({c.agent_id for c in conges})
+        for conge in conges:
+            agent = agents.get(conge.agent_id)
+            self.tree.insert("", "end", iid=str(conge.id), values=(
+                conge.id, f"{agent.nom} {agent.prenom}" if agent else "Agent Inconnu", agent.grade if agent else "",
+                conge.type_conge, format_date_for_display(conge.date_debut), format_date_for_display(conge.date_fin), conge.jours_pris))
+        self.tree.selection_set(self.tree.get_children())
+        self._update_count()
+
+    def _update_count(self):
+        self.count_label.config(text=f"{len(self.tree.selection())} congé(s) sélectionné(s) sur {len(self.tree.get_children())}")
+
+    def _generate(self):
+        conge_ids = [int(iid) for iid in self.tree.selection()]
+        if not conge_ids:
+            messagebox.showwarning("Aucune sélection", "Veuillez sélectionner au moins un congé.", parent=self)
+            return
+        output_dir = filedialog.askdirectory(title="Dossier de destination des décisions", parent=self)
+        if not output_dir:
+            return
+        self.destroy()
+        self.main_app.generate_decisions_batch(conge_ids, output_dir, self.format_var.get())
+
+
+class CertificatePreviewWindow(tk.Toplevel):
+    """Affiche l'aperçu d'un justificatif, avec la possibilité d'ouvrir le fichier complet."""
+    def __init__(self, parent, preview_path, file_path, open_file_callback):
+        # Chargée avant la création de la fenêtre : une image illisible lève TclError sans fenêtre vide.
+        image = load_preview_image(preview_path, master=parent)
+        super().__init__(parent)
+        self.title(f"Justificatif - {os.path.basename(file_path)}")
+        self.transient(parent)
+        self.file_path = file_path
+        self.open_file_callback = open_file_callback
+
+        frame = ttk.Frame(self, padding=10)
+        frame.pack(fill="both", expand=True)
+        self._image = image
+        ttk.Label(frame, image=self._image).pack(pady=(0, 10))
+
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(fill="x")
+        ttk.Button(btn_frame, text="Ouvrir le fichier", command=self._open_file).pack(side="left", expand=True, padx=5)
+        ttk.Button(btn_frame, text="Fermer", command=self.destroy).pack(side="left", expand=True, padx=5)
+
+    def _open_file(self):
+        self.open_file_callback(self.file_path)
 
 class ReportWindow(tk.Toplevel):
     """Fenêtre affichant un rapport d'incohérences de calcul de jours."""
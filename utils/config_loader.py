@@ -1,28 +1,188 @@
 # utils/config_loader.py
-import yaml
+#
+# CONFIG est le dictionnaire brut lu depuis config.yaml (conservé pour compatibilité).
+# get_settings() en donne une vue figée et typée, validée une seule fois au chargement :
+# listes converties en frozenset/tuple pour les tests d'appartenance, valeurs numériques
+# déjà converties. Les chemins critiques (soumission des congés, calendrier...) l'utilisent
+# plutôt que de relire CONFIG['conges'][...] à chaque appel.
+#
+# Le résultat du chargement est mis en cache (pickle dans __pycache__/, à côté du fichier
+# YAML) et réutilisé tant que le fichier YAML n'a pas été modifié : au démarrage, le YAML
+# n'est alors plus analysé.
+import logging
 import os
-import sys
-import tkinter as tk
-from tkinter import messagebox
+import pickle
+from dataclasses import dataclass
 
 # On initialise une variable globale vide. Elle sera remplie par main.py.
 CONFIG = {}
 
+_SETTINGS = None
+
+# À incrémenter à chaque modification des classes ci-dessous (invalide les caches existants).
+_CACHE_FORMAT = 5
+
+# Sections que le fichier de configuration doit obligatoirement contenir.
+REQUIRED_SECTIONS = ('app', 'db', 'conges')
+
+
+@dataclass(frozen=True)
+class CongesSettings:
+    types_decompte_solde: frozenset
+    holidays_country: str
+    solde_annuel_par_defaut: float
+    maternite_duree: int
+    paternite_duree: int
+
+
+@dataclass(frozen=True)
+class DiagnosticsSettings:
+    query_stats: bool
+    slow_query_ms: float
+    ui_profiler: bool
+    ui_budget_ms: float
+    ui_profiler_report: str
+
+
+@dataclass(frozen=True)
+class Settings:
+    app_title: str
+    app_version: str
+    db_filename: str
+    certificates_dir: str
+    templates_dir: str
+    grades: tuple
+    types_conge: tuple
+    conges: CongesSettings
+    diagnostics: DiagnosticsSettings
+
+
+def _section(config, name):
+    section = config.get(name) or {}
+    if not isinstance(section, dict):
+        raise ValueError(f"Configuration : la section '{name}' doit être un dictionnaire.")
+    return section
+
+
+def _list(section, key, section_name):
+    value = section.get(key) or []
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(f"Configuration : '{section_name}.{key}' doit être une liste.")
+    return tuple(str(v) for v in value)
+
+
+def _number(section, key, section_name, default, kind):
+    value = section.get(key, default)
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Configuration : '{section_name}.{key}' doit être un nombre (valeur : {value!r}).")
+
+
+def _bool(section, key, section_name, default):
+    # Pas de bool(valeur) : la chaîne "false" (valeur YAML entre guillemets) serait vraie.
+    value = section.get(key, default)
+    if not isinstance(value, bool):
+        raise ValueError(f"Configuration : '{section_name}.{key}' doit être un booléen, true ou false (valeur : {value!r}).")
+    return value
+
+
+def build_settings(config):
+    """Construit et valide la vue typée d'un dictionnaire de configuration. Lève ValueError si une valeur est invalide."""
+    app, db, paths, ui, conges, diagnostics = (
+        _section(config, name) for name in ('app', 'db', 'paths', 'ui', 'conges', 'diagnostics'))
+    return Settings(
+        app_title=str(app.get('title', '')),
+        app_version=str(app.get('version', '')),
+        db_filename=str(db.get('filename', '')),
+        certificates_dir=str(db.get('certificates_dir', 'certificats')),
+        templates_dir=str(paths.get('templates_dir', 'templates')),
+        grades=_list(ui, 'grades', 'ui'),
+        types_conge=_list(ui, 'types_conge', 'ui'),
+        conges=CongesSettings(
+            types_decompte_solde=frozenset(_list(conges, 'types_decompte_solde', 'conges')),
+            holidays_country=str(conges.get('holidays_country', 'MA')),
+            solde_annuel_par_defaut=_number(conges, 'solde_annuel_par_defaut', 'conges', 22.0, float),
+            maternite_duree=_number(conges, 'maternite_duree', 'conges', 98, int),
+            paternite_duree=_number(conges, 'paternite_duree', 'conges', 15, int),
+        ),
+        diagnostics=DiagnosticsSettings(
+            query_stats=_bool(diagnostics, 'query_stats', 'diagnostics', False),
+            slow_query_ms=_number(diagnostics, 'slow_query_ms', 'diagnostics', 200.0, float),
+            ui_profiler=_bool(diagnostics, 'ui_profiler', 'diagnostics', False),
+            ui_budget_ms=_number(diagnostics, 'ui_budget_ms', 'diagnostics', 50.0, float),
+            ui_profiler_report=str(diagnostics.get('ui_profiler_report', 'ui_profile.txt')),
+        ),
+    )
+
+
+def get_settings():
+    """
+    Vue typée et figée de la configuration. Construite au chargement de config.yaml ; à défaut
+    (tests, scripts), elle est construite à la première demande à partir du contenu de CONFIG.
+    """
+    global _SETTINGS
+    if _SETTINGS is None:
+        _SETTINGS = build_settings(CONFIG)
+    return _SETTINGS
+
+
+def _cache_path(path):
+    return os.path.join(os.path.dirname(path), '__pycache__', f"{os.path.basename(path)}.pickle")
+
+
+def _read_cache(path, key):
+    try:
+        with open(_cache_path(path), 'rb') as f:
+            cached = pickle.load(f)
+        if cached.get('key') == key:
+            return cached
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.warning(f"Cache de configuration illisible, il sera régénéré : {e}")
+    return None
+
+
+def _write_cache(path, key, config_data, settings):
+    cache_path = _cache_path(path)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'key': key, 'config': config_data, 'settings': settings}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logging.warning(f"Impossible d'écrire le cache de configuration : {e}")
+
+
 def load_config(path):
     """
     Charge la configuration depuis un chemin absolu et la stocke dans la variable globale CONFIG.
+    Lève FileNotFoundError si le fichier est introuvable et ValueError si son contenu est
+    invalide : c'est au point d'entrée (interface graphique ou ligne de commande) de présenter l'erreur.
     """
-    global CONFIG
+    global _SETTINGS
     if not os.path.exists(path):
-        root = tk.Tk()
-        root.withdraw()
-        messagebox.showerror(
-            "Fichier de Configuration Manquant",
+        raise FileNotFoundError(
             f"Le fichier de configuration '{os.path.basename(path)}' est introuvable.\n"
             f"Il doit se trouver ici : {os.path.dirname(path)}"
         )
-        sys.exit(1) 
-        
-    with open(path, 'r', encoding='utf-8') as f:
-        config_data = yaml.safe_load(f)
-        CONFIG.update(config_data) # On remplit le dictionnaire global
\ No newline at end of file
+
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, _CACHE_FORMAT)
+    cached = _read_cache(path, key)
+    if cached:
+        config_data, settings = cached['config'], cached['settings']
+    else:
+        import yaml  # analysé seulement quand le fichier a changé depuis le dernier chargement
+        with open(path, 'r', encoding='utf-8') as f:
+            config_data = yaml.safe_load(f) or {}
+        missing = [name for name in REQUIRED_SECTIONS if name not in config_data]
+        if missing:
+            raise ValueError(f"Configuration : section(s) manquante(s) : {', '.join(missing)}.")
+        settings = build_settings(config_data)
+        _write_cache(path, key, config_data, settings)
+
+    CONFIG.update(config_data) # On remplit le dictionnaire global
+    _SETTINGS = settings
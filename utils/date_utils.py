@@ -2,18 +2,24 @@
 # Version finale corrigée avec validation de date stricte et gestion d'erreur.
 
 from datetime import datetime, timedelta, date
+import importlib
+import importlib.util
 import sqlite3
 import logging
-from utils.config_loader import CONFIG
+from utils.config_loader import get_settings
 
 # --- Gestion optionnelle de la bibliothèque holidays ---
-try:
-    import holidays
-    HOLIDAYS_AVAILABLE = True
-except ImportError:
-    HOLIDAYS_AVAILABLE = False
+# Elle n'est importée qu'au premier calcul de jours fériés : son chargement est lent
+# et retarderait l'affichage de la fenêtre principale.
+HOLIDAYS_AVAILABLE = importlib.util.find_spec("holidays") is not None
+if not HOLIDAYS_AVAILABLE:
     logging.warning("Bibliothèque 'holidays' non trouvée. Seuls les jours fériés personnalisés seront chargés.")
 
+
+def get_holidays_module():
+    """Retourne le module 'holidays' (importé à la première demande), ou None s'il n'est pas installé."""
+    return importlib.import_module("holidays") if HOLIDAYS_AVAILABLE else None
+
 # --- Fonctions de formatage (ajustées pour la nouvelle validation) ---
 
 def format_date_for_display(date_str_sql):
@@ -74,12 +80,13 @@ def validate_date(date_str):
 
 def get_holidays_set_for_period(db_manager, start_year, end_year):
     """Charge les jours fériés (officiels et personnalisés) pour une période donnée."""
-    country_code = CONFIG['conges']['holidays_country']
+    country_code = get_settings().conges.holidays_country
     all_h = {}
+    holidays = get_holidays_module()
     
     for year in range(start_year, end_year + 2):
         # Charge les jours fériés officiels si la bibliothèque est disponible
-        if HOLIDAYS_AVAILABLE:
+        if holidays:
             try:
                 all_h.update(holidays.country_holidays(country_code, years=year))
             except Exception as e:
@@ -98,6 +105,32 @@ def get_holidays_set_for_period(db_manager, start_year, end_year):
             
     return set(all_h.keys())
 
+
+class HolidaysCache:
+    """
+    Jours fériés d'une période chargés une seule fois et réutilisés tant que les années
+    demandées y sont incluses ; une demande hors période recharge une période élargie.
+    'loader(start_year, end_year)' a la signature de get_holidays_set_for_period sans la base
+    (par exemple CongeManager.get_holidays_set_for_period) et couvre donc aussi end_year + 1.
+    """
+    def __init__(self, loader, margin=1):
+        self._loader = loader
+        self._margin = margin
+        self._span = None
+        self._holidays = set()
+
+    def get(self, start_year, end_year):
+        if self._span is None:
+            first, last = start_year - self._margin, end_year + self._margin
+        elif self._span[0] <= start_year and end_year <= self._span[1]:
+            return self._holidays
+        else:
+            first, last = min(start_year, self._span[0]), max(end_year, self._span[1])
+        self._holidays = self._loader(first, last)
+        self._span = (first, last)
+        return self._holidays
+
+
 def jours_ouvres(date_debut, date_fin, holidays_set):
     """Calcule le nombre de jours ouvrés entre deux dates, en excluant les jours fériés."""
     if not date_debut or not date_fin or date_fin < date_debut:
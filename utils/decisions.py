@@ -0,0 +1,125 @@
+# Fichier : utils/decisions.py
+# Génération des décisions de congé (Word ou PDF) à partir des modèles par grade.
+#
+# Deux formats sont produits : Word (.docx, à partir du modèle du grade, compilé une fois
+# puis mis en cache, voir utils/docx_templates.py) et PDF (mise en page en Python pur, voir
+# utils/pdf_utils.py). Le format est déterminé par l'extension du fichier de sortie.
+# La génération par lot répartit les documents entre plusieurs processus : chaque
+# processus dispose de son propre cache, un modèle n'y est donc compilé qu'une fois.
+# Ce module ne dépend ni de Tkinter ni de la base : il est importé par les processus de travail.
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils.docx_templates import render_template
+from utils.pdf_utils import render_decision_pdf
+
+DECISION_FORMATS = ("docx", "pdf")
+
+# En dessous de ce nombre de documents, le démarrage des processus coûte plus qu'il ne rapporte.
+MIN_DOCUMENTS_FOR_POOL = 8
+# Nombre de documents confiés à un processus en une fois.
+DOCUMENTS_PER_TASK = 20
+
+
+def _render(template_path, output_path, context):
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    if output_path.lower().endswith(".pdf"):
+        # Pour le PDF, 'template_path' est le gabarit texte du grade (None : gabarit par défaut).
+        render_decision_pdf(output_path, context, template_path)
+    else:
+        render_template(template_path, output_path, context)
+
+
+def generate_decision_from_template(template_path, output_path, context):
+    """
+    Génère un document Word (ou PDF si 'output_path' se termine par .pdf) à partir d'un modèle en remplaçant les tags.
+    """
+    try:
+        _render(template_path, output_path, context)
+        return True
+    except Exception as e:
+        logging.error(f"Erreur lors de la génération du document : {e}", exc_info=True)
+        raise e
+
+
+def _render_chunk(template_path, items):
+    """Tâche d'un processus de travail : rend une série de décisions d'un même modèle."""
+    results = []
+    for conge_id, output_path, context in items:
+        try:
+            _render(template_path, output_path, context)
+            results.append((conge_id, output_path, None))
+        except Exception as e:
+            results.append((conge_id, output_path, str(e)))
+    return results
+
+
+def generate_decisions_batch(jobs, output_dir, progress_callback=None, max_workers=None):
+    """
+    Génère une série de décisions dans 'output_dir'.
+
+    'jobs' est une liste de dictionnaires {'conge_id', 'template_path', 'filename', 'context'}
+    (voir CongeManager.prepare_decision_jobs). Les documents sont regroupés par modèle puis
+    répartis entre les processus. progress_callback(faits, total) est appelé au fil de l'eau.
+    Retourne {'generes': [(conge_id, chemin)], 'erreurs': [(conge_id, message)]}.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    par_modele = {}
+    for job in jobs:
+        output_path = os.path.join(output_dir, job['filename'])
+        par_modele.setdefault(job['template_path'], []).append((job['conge_id'], output_path, job['context']))
+
+    taches = [(template_path, items[i:i + DOCUMENTS_PER_TASK])
+              for template_path, items in par_modele.items()
+              for i in range(0, len(items), DOCUMENTS_PER_TASK)]
+    total, faits = len(jobs), 0
+    resultat = {'generes': [], 'erreurs': []}
+
+    def _collect(results):
+        nonlocal faits
+        for conge_id, output_path, erreur in results:
+            if erreur:
+                resultat['erreurs'].append((conge_id, erreur))
+            else:
+                resultat['generes'].append((conge_id, output_path))
+        faits += len(results)
+        if progress_callback:
+            progress_callback(faits, total)
+
+    if total < MIN_DOCUMENTS_FOR_POOL or max_workers == 1:
+        for template_path, items in taches:
+            _collect(_render_chunk(template_path, items))
+    else:
+        # "spawn" : les processus de travail n'héritent ni des threads ni des connexions SQLite de l'interface.
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = [executor.submit(_render_chunk, template_path, items) for template_path, items in taches]
+            try:
+                for future in as_completed(futures):
+                    _collect(future.result())
+            except BaseException:
+                # Annulation (levée par progress_callback) ou erreur : les lots pas encore démarrés sont abandonnés.
+                for future in futures:
+                    future.cancel()
+                raise
+
+    logging.info(f"Génération par lot : {len(resultat['generes'])} décision(s), {len(resultat['erreurs'])} erreur(s).")
+    return resultat
+
+
+def write_batch_report(output_dir, resultat, erreurs_preparation=()):
+    """Écrit le rapport de génération dans 'output_dir' et retourne son chemin."""
+    report_path = os.path.join(output_dir, "Rapport_Generation_Decisions.txt")
+    erreurs = list(erreurs_preparation) + list(resultat['erreurs'])
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(f"Décisions générées : {len(resultat['generes'])}\n")
+        f.write(f"Erreurs : {len(erreurs)}\n\n")
+        for conge_id, output_path in sorted(resultat['generes']):
+            f.write(f"OK      congé {conge_id} : {os.path.basename(output_path)}\n")
+        for conge_id, message in erreurs:
+            f.write(f"ERREUR  congé {conge_id} : {message}\n")
+    return report_path
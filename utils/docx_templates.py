@@ -0,0 +1,171 @@
+# Fichier : utils/docx_templates.py
+# Compilation et cache des modèles de décision (.docx).
+#
+# Un .docx est une archive zip de parties XML. Un modèle est compilé une seule fois :
+#   1. dans les parties à compléter, une balise {{...}} coupée entre plusieurs « runs »
+#      Word est regroupée dans le premier de ses éléments <w:t> ; le reste du paragraphe
+#      (autres runs, tabulations, sauts de ligne) n'est pas modifié ;
+#   2. le XML obtenu est découpé en segments : texte fixe / balise ;
+#   3. toutes les autres parties sont rangées une fois pour toutes dans une archive
+#      « socle », déjà compressée.
+# Générer un document revient alors à copier le socle et à y ajouter les parties
+# complétées (simple concaténation des segments) : ni analyse du document, ni
+# recompression des images et des styles.
+#
+# Les balises sont reconnues en une seule passe d'expression régulière (TOKEN_RE), dans
+# le corps du document, les tableaux (même imbriqués), les en-têtes et les pieds de page.
+#
+# Les modèles compilés sont mis en cache par chemin et invalidés lorsque la date de
+# modification (ou la taille) du fichier change.
+
+import io
+import os
+import re
+import zipfile
+from bisect import bisect_right
+from xml.sax.saxutils import escape
+
+# {{nom}} ou {{ nom }} : le groupe 1 est le nom de la balise.
+TOKEN_RE = re.compile(r"\{\{\s*([\w.]+)\s*\}\}")
+
+# Paragraphe le plus interne (<w:p> ou <w:p ...>, mais pas <w:pPr>) : les paragraphes
+# imbriqués (zones de texte) sont ainsi traités individuellement.
+_PARAGRAPH_RE = re.compile(r"<w:p[ >](?:(?!<w:p[ >]).)*?</w:p>", re.S)
+_TEXT_RE = re.compile(r"<w:t(?: [^>]*)?>([^<]*)</w:t>|<w:t(?: [^>]*)?/>")
+# Éléments de mise en page qui séparent le texte d'un paragraphe (tabulation, saut de ligne).
+_LAYOUT_RE = re.compile(r"<w:(?:tab|br|cr)\b")
+
+# Parties de l'archive dans lesquelles les balises sont remplacées : corps, en-têtes, pieds de page.
+TEMPLATED_PART_RE = re.compile(r"^word/(document|header\d*|footer\d*)\.xml$")
+
+_CACHE = {}
+
+
+def _split_token_groups(paragraph, texts):
+    """
+    Groupes (premier, dernier) d'indices de <w:t> couverts par une même balise coupée entre
+    plusieurs runs. Une balise séparée par une tabulation ou un saut de ligne n'en est pas une.
+    """
+    starts, position = [], 0
+    for t in texts:
+        starts.append(position)
+        position += len(t.group(1) or "")
+    full_text = "".join(t.group(1) or "" for t in texts)
+
+    groups = []
+    for token in TOKEN_RE.finditer(full_text):
+        first = bisect_right(starts, token.start()) - 1
+        last = bisect_right(starts, token.end() - 1) - 1
+        if first == last or _LAYOUT_RE.search(paragraph, texts[first].end(), texts[last].start()):
+            continue
+        if groups and first <= groups[-1][1]:
+            groups[-1] = (groups[-1][0], last)
+        else:
+            groups.append((first, last))
+    return groups
+
+
+def _normalize_paragraph(match):
+    paragraph = match.group(0)
+    if '{{' not in paragraph:
+        return paragraph
+    texts = list(_TEXT_RE.finditer(paragraph))
+    groups = _split_token_groups(paragraph, texts)
+    if not groups:
+        return paragraph
+
+    # Seuls les <w:t> d'une balise coupée sont fusionnés (dans le premier) : les tabulations,
+    # sauts de ligne et autres runs du paragraphe restent à leur place.
+    parts, position = [], 0
+    for first, last in groups:
+        merged = "".join(t.group(1) or "" for t in texts[first:last + 1])
+        for i in range(first, last + 1):
+            parts.append(paragraph[position:texts[i].start()])
+            parts.append(f'<w:t xml:space="preserve">{merged}</w:t>' if i == first else '<w:t></w:t>')
+            position = texts[i].end()
+    parts.append(paragraph[position:])
+    return "".join(parts)
+
+
+def normalize_context(context):
+    """{'{{nom}}': valeur} ou {'nom': valeur} -> {'nom': valeur}."""
+    return {key.strip("{} "): value for key, value in context.items()}
+
+
+def substitute_placeholders(text, context):
+    """Remplace toutes les balises {{nom}} de 'text' en une passe ; les balises inconnues sont conservées."""
+    values = normalize_context(context)
+    return TOKEN_RE.sub(lambda m: str(values[m.group(1)]) if m.group(1) in values else m.group(0), text)
+
+
+def _compile_part(xml):
+    """Découpe une partie XML en segments : str (texte fixe) et balises (tuple (nom, balise_d_origine))."""
+    xml = _PARAGRAPH_RE.sub(_normalize_paragraph, xml)
+    segments, position = [], 0
+    for match in TOKEN_RE.finditer(xml):
+        segments.append(xml[position:match.start()])
+        segments.append((match.group(1), match.group(0)))
+        position = match.end()
+    segments.append(xml[position:])
+    return segments
+
+
+class CompiledTemplate:
+    """Modèle de décision compilé : archive socle + parties à compléter découpées en segments."""
+    def __init__(self, base_archive, parts):
+        self.base_archive = base_archive
+        self.parts = parts
+
+    @property
+    def placeholders(self):
+        """Noms des balises présentes dans le modèle."""
+        return {segment[0] for segments in self.parts.values() for segment in segments if isinstance(segment, tuple)}
+
+    def fill_part(self, name, values):
+        """Texte XML de la partie 'name' complétée (les balises inconnues sont laissées telles quelles)."""
+        return "".join(
+            segment if not isinstance(segment, tuple)
+            else escape(str(values[segment[0]])) if segment[0] in values
+            else segment[1]
+            for segment in self.parts[name]
+        )
+
+    def render(self, output_path, context):
+        values = normalize_context(context)
+        buffer = io.BytesIO(self.base_archive)
+        with zipfile.ZipFile(buffer, 'a', compression=zipfile.ZIP_DEFLATED) as archive:
+            for name in self.parts:
+                archive.writestr(name, self.fill_part(name, values).encode('utf-8'))
+        with open(output_path, 'wb') as f:
+            f.write(buffer.getvalue())
+
+
+def compile_template(template_path):
+    """Lit et compile un modèle .docx (voir l'en-tête du module)."""
+    parts = {}
+    base = io.BytesIO()
+    with zipfile.ZipFile(template_path) as source, zipfile.ZipFile(base, 'w', compression=zipfile.ZIP_DEFLATED) as target:
+        for info in source.infolist():
+            data = source.read(info)
+            if TEMPLATED_PART_RE.match(info.filename):
+                parts[info.filename] = _compile_part(data.decode('utf-8'))
+            else:
+                target.writestr(info, data, compress_type=info.compress_type)
+    return CompiledTemplate(base.getvalue(), parts)
+
+
+def get_compiled_template(template_path):
+    """Retourne le modèle compilé, recompilé seulement si le fichier a changé depuis la dernière fois."""
+    stat = os.stat(template_path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _CACHE.get(template_path)
+    if cached and cached[0] == key:
+        return cached[1]
+    compiled = compile_template(template_path)
+    _CACHE[template_path] = (key, compiled)
+    return compiled
+
+
+def render_template(template_path, output_path, context):
+    """Génère 'output_path' à partir du modèle (compilé et mis en cache) et du contexte {'{{balise}}': valeur}."""
+    get_compiled_template(template_path).render(output_path, context)
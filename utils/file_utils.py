@@ -7,7 +7,6 @@ from openpyxl.styles import Font
 from datetime import datetime
 import re
 import logging
-import docx
 import os
 import uuid  # Import nécessaire pour la génération d'ID uniques
 
@@ -15,6 +14,7 @@ from db.database import DatabaseManager
 from core.conges.manager import CongeManager
 from utils.config_loader import CONFIG
 from utils.date_utils import format_date_for_display
+from utils.decisions import generate_decision_from_template  # noqa: F401 - réexporté pour compatibilité
 
 def _perform_db_operation_with_manager(db_path, certificats_path, operation_callback):
     """
@@ -193,42 +193,3 @@ def import_agents_from_excel(db_path, certificats_path, source_path):
             raise e
 
     return _perform_db_operation_with_manager(db_path, certificats_path, operation)
-
-def generate_decision_from_template(template_path, output_path, context):
-    """
-    Génère un document Word à partir d'un modèle en remplaçant les tags.
-    """
-    try:
-        doc = docx.Document(template_path)
-        output_dir = os.path.dirname(output_path)
-        os.makedirs(output_dir, exist_ok=True)
-
-        for p in doc.paragraphs:
-            full_text = "".join(run.text for run in p.runs)
-            
-            if '{{' in full_text and '}}' in full_text:
-                for key, value in context.items():
-                    full_text = full_text.replace(key, str(value))
-                
-                for i in range(len(p.runs)):
-                    p.runs[i].text = ''
-                p.runs[0].text = full_text
-
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for p in cell.paragraphs:
-                        full_text = "".join(run.text for run in p.runs)
-                        if '{{' in full_text and '}}' in full_text:
-                            for key, value in context.items():
-                                full_text = full_text.replace(key, str(value))
-                            
-                            for i in range(len(p.runs)):
-                                p.runs[i].text = ''
-                            p.runs[0].text = full_text
-
-        doc.save(output_path)
-        return True
-    except Exception as e:
-        logging.error(f"Erreur lors de la génération du document : {e}", exc_info=True)
-        raise e
\ No newline at end of file
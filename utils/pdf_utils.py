@@ -0,0 +1,244 @@
+# Fichier : utils/pdf_utils.py
+# Génération des décisions au format PDF, entièrement en Python (sans suite bureautique).
+#
+# La mise en page est décrite par un gabarit texte très simple, une ligne par paragraphe :
+#   # Titre           -> titre centré, en gras
+#   ! Texte           -> paragraphe en gras
+#   > Texte           -> paragraphe aligné à droite (lieu, date, signature)
+#   ? Texte           -> paragraphe omis si l'une de ses balises est vide
+#   Texte             -> paragraphe normal (coupé automatiquement en lignes)
+#   (ligne vide)      -> espace vertical
+# Les balises {{...}} sont les mêmes que dans les modèles Word. Un gabarit propre à un
+# grade peut être placé à côté du modèle Word (ex. templates/adjoint_technique.txt) ;
+# à défaut, DEFAULT_LAYOUT est utilisé.
+#
+# Le PDF produit utilise les polices standard Helvetica (aucune police à embarquer) et
+# l'encodage WinAnsi (cp1252), qui couvre les caractères accentués du français. Un texte
+# hors de cet encodage (nom saisi en arabe, par exemple) est refusé avant l'écriture du
+# fichier (UnsupportedTextError) : la décision doit alors être générée au format Word.
+
+import os
+import unicodedata
+import zlib
+
+from utils.docx_templates import TOKEN_RE, normalize_context
+
+DEFAULT_LAYOUT = """\
+# DÉCISION DE CONGÉ
+
+! Objet : {{type_conge}}
+
+Vu le dossier administratif de l'intéressé(e) ;
+
+Article 1 : Un congé de {{jours_pris}} jour(s) est accordé à {{nom_complet}}, {{grade}}, PPR {{ppr}}, du {{date_debut}} au {{date_fin}} inclus.
+Article 2 : L'intéressé(e) reprendra son service le {{date_reprise}}.
+? Article 3 : Ce congé est imputé comme suit : {{details_solde}}.
+
+
+> Fait le {{date_aujourdhui}}
+> Signature
+"""
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4, en points
+MARGIN = 72
+FONT_SIZE, TITLE_SIZE = 11, 15
+LINE_HEIGHT = 16
+
+# Largeurs des caractères ASCII 32 à 126 (métriques Adobe, millièmes de la taille de police).
+_HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_HELVETICA_BOLD_WIDTHS = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+]
+_FONTS = {False: ("F1", _HELVETICA_WIDTHS), True: ("F2", _HELVETICA_BOLD_WIDTHS)}
+
+_LAYOUT_CACHE = {}
+
+
+class UnsupportedTextError(ValueError):
+    """Texte que le PDF (polices standard, encodage WinAnsi) ne peut pas représenter."""
+
+
+def _char_width(char, widths):
+    code = ord(char)
+    if not 32 <= code <= 126:
+        # Lettre accentuée : même largeur que la lettre de base (é -> e).
+        base = unicodedata.normalize('NFD', char)[0]
+        code = ord(base) if 32 <= ord(base) <= 126 else ord('n')
+    return widths[code - 32]
+
+
+def text_width(text, size=FONT_SIZE, bold=False):
+    """Largeur du texte en points."""
+    widths = _FONTS[bold][1]
+    return sum(_char_width(c, widths) for c in text) * size / 1000
+
+
+def wrap_text(text, max_width, size=FONT_SIZE, bold=False):
+    """Coupe 'text' en lignes d'au plus 'max_width' points (un mot trop long reste seul sur sa ligne)."""
+    lines, current = [], ""
+    for word in text.split():
+        candidate = f"{current} {word}" if current else word
+        if current and text_width(candidate, size, bold) > max_width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+    return lines or [""]
+
+
+def parse_layout(text):
+    """Gabarit texte -> liste de (style, texte, facultatif) ; style : 'title', 'bold', 'right', 'text' ou 'space'."""
+    paragraphs = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        optional = line.startswith("? ")
+        if optional:
+            line = line[2:]
+        if not line.strip():
+            paragraphs.append(('space', '', optional))
+        elif line.startswith("# "):
+            paragraphs.append(('title', line[2:].strip(), optional))
+        elif line.startswith("! "):
+            paragraphs.append(('bold', line[2:].strip(), optional))
+        elif line.startswith("> "):
+            paragraphs.append(('right', line[2:].strip(), optional))
+        else:
+            paragraphs.append(('text', line.strip(), optional))
+    return paragraphs
+
+
+def load_layout(layout_path=None):
+    """Gabarit lu depuis 'layout_path' (mis en cache par date de modification), ou DEFAULT_LAYOUT."""
+    if not layout_path:
+        return parse_layout(DEFAULT_LAYOUT)
+    stat = os.stat(layout_path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _LAYOUT_CACHE.get(layout_path)
+    if cached and cached[0] == key:
+        return cached[1]
+    with open(layout_path, encoding='utf-8') as f:
+        layout = parse_layout(f.read())
+    _LAYOUT_CACHE[layout_path] = (key, layout)
+    return layout
+
+
+def _fill(text, values):
+    """Remplace les balises ; retourne (texte, une_balise_est_vide)."""
+    empty = False
+
+    def replace(match):
+        nonlocal empty
+        value = values.get(match.group(1))
+        if value is None:
+            return match.group(0)
+        value = str(value)
+        empty = empty or not value.strip()
+        return value
+
+    return TOKEN_RE.sub(replace, text), empty
+
+
+def _check_encodable(text):
+    """Lève UnsupportedTextError si 'text' contient des caractères hors de l'encodage WinAnsi."""
+    try:
+        text.encode('cp1252')
+    except UnicodeEncodeError as e:
+        raise UnsupportedTextError(
+            f"Le PDF ne peut pas contenir « {e.object[e.start:e.end]} » (caractères hors de l'alphabet latin) : "
+            f"générez cette décision au format Word.") from None
+
+
+def _escape(text):
+    data = text.encode('cp1252')
+    return data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def layout_pages(layout, context):
+    """Place les paragraphes du gabarit : retourne la liste des pages, chacune une liste de (x, y, police, taille, texte)."""
+    values = normalize_context(context)
+    usable = PAGE_WIDTH - 2 * MARGIN
+    pages, page, y = [], [], PAGE_HEIGHT - MARGIN
+    for style, text, optional in layout:
+        text, empty = _fill(text, values)
+        if optional and empty:
+            continue
+        _check_encodable(text)
+        if style == 'space':
+            y -= LINE_HEIGHT
+            continue
+        bold = style in ('title', 'bold')
+        size = TITLE_SIZE if style == 'title' else FONT_SIZE
+        for line in wrap_text(text, usable, size, bold):
+            if y < MARGIN:
+                pages.append(page)
+                page, y = [], PAGE_HEIGHT - MARGIN
+            width = text_width(line, size, bold)
+            if style == 'title':
+                x = MARGIN + (usable - width) / 2
+            elif style == 'right':
+                x = PAGE_WIDTH - MARGIN - width
+            else:
+                x = MARGIN
+            page.append((x, y, _FONTS[bold][0], size, line))
+            y -= LINE_HEIGHT * size / FONT_SIZE
+    pages.append(page)
+    return pages
+
+
+def build_pdf(pages, title=""):
+    """Assemble un document PDF 1.4 (bytes) à partir des pages produites par layout_pages."""
+    objects = []  # contenu de chaque objet, numéroté à partir de 1
+
+    def add(data):
+        objects.append(data)
+        return len(objects)
+
+    catalog = add(None)
+    pages_obj = add(None)
+    fonts = add(b"<< /F1 << /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >> "
+                b"/F2 << /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >> >>")
+    kids = []
+    for page in pages:
+        content = b"".join(b"BT /%s %d Tf %.2f %.2f Td (%s) Tj ET\n" % (font.encode(), size, x, y, _escape(text))
+                           for x, y, font, size, text in page)
+        stream = zlib.compress(content)
+        content_obj = add(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream))
+        kids.append(add(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Resources << /Font %d 0 R >> /Contents %d 0 R >>"
+                        % (pages_obj, PAGE_WIDTH, PAGE_HEIGHT, fonts, content_obj)))
+    objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_obj
+    objects[pages_obj - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+    info = add(b"<< /Title (%s) /Producer (Gestion des Conges) >>" % _escape(title))
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, data in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, data)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, info, xref)
+    return bytes(out)
+
+
+def render_decision_pdf(output_path, context, layout_path=None):
+    """Génère la décision PDF 'output_path' à partir du gabarit (ou DEFAULT_LAYOUT) et du contexte {'{{balise}}': valeur}."""
+    pages = layout_pages(load_layout(layout_path), context)
+    title = f"Décision - {normalize_context(context).get('nom_complet', '')}"
+    _check_encodable(title)
+    with open(output_path, 'wb') as f:
+        f.write(build_pdf(pages, title))